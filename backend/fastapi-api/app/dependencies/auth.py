@@ -12,6 +12,8 @@ async def get_current_user(request: Request) -> dict:
         )
     
     token = authorization.replace("Bearer ", "")
-    auth_service = AuthService()
+    # Reuse the application-scoped connection pool (see main.lifespan)
+    http_client = getattr(request.app.state, "auth_http_client", None)
+    auth_service = AuthService(http_client=http_client)
     
     return await auth_service.verify_token(token)
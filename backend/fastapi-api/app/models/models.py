@@ -42,6 +42,7 @@ class Track(Base):
     user_id = Column(Integer, ForeignKey('users.id', ondelete='CASCADE'), nullable=False, index=True)
     original_filename = Column(String(255), nullable=False)
     file_path = Column(String(512), nullable=False, unique=True)
+    storage_key = Column(String(255), nullable=False, unique=True)  # stored audio filename, used for lookups by URL
     file_size = Column(BigInteger, nullable=False)
     file_type = Column(String(10), nullable=False)
     duration = Column(INTERVAL, nullable=False)
@@ -50,13 +51,84 @@ class Track(Base):
     cover_path = Column(String(512))
     cover_thumbnail_path = Column(String(512))
     updated_at = Column(DateTime(timezone=False), server_default=func.current_timestamp(), onupdate=func.current_timestamp(), nullable=False)
+    processing_status = Column(String(20), default='ready', server_default='ready', nullable=False)  # processing, ready, failed
+    blob_sha256 = Column(String(64), ForeignKey('audio_blobs.sha256'), index=True)  # shared content, NULL for tracks stored before deduplication
+    cover_sha256 = Column(String(64), ForeignKey('cover_blobs.sha256'), index=True)  # shared embedded cover, NULL for per-track covers
     
     # Relations
     user = relationship("User", back_populates="tracks")
     track_metadata = relationship("Metadata", back_populates="track", cascade="all, delete-orphan")
     statistics = relationship("Statistics", back_populates="track", cascade="all, delete-orphan")
+    cover_keys = relationship("CoverKey", back_populates="track", cascade="all, delete-orphan")
     playlists = relationship("Playlist", secondary=playlist_tracks, back_populates="tracks")
 
+class AudioBlob(Base):
+    __tablename__ = 'audio_blobs'
+    
+    # Uploaded audio content, stored once under audio/blobs/{sha256} and hard
+    # linked to each track's file; ref_count is maintained by a trigger on tracks
+    sha256 = Column(String(64), primary_key=True)
+    file_size = Column(BigInteger, nullable=False)
+    ref_count = Column(Integer, default=0, nullable=False)
+    created_at = Column(DateTime(timezone=False), server_default=func.current_timestamp(), nullable=False)
+
+class CoverBlob(Base):
+    __tablename__ = 'cover_blobs'
+    
+    # Embedded cover content, stored once as cover/{sha256}.jpg with its
+    # thumbnails and shared by every track carrying it; ref_count is
+    # maintained by a trigger on tracks
+    sha256 = Column(String(64), primary_key=True)
+    file_size = Column(BigInteger, nullable=False)
+    ref_count = Column(Integer, default=0, nullable=False)
+    created_at = Column(DateTime(timezone=False), server_default=func.current_timestamp(), nullable=False)
+
+class CoverKey(Base):
+    __tablename__ = 'cover_keys'
+    
+    # Stored cover or thumbnail filename, as requested under /files/cover/
+    # (shared covers have one row per track using them)
+    key = Column(String(255), primary_key=True)
+    track_id = Column(UUID(as_uuid=True), ForeignKey('tracks.id', ondelete='CASCADE'), primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
+    kind = Column(String(20), default='cover', nullable=False)  # cover, thumbnail
+    
+    # Relations
+    track = relationship("Track", back_populates="cover_keys")
+
+class IngestJob(Base):
+    __tablename__ = 'ingest_jobs'
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
+    track_id = Column(UUID(as_uuid=True), ForeignKey('tracks.id', ondelete='CASCADE'), nullable=False, index=True)
+    user_id = Column(Integer, ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
+    job_type = Column(String(30), default='enrich', nullable=False)
+    status = Column(String(20), default='pending', nullable=False)  # pending, running, completed, failed
+    attempts = Column(Integer, default=0, nullable=False)
+    max_attempts = Column(Integer, default=3, nullable=False)
+    last_error = Column(Text)
+    run_after = Column(DateTime(timezone=False), server_default=func.current_timestamp(), nullable=False)
+    locked_until = Column(DateTime(timezone=False))
+    created_at = Column(DateTime(timezone=False), server_default=func.current_timestamp(), nullable=False)
+    updated_at = Column(DateTime(timezone=False), server_default=func.current_timestamp(), onupdate=func.current_timestamp(), nullable=False)
+    completed_at = Column(DateTime(timezone=False))
+
+class UploadSession(Base):
+    __tablename__ = 'upload_sessions'
+    
+    # Resumable upload; chunks are stored under STORAGE_PATH/uploads/{id}/
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
+    user_id = Column(Integer, ForeignKey('users.id', ondelete='CASCADE'), nullable=False, index=True)
+    original_filename = Column(String(255), nullable=False)
+    content_type = Column(String(100))
+    total_size = Column(BigInteger, nullable=False)
+    chunk_size = Column(Integer, nullable=False)
+    status = Column(String(20), default='open', nullable=False)  # open, assembling, completed
+    track_id = Column(UUID(as_uuid=True), ForeignKey('tracks.id', ondelete='SET NULL'))
+    expires_at = Column(DateTime(timezone=False), nullable=False, index=True)
+    created_at = Column(DateTime(timezone=False), server_default=func.current_timestamp(), nullable=False)
+    updated_at = Column(DateTime(timezone=False), server_default=func.current_timestamp(), onupdate=func.current_timestamp(), nullable=False)
+
 class Metadata(Base):
     __tablename__ = 'metadata'
     
@@ -81,7 +153,8 @@ class Playlist(Base):
     
     # Relations
     user = relationship("User", back_populates="playlists")
-    tracks = relationship("Track", secondary=playlist_tracks, back_populates="playlists")
+    # Eager-loaded: PlaylistResponse serializes tracks, and lazy loads are not allowed under asyncio
+    tracks = relationship("Track", secondary=playlist_tracks, back_populates="playlists", lazy="selectin")
 
 class Statistics(Base):
     __tablename__ = 'statistics'
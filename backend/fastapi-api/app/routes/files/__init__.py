@@ -1,5 +1,7 @@
 from .file_routes import router
 from .audio_handler import AudioHandler
+from .hls_handler import HLSHandler
+from .upload_session_handler import UploadSessionHandler
 from .cover_handler import CoverHandler
 from .track_search_handler import TrackSearchHandler
 from .file_security import FileSecurity
@@ -7,6 +9,8 @@ from .file_security import FileSecurity
 __all__ = [
     "router",
     "AudioHandler",
+    "HLSHandler",
+    "UploadSessionHandler",
     "CoverHandler", 
     "TrackSearchHandler",
     "FileSecurity"
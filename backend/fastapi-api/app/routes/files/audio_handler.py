@@ -1,17 +1,36 @@
 from fastapi import HTTPException, UploadFile, Request
-from fastapi.responses import FileResponse, StreamingResponse
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.services.storage import StorageService
+from app.services.storage.file_manager import FileManager
+from app.services.storage.renditions import rendition_store
 from app.services.track_service import TrackService
 from app.services.storage_quota_service import StorageQuotaService
-from app.schemas.schemas import TrackCreate, TrackResponse
+from app.services.ingest_queue import ingest_queue
+from app.services.access_tracker import access_tracker
+from app.services.audio_blob_service import AudioBlobService
+from app.services.cover_blob_service import CoverBlobService
+from app.services.upload_session_service import upload_session_service
+from app.models.models import UploadSession
+from app.schemas.schemas import TrackCreate, TrackResponse, AudioPreflightRequest, AudioPreflightResponse, BatchUploadResponse, BatchUploadResult
+from .range_response import serve_file
 from datetime import timedelta
 from pathlib import Path
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+import asyncio
 import logging
 import mimetypes
+import os
+import re
 
 logger = logging.getLogger(__name__)
 
+SHA256_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+
+# Batch uploads: files per request, and how many are written to storage at once
+BATCH_UPLOAD_MAX_FILES = int(os.getenv("BATCH_UPLOAD_MAX_FILES", "100"))
+BATCH_UPLOAD_CONCURRENCY = int(os.getenv("BATCH_UPLOAD_CONCURRENCY", "4"))
+
 class AudioHandler:
     """Handler for audio file operations (upload, download, streaming, deletion)"""
     
@@ -19,117 +38,335 @@ class AudioHandler:
     async def upload_audio(
         file: UploadFile,
         user_id: int,
-        db: Session
+        db: AsyncSession
     ) -> TrackResponse:
-        """Audio file upload with automatic database recording"""
+        """Audio file upload: stores the file and track, then queues processing"""
         try:
             logger.info(f"Audio upload started by user {user_id}: {file.filename}, size: {file.size}, type: {file.content_type}")
             
             # Step 0: Check storage quota before processing
             file_size = file.size or 0
-            quota_check = StorageQuotaService.check_upload_allowed(db, user_id, file_size)
+            await AudioHandler.check_quota(db, user_id, file_size)
+            
+            # Step 1: Durably store the physical file
+            storage = StorageService()
+            file_result = await storage.store_audio_file(file, str(user_id))
+            
+            try:
+                # The declared size may be missing or wrong: charge the bytes written
+                if file_result['size'] != file_size:
+                    await AudioHandler.check_quota(db, user_id, file_result['size'])
+                return await AudioHandler.create_uploaded_track(db, storage, user_id, file.filename, file_result)
+            except Exception:
+                # Nothing was committed: the file has no track
+                storage.delete_file(file_result['filename'], "audio")
+                raise
             
-            if not quota_check["allowed"]:
-                reason = quota_check.get("reason", "unknown")
-                message = quota_check.get("message", "Upload not allowed")
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"Unexpected error during audio upload {file.filename}: {str(e)}")
+            raise HTTPException(status_code=500, detail="Internal server error during audio upload")
+    
+    @staticmethod
+    async def upload_audio_batch(
+        files: List[UploadFile],
+        user_id: int,
+        db: AsyncSession
+    ) -> BatchUploadResponse:
+        """Upload many audio files at once: one quota check, parallel writes, one transaction
+        
+        Files are written BATCH_UPLOAD_CONCURRENCY at a time. Every stored file
+        gets its track and ingest job in a single commit; metadata and covers are
+        then extracted by the ingest queue across its process pool.
+        """
+        if len(files) > BATCH_UPLOAD_MAX_FILES:
+            raise HTTPException(status_code=400, detail=f"At most {BATCH_UPLOAD_MAX_FILES} files per batch")
+        
+        logger.info(f"Batch audio upload started by user {user_id}: {len(files)} files")
+        
+        storage = StorageService()
+        results: Dict[int, BatchUploadResult] = {}
+        
+        # Step 0: Per-file validation, then one quota check for the whole batch
+        # on the declared sizes (a client may omit them: checked again once written)
+        accepted = []
+        for position, file in enumerate(files):
+            try:
+                storage.file_manager.validate_audio_file(file)
+                accepted.append(position)
+            except HTTPException as e:
+                results[position] = BatchUploadResult(filename=file.filename, success=False, error=e.detail)
+        
+        await AudioHandler.check_quota(db, user_id, sum(files[position].size or 0 for position in accepted))
+        
+        # Step 1: Durably store the files with bounded concurrency
+        semaphore = asyncio.Semaphore(BATCH_UPLOAD_CONCURRENCY)
+        
+        async def store(position: int) -> Dict[str, Any]:
+            async with semaphore:
+                return await storage.file_manager.save_audio_file(files[position], str(user_id))
+        
+        stored_results = await asyncio.gather(*(store(position) for position in accepted), return_exceptions=True)
+        stored = []
+        for position, file_result in zip(accepted, stored_results):
+            if isinstance(file_result, Exception):
+                logger.error(f"Error storing {files[position].filename} in batch for user {user_id}: {str(file_result)}")
+                results[position] = BatchUploadResult(filename=files[position].filename, success=False, error="Error saving audio file")
+            else:
+                stored.append((position, file_result))
+        
+        if not stored:
+            return BatchUploadResponse(
+                uploaded=0, failed=len(files), results=[results[position] for position in range(len(files))]
+            )
+        
+        # Final quota check on the bytes actually written
+        try:
+            await AudioHandler.check_quota(db, user_id, sum(file_result['size'] for _, file_result in stored))
+        except HTTPException:
+            for _, file_result in stored:
+                storage.delete_file(file_result['filename'], "audio")
+            raise
+        
+        new_blobs = set()
+        try:
+            # Step 2: Deduplicate content; blob rows are locked in hash order so
+            # concurrent batches sharing files cannot deadlock
+            blob_hashes = {}
+            for position, file_result in sorted(stored, key=lambda item: item[1]['sha256']):
+                try:
+                    async with db.begin_nested():
+                        if not await AudioBlobService.attach(
+                            db, storage.file_manager, file_result['filename'], file_result['sha256'], file_result['size']
+                        ):
+                            new_blobs.add(file_result['sha256'])
+                    blob_hashes[position] = file_result['sha256']
+                except Exception as e:
+                    logger.warning(f"Could not deduplicate {file_result['filename']}, keeping a private copy: {str(e)}")
+            
+            # Step 3: All tracks and ingest jobs in one transaction
+            db_tracks = TrackService.add_tracks(db, [
+                TrackCreate(
+                    original_filename=files[position].filename,
+                    file_path=file_result['path'],
+                    file_size=file_result['size'],
+                    file_type=Path(files[position].filename).suffix.lower().lstrip('.'),
+                    duration=timedelta(0),
+                    processing_status="processing",
+                    blob_sha256=blob_hashes.get(position)
+                )
+                for position, file_result in stored
+            ], user_id)
+            # Insert the tracks before the jobs referencing them
+            await db.flush()
+            jobs = ingest_queue.add_jobs(db, [db_track.id for db_track in db_tracks], user_id)
+            # Load server-generated columns (upload date, timestamps) before
+            # committing, so nothing fails once the tracks exist
+            loaded = {track.id: track for track in await TrackService.get_tracks_by_ids(db, [db_track.id for db_track in db_tracks])}
+            await db.commit()
+            
+        except Exception as e:
+            await AudioBlobService.discard_new_blobs(storage.file_manager, new_blobs)
+            await db.rollback()
+            logger.error(f"Error recording batch upload for user {user_id}: {str(e)}")
+            for _, file_result in stored:
+                storage.delete_file(file_result['filename'], "audio")
+            raise HTTPException(status_code=500, detail="Internal server error during batch upload")
+        
+        ingest_queue.notify()
+        
+        for (position, _), db_track, job in zip(stored, db_tracks, jobs):
+            response = TrackResponse.model_validate(loaded[db_track.id])
+            response.processing_job_id = job.id
+            results[position] = BatchUploadResult(filename=files[position].filename, success=True, track=response)
+        
+        logger.info(f"Batch audio upload for user {user_id}: {len(stored)} stored, {len(files) - len(stored)} failed")
+        
+        return BatchUploadResponse(
+            uploaded=len(stored),
+            failed=len(files) - len(stored),
+            results=[results[position] for position in range(len(files))]
+        )
+    
+    @staticmethod
+    async def create_uploaded_track(
+        db: AsyncSession,
+        storage: StorageService,
+        user_id: int,
+        original_filename: str,
+        file_result: Dict[str, Any],
+        upload_session: Optional[UploadSession] = None
+    ) -> TrackResponse:
+        """Record a stored upload: deduplicate its content, then create the track and its ingest job in one commit
+
+        An upload session being completed is marked completed in that commit
+        too. Nothing fails once it is done, so on error the caller can delete
+        the stored file knowing no track references it.
+        """
+        # Store identical content once: the file becomes a hard link to an earlier copy
+        blob_sha256 = file_result['sha256']
+        new_blob = False
+        try:
+            async with db.begin_nested():
+                new_blob = not await AudioBlobService.attach(
+                    db, storage.file_manager, file_result['filename'], blob_sha256, file_result['size']
+                )
+        except Exception as e:
+            blob_sha256 = None
+            logger.warning(f"Could not deduplicate {file_result['filename']}, keeping a private copy: {str(e)}")
+        
+        # Extract file extension from filename
+        file_extension = Path(original_filename).suffix.lower().lstrip('.')
+        
+        # Step 2: Create track record in database; duration, covers and
+        # metadata are filled in by the ingest queue
+        track_data = TrackCreate(
+            original_filename=original_filename,
+            file_path=file_result['path'],
+            file_size=file_result['size'],
+            file_type=file_extension,
+            duration=timedelta(0),
+            processing_status="processing",
+            blob_sha256=blob_sha256
+        )
+        
+        # Step 3: The track and its metadata, cover and thumbnail extraction
+        # job are committed together, so a track never exists without its job
+        try:
+            db_track, = TrackService.add_tracks(db, [track_data], user_id)
+            # Insert the track before the job referencing it: the models
+            # share no relationship the flush could order them by
+            await db.flush()
+            job, = ingest_queue.add_jobs(db, [db_track.id], user_id)
+            if upload_session is not None:
+                upload_session_service.mark_completed(upload_session, db_track.id)
+            # Load server-generated columns (upload date, timestamps) first
+            db_track, = await TrackService.get_tracks_by_ids(db, [db_track.id])
+            await db.commit()
+        except Exception as e:
+            if new_blob:
+                await AudioBlobService.discard_new_blobs(storage.file_manager, [blob_sha256])
+            await db.rollback()
+            logger.error(f"Error recording upload {file_result['filename']} for user {user_id}: {str(e)}")
+            raise
+        
+        ingest_queue.notify()
+        
+        logger.info(f"Audio upload stored for user {user_id}: track {db_track.id}, ingest job {job.id}")
+        
+        response = TrackResponse.model_validate(db_track)
+        response.processing_job_id = job.id
+        return response
+    
+    @staticmethod
+    async def check_quota(db: AsyncSession, user_id: int, file_size: int, exclude_session: Optional[UUID] = None) -> None:
+        """Raise 413 (or 400) unless the user has room for `file_size` more bytes
+
+        Space reserved by the user's unfinished upload sessions (other than
+        `exclude_session`, the one being completed) counts as used.
+        """
+        reserved = await upload_session_service.reserved_bytes(db, user_id, exclude_session)
+        quota_check = await StorageQuotaService.check_upload_allowed(db, user_id, file_size + reserved)
+        
+        if not quota_check["allowed"]:
+            reason = quota_check.get("reason", "unknown")
+            message = quota_check.get("message", "Upload not allowed")
+            
+            if reason == "insufficient_space":
+                storage_info = quota_check.get("storage_info", {})
+                available = max(0, storage_info.get("available", 0) - reserved)
+                available_formatted = StorageQuotaService.format_bytes(available)
+                file_size_formatted = StorageQuotaService.format_bytes(file_size)
                 
-                if reason == "insufficient_space":
-                    storage_info = quota_check.get("storage_info", {})
-                    available = storage_info.get("available", 0)
-                    available_formatted = StorageQuotaService.format_bytes(available)
-                    file_size_formatted = StorageQuotaService.format_bytes(file_size)
-                    
-                    logger.warning(f"Upload denied for user {user_id}: insufficient space. File: {file_size_formatted}, Available: {available_formatted}")
-                    raise HTTPException(
-                        status_code=413, 
-                        detail=f"Insufficient storage space. File size: {file_size_formatted}, Available: {available_formatted}"
-                    )
-                else:
-                    logger.error(f"Upload denied for user {user_id}: {message}")
-                    raise HTTPException(status_code=400, detail=message)
+                logger.warning(f"Upload denied for user {user_id}: insufficient space. File: {file_size_formatted}, Available: {available_formatted}")
+                raise HTTPException(
+                    status_code=413, 
+                    detail=f"Insufficient storage space. File size: {file_size_formatted}, Available: {available_formatted}"
+                )
+            else:
+                logger.error(f"Upload denied for user {user_id}: {message}")
+                raise HTTPException(status_code=400, detail=message)
+        
+        logger.info(f"Quota check passed for user {user_id}. File size: {StorageQuotaService.format_bytes(file_size)}")
+    
+    @staticmethod
+    async def preflight_audio(
+        preflight: AudioPreflightRequest,
+        user_id: int,
+        db: AsyncSession
+    ) -> AudioPreflightResponse:
+        """Create a track from already stored content with the same hash, so the upload can be skipped"""
+        try:
+            sha256 = preflight.sha256.lower()
+            if not SHA256_PATTERN.match(sha256):
+                raise HTTPException(status_code=400, detail="Invalid SHA-256 hash")
             
-            logger.info(f"Quota check passed for user {user_id}. File size: {StorageQuotaService.format_bytes(file_size)}")
+            file_extension = Path(preflight.filename).suffix.lower()
+            if file_extension not in FileManager.ALLOWED_AUDIO_EXTENSIONS:
+                raise HTTPException(status_code=400, detail=f"Unsupported audio file extension: {file_extension}")
+            
+            # The track is charged its full size, like an upload
+            await AudioHandler.check_quota(db, user_id, preflight.size)
             
-            # Step 1: Save physical file
             storage = StorageService()
-            file_result = await storage.save_audio_file(file, str(user_id))
-            
-            # Step 2: Extract metadata, duration and cover info
-            file_path = file_result.get('path')
-            metadata = file_result.get('metadata', {})
-            embedded_cover = file_result.get('embedded_cover')
-            
-            # Convert duration from seconds to timedelta
-            duration_seconds = metadata.get('duration', 0)
-            duration = timedelta(seconds=duration_seconds) if duration_seconds else timedelta(0)
-            
-            # Extract file extension from filename
-            file_extension = Path(file.filename).suffix.lower().lstrip('.')
-            
-            # Extract cover paths if available
-            cover_path = None
-            cover_thumbnail_path = None
-            
-            if embedded_cover:
-                cover_path = embedded_cover.get('path')
-                # Get the first available thumbnail (prefer medium, then large, then small)
-                thumbnails = embedded_cover.get('thumbnails', {})
-                if 'medium' in thumbnails:
-                    cover_thumbnail_path = thumbnails['medium']['path']
-                elif 'large' in thumbnails:
-                    cover_thumbnail_path = thumbnails['large']['path']
-                elif 'small' in thumbnails:
-                    cover_thumbnail_path = thumbnails['small']['path']
-            
-            # Step 3: Create track record in database
+            filename = storage.file_manager._generate_filename(preflight.filename, str(user_id))
+            
+            if not await AudioBlobService.link_existing(db, storage.file_manager, sha256, preflight.size, filename, user_id):
+                await db.rollback()
+                return AudioPreflightResponse(exists=False)
+            
             track_data = TrackCreate(
-                original_filename=file.filename,
-                file_path=file_path,
-                file_size=file.size or 0,
-                file_type=file_extension,
-                duration=duration,
-                cover_path=cover_path,
-                cover_thumbnail_path=cover_thumbnail_path
+                original_filename=preflight.filename,
+                file_path=str(storage.audio_path / filename),
+                file_size=preflight.size,
+                file_type=file_extension.lstrip('.'),
+                duration=timedelta(0),
+                processing_status="processing",
+                blob_sha256=sha256
             )
             
-            # Create track in database
-            db_track = TrackService.create_track(
-                db=db,
-                track_data=track_data,
-                user_id=user_id
-            )
+            # Metadata and covers are extracted per track, as for an upload;
+            # the track and its job are committed together
+            try:
+                db_track, = TrackService.add_tracks(db, [track_data], user_id)
+                await db.flush()
+                job, = ingest_queue.add_jobs(db, [db_track.id], user_id)
+                await db.commit()
+            except Exception:
+                await db.rollback()
+                storage.delete_file(filename, "audio")
+                raise
             
-            # Step 4: Save metadata if available
-            if metadata:
-                TrackService.save_metadata(
-                    db=db,
-                    track_id=db_track.id,
-                    metadata=metadata
-                )
+            ingest_queue.notify()
+            db_track, = await TrackService.get_tracks_by_ids(db, [db_track.id])
             
-            logger.info(f"Audio upload and database recording successful for user {user_id}: track {db_track.id}")
+            logger.info(f"Audio upload skipped for user {user_id}: track {db_track.id} shares blob {sha256}")
             
-            return db_track
+            response = TrackResponse.model_validate(db_track)
+            response.processing_job_id = job.id
+            return AudioPreflightResponse(exists=True, track=response)
             
         except HTTPException:
             raise
         except Exception as e:
-            logger.error(f"Unexpected error during audio upload {file.filename}: {str(e)}")
-            raise HTTPException(status_code=500, detail="Internal server error during audio upload")
+            logger.error(f"Unexpected error during audio preflight {preflight.filename}: {str(e)}")
+            raise HTTPException(status_code=500, detail="Internal server error during audio preflight")
     
     @staticmethod
     async def get_audio_file(
         filename: str,
         request: Request,
         user_id: int,
-        db: Session,
-        track=None
+        db: AsyncSession,
+        track=None,
+        quality: Optional[str] = None
     ):
-        """Downloads or streams an audio file with range support"""
+        """Downloads or streams an audio file (or a lower-bitrate rendition) with range support"""
         try:
-            # Update last accessed timestamp if track provided
+            # Record the access; written to the database in batches
             if track:
-                TrackService.update_last_accessed(db, track.id)
+                await access_tracker.touch(db, track.id)
             
             storage = StorageService()
             file_path = storage.get_file_path(filename, "audio")
@@ -140,9 +377,9 @@ class AudioHandler:
             
             # Generate formatted filename for download
             download_filename = filename  # Default fallback
+            metadata = {}
             if track:
                 try:
-                    metadata = {}
                     if track.track_metadata and len(track.track_metadata) > 0:
                         metadata = track.track_metadata[0].metadata_json or {}
                     
@@ -164,24 +401,25 @@ class AudioHandler:
             if not mime_type or not mime_type.startswith('audio'):
                 mime_type = 'audio/mpeg'  # Default fallback
             
-            # Check for Range header (streaming support)
-            range_header = request.headers.get('range')
+            # Rendition chosen by ?quality= or Accept; falls back to the original until it is transcoded
+            headers = {}
+            if rendition_store.enabled:
+                headers["Vary"] = "Accept"
+                headers["X-Rendition"] = "original"
+                profile = rendition_store.select_profile(quality, request.headers.get('accept'), mime_type)
+                if profile:
+                    rendition_path = rendition_store.get(filename, profile)
+                    if rendition_path:
+                        file_path = rendition_path
+                        mime_type = profile.media_type
+                        download_filename = str(Path(download_filename).with_suffix(f".{profile.extension}"))
+                        headers["X-Rendition"] = profile.name
+                    else:
+                        rendition_store.schedule(str(file_path), filename, metadata.get('bitrate'), profile.name)
             
-            if range_header:
-                # Range request for streaming (use original filename for streaming)
-                return await AudioHandler._serve_audio_range(file_path, range_header, mime_type, filename)
-            else:
-                # Full file download with formatted filename
-                logger.info(f"Audio file served (full): {filename} as {download_filename}")
-                return FileResponse(
-                    path=file_path,
-                    media_type=mime_type,
-                    filename=download_filename,
-                    headers={
-                        "Accept-Ranges": "bytes",
-                        "Content-Length": str(file_path.stat().st_size)
-                    }
-                )
+            # Conditional GET and Range requests (streaming support)
+            logger.info(f"Audio file served: {filename} as {download_filename} (range: {request.headers.get('range')})")
+            return serve_file(request, file_path, mime_type, filename=download_filename, headers=headers)
             
         except HTTPException:
             raise
@@ -190,59 +428,14 @@ class AudioHandler:
             raise HTTPException(status_code=500, detail="Error serving audio file")
     
     @staticmethod
-    async def _serve_audio_range(file_path: Path, range_header: str, mime_type: str, filename: str):
-        """Serves audio file with range support for streaming"""
-        try:
-            file_size = file_path.stat().st_size
-            
-            # Parse range header (e.g., "bytes=0-1023")
-            range_match = range_header.replace('bytes=', '').split('-')
-            start = int(range_match[0]) if range_match[0] else 0
-            end = int(range_match[1]) if range_match[1] else file_size - 1
-            
-            # Ensure valid range
-            start = max(0, start)
-            end = min(file_size - 1, end)
-            content_length = end - start + 1
-            
-            def file_generator():
-                with open(file_path, 'rb') as f:
-                    f.seek(start)
-                    remaining = content_length
-                    while remaining > 0:
-                        chunk_size = min(8192, remaining)  # 8KB chunks
-                        chunk = f.read(chunk_size)
-                        if not chunk:
-                            break
-                        remaining -= len(chunk)
-                        yield chunk
-            
-            logger.info(f"Audio file streamed: {file_path.name} (range: {start}-{end})")
-            
-            return StreamingResponse(
-                file_generator(),
-                status_code=206,  # Partial Content
-                media_type=mime_type,
-                headers={
-                    "Content-Range": f"bytes {start}-{end}/{file_size}",
-                    "Accept-Ranges": "bytes",
-                    "Content-Length": str(content_length)
-                }
-            )
-            
-        except Exception as e:
-            logger.error(f"Error streaming audio file {file_path}: {str(e)}")
-            raise HTTPException(status_code=500, detail="Error streaming audio file")
-    
-    @staticmethod
-    def delete_audio_file(filename: str, user_id: int, db: Session, track=None):
+    async def delete_audio_file(filename: str, user_id: int, db: AsyncSession, track=None):
         """Deletes an audio file and its database record"""
         try:
             logger.info(f"Audio deletion started by user {user_id}: {filename}")
             
             # Use provided track or get it from database
             if not track:
-                track = TrackService.get_track_by_filename(db, filename, user_id)
+                track = await TrackService.get_track_by_filename(db, filename, user_id)
                 if not track:
                     logger.warning(f"Track record not found in database for file: {filename}")
                     raise HTTPException(status_code=404, detail="Track not found")
@@ -256,7 +449,13 @@ class AudioHandler:
                 raise HTTPException(status_code=404, detail="Audio file not found")
             
             # Step 2: Delete database record (this will cascade to metadata)
-            TrackService.delete_track(db, track.id, user_id)
+            blob_sha256 = track.blob_sha256
+            cover_sha256 = track.cover_sha256
+            await TrackService.delete_track(db, track.id, user_id)
+            
+            # Step 3: Drop the shared content and cover if this was their last track
+            await AudioBlobService.purge_unreferenced(db, storage.file_manager, [blob_sha256])
+            await CoverBlobService.purge_unreferenced(db, storage.file_manager, [cover_sha256])
             
             logger.info(f"Audio file and database record deleted successfully: {filename}")
             return {"message": "Audio file and database record successfully deleted"}
@@ -268,12 +467,12 @@ class AudioHandler:
             raise HTTPException(status_code=500, detail="Error deleting audio file")
     
     @staticmethod
-    def delete_all_user_tracks(user_id: int, db: Session):
+    async def delete_all_user_tracks(user_id: int, db: AsyncSession):
         """Delete all tracks for the current user (both database records and files)"""
         try:
             logger.info(f"Started deleting all tracks for user {user_id}")
             
-            tracks = TrackService.get_user_tracks(db, user_id, skip=0, limit=10000)  # Get all tracks
+            tracks = await TrackService.get_user_tracks(db, user_id, skip=0, limit=10000)  # Get all tracks
             
             if not tracks:
                 logger.info(f"No tracks found for user {user_id}")
@@ -302,7 +501,11 @@ class AudioHandler:
                     logger.error(f"Error deleting file {track.file_path}: {str(e)}")
             
             # Delete all database records (will cascade to metadata and statistics)
-            deleted_db_count = TrackService.delete_all_user_tracks(db, user_id)
+            blob_hashes = [track.blob_sha256 for track in tracks]
+            cover_hashes = [track.cover_sha256 for track in tracks]
+            deleted_db_count = await TrackService.delete_all_user_tracks(db, user_id)
+            await AudioBlobService.purge_unreferenced(db, storage.file_manager, blob_hashes)
+            await CoverBlobService.purge_unreferenced(db, storage.file_manager, cover_hashes)
             
             message = f"Successfully deleted {deleted_db_count} track records from database"
             if successful_deletions > 0:
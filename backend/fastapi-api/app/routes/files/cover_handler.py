@@ -1,6 +1,8 @@
-from fastapi import HTTPException, UploadFile
-from fastapi.responses import FileResponse
+from fastapi import HTTPException, UploadFile, Request
 from app.services.storage import StorageService
+from app.services.storage.file_manager import FileManager
+from app.services.storage.thumbnail_cache import thumbnail_cache
+from .range_response import serve_file
 import logging
 import mimetypes
 
@@ -31,7 +33,7 @@ class CoverHandler:
             raise HTTPException(status_code=500, detail="Internal server error during cover upload")
     
     @staticmethod
-    def get_cover_file(filename: str):
+    def get_cover_file(filename: str, request: Request):
         """Downloads a cover picture with proper MIME type detection"""
         try:
             storage = StorageService()
@@ -47,11 +49,7 @@ class CoverHandler:
                 mime_type = 'image/jpeg'
             
             logger.info(f"Cover file served: {filename}")
-            return FileResponse(
-                path=file_path,
-                media_type=mime_type,
-                filename=filename
-            )
+            return serve_file(request, file_path, mime_type, filename=filename)
             
         except HTTPException:
             raise
@@ -60,27 +58,26 @@ class CoverHandler:
             raise HTTPException(status_code=500, detail="Error serving cover file")
     
     @staticmethod
-    def get_thumbnail(filename: str, size: str):
-        """Get a specific thumbnail size for a cover image"""
+    async def get_thumbnail(filename: str, size: str, request: Request):
+        """Get a cover thumbnail by size name or pixel size, in the format negotiated from Accept"""
         try:
             storage = StorageService()
+            thumbnail_format = thumbnail_cache.select_format(request.headers.get('accept'))
             
-            if size not in storage.THUMBNAIL_SIZES:
-                raise HTTPException(
-                    status_code=400, 
-                    detail=f"Invalid size. Available sizes: {list(storage.THUMBNAIL_SIZES.keys())}"
-                )
-            
-            thumbnail_path = storage.get_thumbnail_path(filename, size)
+            # Thumbnails written at upload are WebP
+            thumbnail_path = storage.get_thumbnail_path(filename, size) if thumbnail_format.name == 'webp' else None
             
             if not thumbnail_path:
-                raise HTTPException(status_code=404, detail="Thumbnail not found")
-            
-            logger.info(f"Thumbnail served: {filename} (size: {size})")
-            return FileResponse(
-                path=thumbnail_path,
-                media_type='image/webp',
-                filename=thumbnail_path.name
+                pixels = thumbnail_cache.resolve_size(size)
+                cover_path = storage.get_file_path(filename, "cover")
+                if not cover_path:
+                    raise HTTPException(status_code=404, detail="Cover picture not found")
+                thumbnail_path = await thumbnail_cache.get(cover_path, pixels, thumbnail_format)
+            
+            logger.info(f"Thumbnail served: {filename} (size: {size}, format: {thumbnail_format.name})")
+            return serve_file(
+                request, thumbnail_path, thumbnail_format.media_type,
+                filename=thumbnail_path.name, headers={"Vary": "Accept"}
             )
             
         except HTTPException:
@@ -96,13 +93,15 @@ class CoverHandler:
             storage = StorageService()
             thumbnails = storage.get_all_thumbnails(filename)
             
-            if not thumbnails:
+            if not thumbnails and not storage.get_file_path(filename, "cover"):
                 raise HTTPException(status_code=404, detail="No thumbnail found")
             
             logger.info(f"Available thumbnails retrieved: {filename}")
             return {
                 "base_filename": filename,
-                "thumbnails": thumbnails
+                "thumbnails": thumbnails,
+                "on_demand_sizes": thumbnail_cache.sizes,
+                "formats": list(thumbnail_cache.formats)
             }
             
         except HTTPException:
@@ -117,6 +116,10 @@ class CoverHandler:
         try:
             logger.info(f"Cover deletion started by user {user_id}: {filename} (thumbnails: {include_thumbnails})")
             
+            # Other tracks, possibly other users', may use the same embedded art
+            if FileManager.SHARED_COVER_PATTERN.match(filename):
+                raise HTTPException(status_code=409, detail="Shared covers are deleted with the last track using them")
+            
             storage = StorageService()
             deleted = storage.delete_file(filename, "cover", include_thumbnails)
             
@@ -1,20 +1,23 @@
 from fastapi import APIRouter, UploadFile, File, HTTPException, Request, Depends
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.dependencies.auth import get_current_user
-from app.database import get_db
-from app.schemas.schemas import TrackResponse, StorageInfoResponse, TrackSearchResult, MetadataUpdate, MetadataResponse
-from typing import List
+from app.database import get_async_db
+from app.schemas.schemas import TrackResponse, StorageInfoResponse, TrackSearchResult, MetadataUpdate, MetadataResponse, IngestJobResponse, AudioPreflightRequest, AudioPreflightResponse, UploadSessionCreate, UploadSessionResponse, BatchUploadResponse
+from typing import List, Optional
 from uuid import UUID
 import logging
 from uuid import UUID
 
 from .audio_handler import AudioHandler
+from .hls_handler import HLSHandler
+from .upload_session_handler import UploadSessionHandler
 from .cover_handler import CoverHandler
 from .track_search_handler import TrackSearchHandler
 from .file_security import FileSecurity
 
 from app.services.storage_quota_service import StorageQuotaService
 from app.services.metadata_edit_service import MetadataEditService
+from app.services.ingest_queue import IngestQueue
 
 logger = logging.getLogger(__name__)
 
@@ -25,59 +28,175 @@ router = APIRouter(prefix="/files", tags=["files"])
 async def upload_audio(
     file: UploadFile = File(...),
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Audio file upload with automatic database recording"""
     user_id = current_user["id"]
     return await AudioHandler.upload_audio(file, user_id, db)
 
+@router.post("/upload/audio/batch", response_model=BatchUploadResponse)
+async def upload_audio_batch(
+    files: List[UploadFile] = File(...),
+    current_user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Upload several audio files (e.g. an album) in one request, with per-file results"""
+    user_id = current_user["id"]
+    return await AudioHandler.upload_audio_batch(files, user_id, db)
+
+@router.post("/upload/audio/preflight", response_model=AudioPreflightResponse)
+async def preflight_audio(
+    preflight: AudioPreflightRequest,
+    current_user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Offer the SHA-256 of a file before uploading it
+
+    If the server already stores that content, a track is created from it and
+    returned with exists=true; otherwise upload the file as usual.
+    """
+    user_id = current_user["id"]
+    return await AudioHandler.preflight_audio(preflight, user_id, db)
+
+# Resumable uploads: create a session, PUT numbered chunks, then complete it
+@router.post("/uploads", response_model=UploadSessionResponse)
+async def create_upload_session(
+    data: UploadSessionCreate,
+    current_user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Start a resumable audio upload; the response gives the chunk size to use"""
+    user_id = current_user["id"]
+    return await UploadSessionHandler.create_session(data, user_id, db)
+
+@router.get("/uploads/{session_id}", response_model=UploadSessionResponse)
+async def get_upload_session(
+    session_id: str,
+    current_user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get the chunks received so far and the byte offset to resume from"""
+    user_id = current_user["id"]
+    return await UploadSessionHandler.get_session(session_id, user_id, db)
+
+@router.put("/uploads/{session_id}/chunks/{index}", response_model=UploadSessionResponse)
+async def put_upload_chunk(
+    session_id: str,
+    index: int,
+    request: Request,
+    current_user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Upload chunk `index` as the raw request body (retrying a chunk is safe)"""
+    user_id = current_user["id"]
+    return await UploadSessionHandler.put_chunk(session_id, index, request, user_id, db)
+
+@router.post("/uploads/{session_id}/complete", response_model=UploadSessionResponse)
+async def complete_upload_session(
+    session_id: str,
+    current_user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Assemble the uploaded chunks and create the track, as POST /files/upload/audio does"""
+    user_id = current_user["id"]
+    return await UploadSessionHandler.complete_session(session_id, user_id, db)
+
+@router.delete("/uploads/{session_id}")
+async def delete_upload_session(
+    session_id: str,
+    current_user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Abort a resumable upload"""
+    user_id = current_user["id"]
+    return await UploadSessionHandler.delete_session(session_id, user_id, db)
+
+@router.get("/jobs/{job_id}", response_model=IngestJobResponse)
+async def get_ingest_job(
+    job_id: str,
+    current_user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get the processing status of an uploaded track"""
+    user_id = current_user["id"]
+    
+    try:
+        job_uuid = UUID(job_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid job ID format")
+    
+    job = await IngestQueue.get_user_job(db, job_uuid, user_id)
+    
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    return job
+
 @router.get("/audio/{filename}")
 async def get_audio_file(
     filename: str, 
     request: Request,
+    quality: Optional[str] = None,
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Downloads or streams an audio file with range support"""
+    """Downloads or streams an audio file with range support
+
+    `quality` selects a transcoded rendition (see RENDITION_PROFILES) or "original".
+    """
     user_id = current_user["id"]
     
-    # Verify file ownership using database
-    if not FileSecurity.verify_file_ownership(filename, str(user_id), db):
+    # Authorize and load the track (with metadata for the download filename) in one query
+    track = await FileSecurity.get_user_track_by_filename(filename, user_id, db)
+    if track is None:
         logger.warning(f"User {user_id} attempted to access unauthorized audio file: {filename}")
         raise HTTPException(status_code=403, detail="Access denied: file does not belong to user")
     
-    # Get track info for enhanced download filename generation
-    track = FileSecurity.get_user_track_by_filename(filename, user_id, db)
+    return await AudioHandler.get_audio_file(filename, request, user_id, db, track, quality)
+
+@router.get("/audio/{filename}/hls/{name}")
+async def get_audio_hls(
+    filename: str,
+    name: str,
+    request: Request,
+    current_user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """HLS playlist (index.m3u8) or segment of an audio file, generated on first request"""
+    user_id = current_user["id"]
     
-    return await AudioHandler.get_audio_file(filename, request, user_id, db, track)
+    track = await FileSecurity.get_user_track_by_filename(filename, user_id, db)
+    if track is None:
+        logger.warning(f"User {user_id} attempted to access unauthorized audio file: {filename}")
+        raise HTTPException(status_code=403, detail="Access denied: file does not belong to user")
+    
+    return await HLSHandler.get_hls_file(filename, name, request, db, track)
 
 @router.delete("/audio/{filename}")
 async def delete_audio_file(
     filename: str,
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Deletes an audio file and its database record"""
     user_id = current_user["id"]
     
-    # Verify file ownership using database
-    if not FileSecurity.verify_file_ownership(filename, str(user_id), db):
+    # Authorize and load the track in one query
+    track = await FileSecurity.get_user_track_by_filename(filename, user_id, db)
+    if track is None:
         logger.warning(f"User {user_id} attempted to delete unauthorized audio file: {filename}")
         raise HTTPException(status_code=403, detail="Access denied: file does not belong to user")
     
-    # Get track info for deletion
-    track = FileSecurity.get_user_track_by_filename(filename, user_id, db)
-    
-    return AudioHandler.delete_audio_file(filename, user_id, db, track)
+    return await AudioHandler.delete_audio_file(filename, user_id, db, track)
 
 @router.delete("/tracks/all")
 async def delete_all_user_tracks(
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete all tracks for the current user (both database records and files)"""
     user_id = current_user["id"]
-    return AudioHandler.delete_all_user_tracks(user_id, db)
+    return await AudioHandler.delete_all_user_tracks(user_id, db)
 
 # Cover file operations
 @router.post("/upload/cover")
@@ -92,43 +211,45 @@ async def upload_cover(
 @router.get("/cover/{filename}")
 async def get_cover_file(
     filename: str,
+    request: Request,
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Downloads a cover picture with proper MIME type detection"""
     user_id = str(current_user["id"])
     
-    if not FileSecurity.verify_file_ownership(filename, user_id, db):
+    if not await FileSecurity.verify_file_ownership(filename, user_id, db):
         logger.warning(f"User {user_id} attempted to access unauthorized cover file: {filename}")
         raise HTTPException(status_code=403, detail="Access denied: file does not belong to user")
     
-    return CoverHandler.get_cover_file(filename)
+    return CoverHandler.get_cover_file(filename, request)
 
 @router.get("/cover/{filename}/thumbnail/{size}")
 async def get_thumbnail(
     filename: str, 
     size: str,
+    request: Request,
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Get a specific thumbnail size for a cover image"""
+    """Get a cover thumbnail by size name (small, medium, large) or pixel size (e.g. 256)"""
     user_id = str(current_user["id"])
     
-    if not FileSecurity.verify_file_ownership(filename, user_id, db):
+    if not await FileSecurity.verify_file_ownership(filename, user_id, db):
         raise HTTPException(status_code=403, detail="Access denied: file does not belong to user")
     
-    return CoverHandler.get_thumbnail(filename, size)
+    return await CoverHandler.get_thumbnail(filename, size, request)
 
 @router.get("/cover/{filename}/thumbnails")
 async def get_available_thumbnails(
     filename: str,
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get all available thumbnails for a cover image"""
     user_id = str(current_user["id"])
     
-    if not FileSecurity.verify_file_ownership(filename, user_id, db):
+    if not await FileSecurity.verify_file_ownership(filename, user_id, db):
         raise HTTPException(status_code=403, detail="Access denied: file does not belong to user")
     
     return CoverHandler.get_available_thumbnails(filename)
@@ -138,12 +259,12 @@ async def delete_cover_file(
     filename: str, 
     include_thumbnails: bool = True,
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Deletes a cover image and its thumbnails"""
     user_id = str(current_user["id"])
     
-    if not FileSecurity.verify_file_ownership(filename, user_id, db):
+    if not await FileSecurity.verify_file_ownership(filename, user_id, db):
         logger.warning(f"User {user_id} attempted to delete unauthorized cover file: {filename}")
         raise HTTPException(status_code=403, detail="Access denied: file does not belong to user")
     
@@ -155,11 +276,11 @@ async def get_user_tracks(
     skip: int = 0,
     limit: int = 100,
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get all tracks for the current user"""
     user_id = current_user["id"]
-    return TrackSearchHandler.get_user_tracks(user_id, db, skip, limit)
+    return await TrackSearchHandler.get_user_tracks(user_id, db, skip, limit)
 
 @router.get("/tracks/search", response_model=TrackSearchResult)
 async def search_tracks(
@@ -170,12 +291,12 @@ async def search_tracks(
     offset: int = 0,
     limit: int = 50,
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Search tracks for the current user"""
     user_id = current_user["id"]
     
-    return TrackSearchHandler.search_tracks(
+    return await TrackSearchHandler.search_tracks(
         user_id=user_id,
         db=db,
         query=query,
@@ -190,51 +311,51 @@ async def search_tracks(
 async def get_track_by_id(
     track_id: str,
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get a specific track by ID"""
     user_id = current_user["id"]
-    return TrackSearchHandler.get_track_by_id(user_id, track_id, db)
+    return await TrackSearchHandler.get_track_by_id(user_id, track_id, db)
 
 @router.get("/tracks/stats/summary")
 async def get_track_statistics(
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get statistics about user's tracks"""
     user_id = current_user["id"]
-    return TrackSearchHandler.get_track_statistics(user_id, db)
+    return await TrackSearchHandler.get_track_statistics(user_id, db)
 
 @router.get("/tracks/recent")
 async def get_recent_tracks(
     limit: int = 10,
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get recently uploaded tracks"""
     user_id = current_user["id"]
-    return TrackSearchHandler.get_recent_tracks(user_id, db, limit)
+    return await TrackSearchHandler.get_recent_tracks(user_id, db, limit)
 
 @router.get("/tracks/popular")
 async def get_popular_tracks(
     limit: int = 10,
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get most accessed tracks"""
     user_id = current_user["id"]
-    return TrackSearchHandler.get_popular_tracks(user_id, db, limit)
+    return await TrackSearchHandler.get_popular_tracks(user_id, db, limit)
 
 @router.get("/storage/info", response_model=StorageInfoResponse)
 async def get_storage_info(
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get current user's storage quota and usage information"""
     user_id = current_user["id"]
     
     try:
-        storage_info = StorageQuotaService.get_user_storage_info(db, user_id)
+        storage_info = await StorageQuotaService.get_user_storage_info(db, user_id)
         
         return StorageInfoResponse(
             quota=storage_info["quota"],
@@ -255,7 +376,7 @@ async def get_storage_info(
 async def get_track_metadata(
     track_id: str,
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get metadata for a specific track"""
     user_id = current_user["id"]
@@ -265,7 +386,7 @@ async def get_track_metadata(
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid track ID format")
     
-    metadata = MetadataEditService.get_track_metadata(db, track_uuid, user_id)
+    metadata = await MetadataEditService.get_track_metadata(db, track_uuid, user_id)
     
     if metadata is None:
         raise HTTPException(status_code=404, detail="Track not found or access denied")
@@ -277,7 +398,7 @@ async def update_track_metadata(
     track_id: str,
     metadata_update: MetadataUpdate,
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update metadata for a specific track (partial update)"""
     user_id = current_user["id"]
@@ -293,7 +414,7 @@ async def update_track_metadata(
         raise HTTPException(status_code=400, detail={"validation_errors": validation_errors})
     
     try:
-        updated_metadata = MetadataEditService.update_track_metadata(db, track_uuid, user_id, metadata_update)
+        updated_metadata = await MetadataEditService.update_track_metadata(db, track_uuid, user_id, metadata_update)
         
         if updated_metadata is None:
             raise HTTPException(status_code=404, detail="Track not found or access denied")
@@ -1,59 +1,65 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import and_, or_, select, exists
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.models import Track, CoverKey
 from app.services.track_service import TrackService
 import logging
+import os
 
 logger = logging.getLogger(__name__)
 
+# Opt-in, only while scripts/migrate_storage_keys.sh has not filled cover_keys
+# yet: files missing from the lookup are accepted when named after the user
+# ({user_id}_...), as stored files were before the keys existed. Turn it off
+# once the migration has run: it also accepts files whose track was deleted
+FILE_OWNERSHIP_LEGACY_FALLBACK = os.getenv("FILE_OWNERSHIP_LEGACY_FALLBACK", "false").lower() == "true"
+
 class FileSecurity:
     """Service for file security and ownership verification"""
     
     @staticmethod
-    def verify_file_ownership(filename: str, user_id: int, db: Session = None) -> bool:
+    async def verify_file_ownership(filename: str, user_id: int, db: AsyncSession = None) -> bool:
         """Verify that a file belongs to the specified user"""
         try:
             if db is None:
                 return False
             
-            # Check if the track exists for this user (for audio files)
-            track = TrackService.get_track_by_filename(db, filename, user_id)
-            if track is not None:
-                return True
+            # Callers may pass the id as a string; asyncpg does not coerce types
+            user_id = int(user_id)
             
-            # Check if this is a cover file by looking at cover_path and cover_thumbnail_path
-            from app.models.models import Track
-            from sqlalchemy import and_, or_
+            # Audio filename or registered cover/thumbnail filename, both
+            # unique-index lookups, in one round trip
+            owned = await db.scalar(
+                select(or_(
+                    exists().where(and_(Track.storage_key == filename, Track.user_id == user_id)),
+                    exists().where(and_(CoverKey.key == filename, CoverKey.user_id == user_id))
+                ))
+            )
             
-            cover_track = db.query(Track).filter(
-                and_(
-                    Track.user_id == user_id,
-                    or_(
-                        Track.cover_path.contains(filename),
-                        Track.cover_thumbnail_path.contains(filename)
-                    )
-                )
-            ).first()
+            if not owned and FILE_OWNERSHIP_LEGACY_FALLBACK and filename.startswith(f"{user_id}_"):
+                logger.warning(f"File {filename} not registered, accepted for user {user_id} by its name prefix (FILE_OWNERSHIP_LEGACY_FALLBACK)")
+                return True
             
-            return cover_track is not None
+            return bool(owned)
             
         except Exception as e:
             logger.error(f"Error verifying file ownership: {str(e)}")
             return False
     
     @staticmethod
-    def verify_track_ownership(track_id: str, user_id: int, db: Session) -> bool:
+    async def verify_track_ownership(track_id: str, user_id: int, db: AsyncSession) -> bool:
         """Verify that a track belongs to the specified user"""
         try:
-            track = TrackService.get_track_by_id(db, track_id, user_id)
+            track = await TrackService.get_track_by_id(db, track_id, user_id)
             return track is not None
         except Exception as e:
             logger.error(f"Error verifying track ownership: {str(e)}")
             return False
     
     @staticmethod
-    def get_user_track_by_filename(filename: str, user_id: int, db: Session):
-        """Get track by filename for a specific user"""
+    async def get_user_track_by_filename(filename: str, user_id: int, db: AsyncSession):
+        """Get track by filename for a specific user; None also means access denied"""
         try:
-            return TrackService.get_track_by_filename(db, filename, user_id)
+            return await TrackService.get_track_by_filename(db, filename, user_id)
         except Exception as e:
             logger.error(f"Error getting track by filename: {str(e)}")
             return None
@@ -0,0 +1,60 @@
+from fastapi import HTTPException, Request
+from fastapi.responses import Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.services.access_tracker import access_tracker
+from app.services.storage import StorageService
+from app.services.storage.hls import hls_store, PLAYLIST_NAME, SEGMENT_PATTERN
+from .range_response import serve_file
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+class HLSHandler:
+    """Handler for HLS playlists and segments of audio files"""
+
+    @staticmethod
+    async def get_hls_file(filename: str, name: str, request: Request, db: AsyncSession, track=None):
+        """Serve the HLS playlist or a segment of a track, generating them on first use"""
+        try:
+            if not hls_store.enabled:
+                raise HTTPException(status_code=404, detail="HLS output is not enabled")
+
+            if name == PLAYLIST_NAME:
+                media_type = "application/vnd.apple.mpegurl"
+            elif SEGMENT_PATTERN.match(name):
+                media_type = "video/mp2t"
+            else:
+                raise HTTPException(status_code=404, detail="HLS file not found")
+
+            # Playback counts as an access, as range requests do on the audio
+            # endpoint (written to the database in batches)
+            if track:
+                await access_tracker.touch(db, track.id)
+
+            storage = StorageService()
+            source_path = storage.get_file_path(filename, "audio")
+            if not source_path:
+                logger.warning(f"Audio file not found: {filename}")
+                raise HTTPException(status_code=404, detail="Audio file not found")
+
+            try:
+                path, complete = await hls_store.get_file(source_path, filename, name)
+            except FileNotFoundError:
+                raise HTTPException(status_code=404, detail="HLS segment not found")
+            except TimeoutError:
+                # ffmpeg slots are all busy; players retry
+                raise HTTPException(status_code=503, detail="HLS stream is being prepared", headers={"Retry-After": "2"})
+
+            if name == PLAYLIST_NAME and not complete:
+                # Still growing: no validators, players reload it until EXT-X-ENDLIST
+                playlist = await asyncio.to_thread(hls_store.partial_playlist, path)
+                return Response(content=playlist, media_type=media_type, headers={"Cache-Control": "no-store"})
+
+            return serve_file(request, path, media_type)
+
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"Error serving HLS file {name} for {filename}: {str(e)}")
+            raise HTTPException(status_code=500, detail="Error serving HLS stream")
@@ -0,0 +1,313 @@
+import asyncio
+import logging
+import os
+import re
+from email.utils import formatdate, parsedate_to_datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import quote
+from uuid import uuid4
+from fastapi import HTTPException, Request
+from starlette.responses import Response
+from starlette.types import Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+# Read size when the API sends file bytes itself; each chunk is one threadpool hop.
+# Zero-copy transfer comes from ACCEL_REDIRECT_ENABLED: nginx sends the file
+# with sendfile(2) and no bytes pass through Python.
+STREAM_CHUNK_SIZE = int(os.getenv("STREAM_CHUNK_SIZE", str(256 * 1024)))
+
+# More ranges than this (after merging overlaps) are answered with the whole file
+MAX_RANGES = 16
+
+# Files are revalidated on every use; unchanged ones come back as 304
+CACHE_CONTROL = "private, no-cache"
+
+# X-Accel-Redirect offload: after auth checks the API only names the file and
+# nginx sends it from an internal location aliasing STORAGE_PATH. Requires
+# every file request to come through nginx.
+ACCEL_REDIRECT_ENABLED = os.getenv("ACCEL_REDIRECT_ENABLED", "false").lower() == "true"
+ACCEL_REDIRECT_PREFIX = os.getenv("ACCEL_REDIRECT_PREFIX", "/_storage/")
+STORAGE_PATH = Path(os.getenv("STORAGE_PATH", "/storage"))
+
+_RANGE_SPEC = re.compile(r"^\s*(\d*)\s*-\s*(\d*)\s*$")
+
+class FileRangeResponse(Response):
+    """206 response for a byte range of a file
+
+    The range is read with pread in STREAM_CHUNK_SIZE chunks off the event
+    loop. With `partial=False` the whole file is sent as a plain 200.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        start: int,
+        end: int,
+        file_size: int,
+        media_type: str,
+        headers: Optional[Dict[str, str]] = None,
+        chunk_size: int = STREAM_CHUNK_SIZE,
+        partial: bool = True
+    ):
+        self.path = path
+        self.start = start
+        self.content_length = end - start + 1
+        self.chunk_size = chunk_size
+
+        response_headers = {
+            **(headers or {}),
+            "Accept-Ranges": "bytes",
+            "Content-Length": str(self.content_length)
+        }
+        if partial:
+            response_headers["Content-Range"] = f"bytes {start}-{end}/{file_size}"
+
+        super().__init__(status_code=206 if partial else 200, media_type=media_type, headers=response_headers)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+
+        if scope.get("method", "GET").upper() == "HEAD" or self.content_length == 0:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+
+        file = await asyncio.to_thread(open, self.path, "rb")
+        try:
+            await _send_file_chunks(file.fileno(), self.start, self.content_length, self.chunk_size, send, True)
+        except OSError as e:
+            # Client went away mid-stream
+            logger.info(f"Range transfer of {self.path.name} interrupted: {str(e)}")
+        finally:
+            file.close()
+
+class MultipartRangeResponse(Response):
+    """206 multipart/byteranges response carrying several ranges of one file"""
+
+    def __init__(
+        self,
+        path: Path,
+        ranges: List[Tuple[int, int]],
+        file_size: int,
+        media_type: str,
+        headers: Optional[Dict[str, str]] = None,
+        chunk_size: int = STREAM_CHUNK_SIZE
+    ):
+        self.path = path
+        self.chunk_size = chunk_size
+
+        boundary = uuid4().hex
+        self.parts = [
+            (
+                f"--{boundary}\r\nContent-Type: {media_type}\r\n"
+                f"Content-Range: bytes {start}-{end}/{file_size}\r\n\r\n".encode("latin-1"),
+                start,
+                end - start + 1
+            )
+            for start, end in ranges
+        ]
+        self.closing = f"--{boundary}--\r\n".encode("latin-1")
+
+        content_length = sum(len(header) + length + 2 for header, _, length in self.parts) + len(self.closing)
+        super().__init__(
+            status_code=206,
+            media_type=f"multipart/byteranges; boundary={boundary}",
+            headers={**(headers or {}), "Accept-Ranges": "bytes", "Content-Length": str(content_length)}
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+
+        if scope.get("method", "GET").upper() == "HEAD":
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+
+        file = await asyncio.to_thread(open, self.path, "rb")
+        try:
+            for header, start, length in self.parts:
+                await send({"type": "http.response.body", "body": header, "more_body": True})
+                await _send_file_chunks(file.fileno(), start, length, self.chunk_size, send, False)
+                await send({"type": "http.response.body", "body": b"\r\n", "more_body": True})
+            await send({"type": "http.response.body", "body": self.closing, "more_body": False})
+        except OSError as e:
+            logger.info(f"Multi-range transfer of {self.path.name} interrupted: {str(e)}")
+        finally:
+            file.close()
+
+async def _send_file_chunks(fd: int, offset: int, length: int, chunk_size: int, send: Send, last: bool) -> None:
+    """Send `length` bytes from `offset` as body messages; `last` ends the response"""
+    remaining = length
+
+    while remaining > 0:
+        chunk = await asyncio.to_thread(os.pread, fd, min(chunk_size, remaining), offset)
+        if not chunk:
+            break
+        offset += len(chunk)
+        remaining -= len(chunk)
+        await send({"type": "http.response.body", "body": chunk, "more_body": not last or remaining > 0})
+
+    if remaining > 0 and last:
+        # File shrank underneath us: end the body rather than hang the client
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+def parse_range_header(range_header: str, file_size: int) -> Optional[List[Tuple[int, int]]]:
+    """Parse a Range header into sorted, merged (start, end) byte ranges (RFC 9110 §14.1.2)
+
+    Returns None when the header is not a valid bytes range set, in which
+    case it must be ignored. Raises a 416 HTTPException when it is valid but
+    no range overlaps the file.
+    """
+    unit, _, range_set = range_header.partition("=")
+    if unit.strip().lower() != "bytes" or not range_set.strip():
+        return None
+
+    ranges = []
+    for spec in range_set.split(","):
+        if not spec.strip():
+            continue
+        match = _RANGE_SPEC.match(spec)
+        if not match or not (match.group(1) or match.group(2)):
+            return None
+
+        first, last = match.groups()
+        if not first:
+            # Suffix range: the last N bytes
+            suffix_length = int(last)
+            if suffix_length == 0 or file_size == 0:
+                continue
+            ranges.append((max(0, file_size - suffix_length), file_size - 1))
+            continue
+
+        start = int(first)
+        if last and int(last) < start:
+            return None
+        if start >= file_size:
+            continue
+        ranges.append((start, min(int(last), file_size - 1) if last else file_size - 1))
+
+    if not ranges:
+        raise HTTPException(
+            status_code=416,
+            detail="Requested range not satisfiable",
+            headers={"Content-Range": f"bytes */{file_size}"}
+        )
+
+    # Merge overlapping and adjacent ranges so clients cannot amplify reads
+    ranges.sort()
+    merged = [ranges[0]]
+    for start, end in ranges[1:]:
+        last_start, last_end = merged[-1]
+        if start <= last_end + 1:
+            merged[-1] = (last_start, max(last_end, end))
+        else:
+            merged.append((start, end))
+    return merged
+
+def file_validators(stat_result: os.stat_result) -> Tuple[str, str]:
+    """Strong ETag and Last-Modified for a stored file"""
+    etag = f'"{stat_result.st_mtime_ns:x}-{stat_result.st_size:x}"'
+    return etag, formatdate(stat_result.st_mtime, usegmt=True)
+
+def _etag_matches(header: str, etag: str, weak: bool) -> bool:
+    """Compare an If-Match / If-None-Match list against our ETag"""
+    if header.strip() == "*":
+        return True
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            if not weak:
+                continue
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+def _not_modified_since(header: str, mtime: float) -> bool:
+    try:
+        return int(mtime) <= parsedate_to_datetime(header).timestamp()
+    except (TypeError, ValueError):
+        return False
+
+def content_disposition(filename: str, disposition: str = "attachment") -> str:
+    quoted = quote(filename)
+    if quoted != filename:
+        return f"{disposition}; filename*=utf-8''{quoted}"
+    return f'{disposition}; filename="{filename}"'
+
+def accel_redirect_uri(file_path: Path) -> Optional[str]:
+    """Internal nginx URI for a stored file, or None if it lies outside STORAGE_PATH"""
+    try:
+        relative = file_path.resolve().relative_to(STORAGE_PATH.resolve())
+    except ValueError:
+        return None
+    return ACCEL_REDIRECT_PREFIX.rstrip("/") + "/" + quote(relative.as_posix())
+
+def serve_file(
+    request: Request,
+    file_path: Path,
+    media_type: str,
+    filename: Optional[str] = None,
+    headers: Optional[Dict[str, str]] = None
+) -> Response:
+    """Serve a stored file with conditional GET and byte range support (RFC 9110 §13, §14)
+
+    With ACCEL_REDIRECT_ENABLED, returns an empty response naming the file in
+    X-Accel-Redirect; nginx then handles validators, ranges and the transfer.
+    """
+    if ACCEL_REDIRECT_ENABLED:
+        internal_uri = accel_redirect_uri(file_path)
+        if internal_uri:
+            accel_headers = {**(headers or {}), "X-Accel-Redirect": internal_uri, "Cache-Control": CACHE_CONTROL}
+            if filename:
+                accel_headers["Content-Disposition"] = content_disposition(filename)
+            return Response(media_type=media_type, headers=accel_headers)
+        logger.warning(f"Cannot offload {file_path} outside {STORAGE_PATH}, serving directly")
+
+    stat_result = file_path.stat()
+    file_size = stat_result.st_size
+    etag, last_modified = file_validators(stat_result)
+
+    response_headers = {
+        **(headers or {}),
+        "ETag": etag,
+        "Last-Modified": last_modified,
+        "Cache-Control": CACHE_CONTROL
+    }
+    if filename:
+        response_headers["Content-Disposition"] = content_disposition(filename)
+
+    # Preconditions in RFC 9110 §13.2.2 order
+    if_match = request.headers.get("if-match")
+    if if_match is not None:
+        if not _etag_matches(if_match, etag, weak=False):
+            raise HTTPException(status_code=412, detail="Precondition failed")
+    else:
+        if_unmodified_since = request.headers.get("if-unmodified-since")
+        if if_unmodified_since is not None and not _not_modified_since(if_unmodified_since, stat_result.st_mtime):
+            raise HTTPException(status_code=412, detail="Precondition failed")
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        not_modified = _etag_matches(if_none_match, etag, weak=True)
+    else:
+        if_modified_since = request.headers.get("if-modified-since")
+        not_modified = if_modified_since is not None and _not_modified_since(if_modified_since, stat_result.st_mtime)
+    if not_modified:
+        return Response(status_code=304, headers={
+            key: value for key, value in response_headers.items() if key != "Content-Disposition"
+        })
+
+    range_header = request.headers.get("range")
+    if range_header:
+        if_range = request.headers.get("if-range")
+        # If-Range: serve the range only if the client's copy is current, else the whole file
+        if if_range is None or if_range.strip() in (etag, last_modified):
+            ranges = parse_range_header(range_header, file_size)
+            if ranges and len(ranges) == 1:
+                start, end = ranges[0]
+                return FileRangeResponse(file_path, start, end, file_size, media_type, response_headers)
+            if ranges and len(ranges) <= MAX_RANGES:
+                return MultipartRangeResponse(file_path, ranges, file_size, media_type, response_headers)
+
+    return FileRangeResponse(file_path, 0, file_size - 1, file_size, media_type, response_headers, partial=False)
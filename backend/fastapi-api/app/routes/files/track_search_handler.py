@@ -1,5 +1,5 @@
 from fastapi import HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.services.track_service import TrackService
 from app.schemas.schemas import TrackResponse, TrackSearchResult
 from typing import List
@@ -11,10 +11,10 @@ class TrackSearchHandler:
     """Handler for track search and listing operations"""
     
     @staticmethod
-    def get_user_tracks(user_id: int, db: Session, skip: int = 0, limit: int = 100) -> List[TrackResponse]:
+    async def get_user_tracks(user_id: int, db: AsyncSession, skip: int = 0, limit: int = 100) -> List[TrackResponse]:
         """Get all tracks for the current user"""
         try:
-            tracks = TrackService.get_user_tracks(db, user_id, skip, limit)
+            tracks = await TrackService.get_user_tracks(db, user_id, skip, limit)
             
             logger.info(f"Retrieved {len(tracks)} tracks for user {user_id}")
             return tracks
@@ -24,9 +24,9 @@ class TrackSearchHandler:
             raise HTTPException(status_code=500, detail="Error retrieving tracks")
     
     @staticmethod
-    def search_tracks(
+    async def search_tracks(
         user_id: int,
-        db: Session,
+        db: AsyncSession,
         query: str = None,
         search_in_filename: bool = True,
         search_in_metadata: bool = True,
@@ -54,7 +54,7 @@ class TrackSearchHandler:
                     )
             
             # Search tracks
-            search_result = TrackService.search_tracks(
+            search_result = await TrackService.search_tracks(
                 db=db,
                 user_id=user_id,
                 search_query=query,
@@ -76,10 +76,10 @@ class TrackSearchHandler:
             raise HTTPException(status_code=500, detail="Error searching tracks")
     
     @staticmethod
-    def get_track_by_id(user_id: int, track_id: str, db: Session):
+    async def get_track_by_id(user_id: int, track_id: str, db: AsyncSession):
         """Get a specific track by ID for the user"""
         try:
-            track = TrackService.get_track_by_id(db, track_id, user_id)
+            track = await TrackService.get_track_by_id(db, track_id, user_id)
             
             if not track:
                 raise HTTPException(status_code=404, detail="Track not found")
@@ -94,10 +94,10 @@ class TrackSearchHandler:
             raise HTTPException(status_code=500, detail="Error retrieving track")
     
     @staticmethod
-    def get_track_statistics(user_id: int, db: Session):
+    async def get_track_statistics(user_id: int, db: AsyncSession):
         """Get statistics about user's tracks"""
         try:
-            stats = TrackService.get_user_track_statistics(db, user_id)
+            stats = await TrackService.get_user_track_statistics(db, user_id)
             
             logger.info(f"Track statistics retrieved for user {user_id}")
             return stats
@@ -107,10 +107,10 @@ class TrackSearchHandler:
             raise HTTPException(status_code=500, detail="Error retrieving track statistics")
     
     @staticmethod
-    def get_recent_tracks(user_id: int, db: Session, limit: int = 10):
+    async def get_recent_tracks(user_id: int, db: AsyncSession, limit: int = 10):
         """Get recently uploaded tracks for the user"""
         try:
-            tracks = TrackService.get_recent_tracks(db, user_id, limit)
+            tracks = await TrackService.get_recent_tracks(db, user_id, limit)
             
             logger.info(f"Retrieved {len(tracks)} recent tracks for user {user_id}")
             return tracks
@@ -120,10 +120,10 @@ class TrackSearchHandler:
             raise HTTPException(status_code=500, detail="Error retrieving recent tracks")
     
     @staticmethod
-    def get_popular_tracks(user_id: int, db: Session, limit: int = 10):
+    async def get_popular_tracks(user_id: int, db: AsyncSession, limit: int = 10):
         """Get most accessed tracks for the user"""
         try:
-            tracks = TrackService.get_popular_tracks(db, user_id, limit)
+            tracks = await TrackService.get_popular_tracks(db, user_id, limit)
             
             logger.info(f"Retrieved {len(tracks)} popular tracks for user {user_id}")
             return tracks
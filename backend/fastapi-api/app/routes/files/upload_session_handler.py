@@ -0,0 +1,130 @@
+from fastapi import HTTPException, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.services.storage import StorageService
+from app.services.storage.file_manager import FileManager
+from app.services.track_service import TrackService
+from app.services.upload_session_service import upload_session_service
+from app.schemas.schemas import TrackResponse, UploadSessionCreate, UploadSessionResponse
+from .audio_handler import AudioHandler
+from pathlib import Path
+from uuid import UUID
+import logging
+
+logger = logging.getLogger(__name__)
+
+class UploadSessionHandler:
+    """Handler for resumable audio uploads (sessions, chunks, completion)"""
+
+    @staticmethod
+    async def _get_session(db: AsyncSession, session_id: str, user_id: int):
+        try:
+            session_uuid = UUID(session_id)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid upload session ID format")
+
+        session = await upload_session_service.get_user_session(db, session_uuid, user_id)
+        if session is None:
+            raise HTTPException(status_code=404, detail="Upload session not found")
+        return session
+
+    @staticmethod
+    async def create_session(data: UploadSessionCreate, user_id: int, db: AsyncSession) -> UploadSessionResponse:
+        """Open a resumable upload after checking the file type and quota"""
+        try:
+            file_extension = Path(data.filename).suffix.lower()
+            if file_extension not in FileManager.ALLOWED_AUDIO_EXTENSIONS:
+                raise HTTPException(status_code=400, detail=f"Unsupported audio file extension: {file_extension}")
+            if data.size <= 0:
+                raise HTTPException(status_code=400, detail="File size must be positive")
+
+            await upload_session_service.check_capacity(db, user_id)
+            await AudioHandler.check_quota(db, user_id, data.size)
+
+            session = await upload_session_service.create(db, user_id, data.filename, data.size, data.content_type)
+            return UploadSessionResponse(**upload_session_service.describe(session))
+
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"Error creating upload session for {data.filename}: {str(e)}")
+            raise HTTPException(status_code=500, detail="Error creating upload session")
+
+    @staticmethod
+    async def get_session(session_id: str, user_id: int, db: AsyncSession) -> UploadSessionResponse:
+        """Upload progress: stored chunks and the offset to resume from"""
+        session = await UploadSessionHandler._get_session(db, session_id, user_id)
+        return UploadSessionResponse(**upload_session_service.describe(session))
+
+    @staticmethod
+    async def put_chunk(session_id: str, index: int, request: Request, user_id: int, db: AsyncSession) -> UploadSessionResponse:
+        """Store one chunk from the raw request body; repeating a PUT replaces the chunk"""
+        session = await UploadSessionHandler._get_session(db, session_id, user_id)
+        try:
+            await upload_session_service.write_chunk(db, session, index, request.stream())
+            return UploadSessionResponse(**upload_session_service.describe(session))
+
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"Error storing chunk {index} of upload session {session_id}: {str(e)}")
+            raise HTTPException(status_code=500, detail="Error storing upload chunk")
+
+    @staticmethod
+    async def complete_session(session_id: str, user_id: int, db: AsyncSession) -> UploadSessionResponse:
+        """Assemble the chunks into the audio file and create its track (idempotent once completed)"""
+        session = await UploadSessionHandler._get_session(db, session_id, user_id)
+
+        if session.status == 'completed':
+            track = await TrackService.get_track_by_id(db, session.track_id, user_id) if session.track_id else None
+            return UploadSessionResponse(
+                **upload_session_service.describe(session),
+                track=TrackResponse.model_validate(track) if track else None
+            )
+
+        received = upload_session_service.received_chunks(session)
+        missing = sorted(set(range(upload_session_service.total_chunks(session))) - set(received))
+        if missing:
+            raise HTTPException(status_code=409, detail={"message": "Upload incomplete", "missing_chunks": missing[:100]})
+
+        # Other uploads may have used the space since the session was opened;
+        # its own reservation is not counted twice
+        await AudioHandler.check_quota(db, user_id, session.total_size, exclude_session=session.id)
+
+        if not await upload_session_service.begin_assembly(db, session):
+            raise HTTPException(status_code=409, detail="Upload session is already being completed")
+
+        # Read before anything can roll back (and expire) the session object
+        session_uuid = session.id
+        storage = StorageService()
+        file_result = None
+        try:
+            file_result = await storage.file_manager.save_audio_parts(
+                [upload_session_service.chunk_path(session, index) for index in received],
+                session.original_filename,
+                str(user_id),
+                session.content_type
+            )
+            track = await AudioHandler.create_uploaded_track(
+                db, storage, user_id, session.original_filename, file_result, upload_session=session
+            )
+        except Exception as e:
+            logger.error(f"Error completing upload session {session_id}: {str(e)}")
+            if file_result:
+                storage.delete_file(file_result['filename'], "audio")
+            # Nothing was committed and chunks are kept: the client can retry the completion
+            await upload_session_service.reopen(session_uuid)
+            raise HTTPException(status_code=500, detail="Error completing upload")
+
+        await upload_session_service.finish_assembly(session)
+        logger.info(f"Upload session {session_id} completed for user {user_id}: track {track.id}")
+        return UploadSessionResponse(**upload_session_service.describe(session), track=track)
+
+    @staticmethod
+    async def delete_session(session_id: str, user_id: int, db: AsyncSession):
+        """Abort a resumable upload and discard its chunks"""
+        session = await UploadSessionHandler._get_session(db, session_id, user_id)
+        if session.status == 'assembling':
+            raise HTTPException(status_code=409, detail="Upload session is being completed")
+
+        await upload_session_service.delete(db, session)
+        return {"message": "Upload session deleted"}
@@ -1,8 +1,8 @@
 from fastapi import APIRouter, HTTPException, Depends
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.services.playlist_service import PlaylistService
 from app.dependencies.auth import get_current_user
-from app.database import get_db
+from app.database import get_async_db
 from app.schemas.schemas import PlaylistCreate, PlaylistResponse
 from typing import List
 import logging
@@ -20,12 +20,12 @@ class PlaylistCrudRoutes:
         async def create_playlist(
             playlist_data: PlaylistCreate,
             current_user: dict = Depends(get_current_user),
-            db: Session = Depends(get_db)
+            db: AsyncSession = Depends(get_async_db)
         ) -> PlaylistResponse:
             try:
                 user_id = current_user["id"]
                 
-                playlist = PlaylistService.create_playlist(db, playlist_data, user_id)
+                playlist = await PlaylistService.create_playlist(db, playlist_data, user_id)
                 logger.info(f"Playlist created: {playlist.id} for user {user_id}")
                 
                 return playlist
@@ -42,7 +42,7 @@ class PlaylistCrudRoutes:
             skip: int = 0,
             limit: int = 100,
             current_user: dict = Depends(get_current_user),
-            db: Session = Depends(get_db)
+            db: AsyncSession = Depends(get_async_db)
         ) -> List[PlaylistResponse]:
             try:
                 user_id = current_user["id"]
@@ -53,7 +53,7 @@ class PlaylistCrudRoutes:
                 if limit < 1 or limit > 100:
                     raise HTTPException(status_code=400, detail="Limit must be between 1 and 100")
                 
-                playlists = PlaylistService.get_user_playlists(db, user_id, skip, limit)
+                playlists = await PlaylistService.get_user_playlists(db, user_id, skip, limit)
                 logger.info(f"Retrieved {len(playlists)} playlists for user {user_id}")
                 
                 return playlists
@@ -71,13 +71,13 @@ class PlaylistCrudRoutes:
         async def get_playlist(
             playlist_id: str,
             current_user: dict = Depends(get_current_user),
-            db: Session = Depends(get_db)
+            db: AsyncSession = Depends(get_async_db)
         ) -> PlaylistResponse:
             try:
                 user_id = current_user["id"]
                 playlist_uuid = PlaylistValidation.validate_playlist_id(playlist_id)
                 
-                playlist = PlaylistService.get_playlist_by_id(db, playlist_uuid, user_id)
+                playlist = await PlaylistService.get_playlist_by_id(db, playlist_uuid, user_id)
                 
                 if not playlist:
                     PlaylistValidation.handle_playlist_not_found(playlist_id)
@@ -98,13 +98,13 @@ class PlaylistCrudRoutes:
             playlist_id: str,
             playlist_data: PlaylistCreate,
             current_user: dict = Depends(get_current_user),
-            db: Session = Depends(get_db)
+            db: AsyncSession = Depends(get_async_db)
         ) -> PlaylistResponse:
             try:
                 user_id = current_user["id"]
                 playlist_uuid = PlaylistValidation.validate_playlist_id(playlist_id)
                 
-                playlist = PlaylistService.update_playlist(db, playlist_uuid, playlist_data, user_id)
+                playlist = await PlaylistService.update_playlist(db, playlist_uuid, playlist_data, user_id)
                 
                 if not playlist:
                     PlaylistValidation.handle_playlist_not_found(playlist_id)
@@ -125,13 +125,13 @@ class PlaylistCrudRoutes:
         async def delete_playlist(
             playlist_id: str,
             current_user: dict = Depends(get_current_user),
-            db: Session = Depends(get_db)
+            db: AsyncSession = Depends(get_async_db)
         ):
             try:
                 user_id = current_user["id"]
                 playlist_uuid = PlaylistValidation.validate_playlist_id(playlist_id)
                 
-                deleted = PlaylistService.delete_playlist(db, playlist_uuid, user_id)
+                deleted = await PlaylistService.delete_playlist(db, playlist_uuid, user_id)
                 
                 if not deleted:
                     PlaylistValidation.handle_playlist_not_found(playlist_id)
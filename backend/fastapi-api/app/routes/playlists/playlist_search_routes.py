@@ -1,8 +1,8 @@
 from fastapi import APIRouter, HTTPException, Depends, Query
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.services.playlist_service import PlaylistService
 from app.dependencies.auth import get_current_user
-from app.database import get_db
+from app.database import get_async_db
 from app.schemas.schemas import PlaylistSearchResult
 import logging
 
@@ -23,7 +23,7 @@ class PlaylistSearchRoutes:
             limit: int = Query(50, ge=1, le=100, description="Maximum results"),
             offset: int = Query(0, ge=0, description="Results offset"),
             current_user: dict = Depends(get_current_user),
-            db: Session = Depends(get_db)
+            db: AsyncSession = Depends(get_async_db)
         ) -> PlaylistSearchResult:
             try:
                 user_id = current_user["id"]
@@ -31,7 +31,7 @@ class PlaylistSearchRoutes:
                 # Validate search parameters
                 query, limit, offset = PlaylistValidation.validate_search_params(query, limit, offset)
                 
-                playlists, total = PlaylistService.search_playlists(
+                playlists, total = await PlaylistService.search_playlists(
                     db, user_id, query, search_in_tracks, search_in_description, limit, offset
                 )
                 
@@ -59,7 +59,7 @@ class PlaylistSearchRoutes:
             query: str = Query(..., min_length=2, description="Partial playlist name"),
             limit: int = Query(5, ge=1, le=10),
             current_user: dict = Depends(get_current_user),
-            db: Session = Depends(get_db)
+            db: AsyncSession = Depends(get_async_db)
         ):
             try:
                 user_id = current_user["id"]
@@ -71,7 +71,7 @@ class PlaylistSearchRoutes:
                 if limit < 1 or limit > 10:
                     raise HTTPException(status_code=400, detail="Limit must be between 1 and 10")
                 
-                suggestions = PlaylistService.get_playlist_suggestions(db, user_id, query, limit)
+                suggestions = await PlaylistService.get_playlist_suggestions(db, user_id, query, limit)
                 
                 logger.info(f"Generated {len(suggestions)} suggestions for query '{query}' for user {user_id}")
                 return {"suggestions": suggestions}
@@ -89,12 +89,12 @@ class PlaylistSearchRoutes:
         async def get_recent_playlists(
             limit: int = Query(10, ge=1, le=50, description="Maximum results"),
             current_user: dict = Depends(get_current_user),
-            db: Session = Depends(get_db)
+            db: AsyncSession = Depends(get_async_db)
         ):
             try:
                 user_id = current_user["id"]
                 
-                playlists = PlaylistService.get_recent_playlists(db, user_id, limit)
+                playlists = await PlaylistService.get_recent_playlists(db, user_id, limit)
                 
                 logger.info(f"Retrieved {len(playlists)} recent playlists for user {user_id}")
                 return {"playlists": playlists, "total": len(playlists)}
@@ -110,12 +110,12 @@ class PlaylistSearchRoutes:
         async def get_popular_playlists(
             limit: int = Query(10, ge=1, le=50, description="Maximum results"),
             current_user: dict = Depends(get_current_user),
-            db: Session = Depends(get_db)
+            db: AsyncSession = Depends(get_async_db)
         ):
             try:
                 user_id = current_user["id"]
                 
-                playlists = PlaylistService.get_popular_playlists(db, user_id, limit)
+                playlists = await PlaylistService.get_popular_playlists(db, user_id, limit)
                 
                 logger.info(f"Retrieved {len(playlists)} popular playlists for user {user_id}")
                 return {"playlists": playlists, "total": len(playlists)}
@@ -1,8 +1,8 @@
 from fastapi import APIRouter, HTTPException, Depends, Query
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.services.playlist_service import PlaylistService
 from app.dependencies.auth import get_current_user
-from app.database import get_db
+from app.database import get_async_db
 from typing import List
 import logging
 
@@ -21,7 +21,7 @@ class PlaylistTrackRoutes:
             track_id: str,
             position: int = None,
             current_user: dict = Depends(get_current_user),
-            db: Session = Depends(get_db)
+            db: AsyncSession = Depends(get_async_db)
         ):
             try:
                 user_id = current_user["id"]
@@ -32,7 +32,7 @@ class PlaylistTrackRoutes:
                 if position is not None and position < 0:
                     raise HTTPException(status_code=400, detail="Position must be non-negative")
                 
-                success = PlaylistService.add_track_to_playlist(
+                success = await PlaylistService.add_track_to_playlist(
                     db, playlist_uuid, track_uuid, user_id, position
                 )
                 
@@ -59,14 +59,14 @@ class PlaylistTrackRoutes:
             playlist_id: str,
             track_id: str,
             current_user: dict = Depends(get_current_user),
-            db: Session = Depends(get_db)
+            db: AsyncSession = Depends(get_async_db)
         ):
             try:
                 user_id = current_user["id"]
                 playlist_uuid = PlaylistValidation.validate_playlist_id(playlist_id)
                 track_uuid = PlaylistValidation.validate_track_id(track_id)
                 
-                success = PlaylistService.remove_track_from_playlist(
+                success = await PlaylistService.remove_track_from_playlist(
                     db, playlist_uuid, track_uuid, user_id
                 )
                 
@@ -92,13 +92,13 @@ class PlaylistTrackRoutes:
         async def get_playlist_tracks(
             playlist_id: str,
             current_user: dict = Depends(get_current_user),
-            db: Session = Depends(get_db)
+            db: AsyncSession = Depends(get_async_db)
         ):
             try:
                 user_id = current_user["id"]
                 playlist_uuid = PlaylistValidation.validate_playlist_id(playlist_id)
                 
-                tracks = PlaylistService.get_playlist_tracks(db, playlist_uuid, user_id)
+                tracks = await PlaylistService.get_playlist_tracks(db, playlist_uuid, user_id)
                 
                 logger.info(f"Retrieved {len(tracks)} tracks for playlist {playlist_id}")
                 return {"tracks": tracks, "total": len(tracks)}
@@ -117,7 +117,7 @@ class PlaylistTrackRoutes:
             playlist_id: str,
             track_orders: List[dict],
             current_user: dict = Depends(get_current_user),
-            db: Session = Depends(get_db)
+            db: AsyncSession = Depends(get_async_db)
         ):
             try:
                 user_id = current_user["id"]
@@ -126,7 +126,7 @@ class PlaylistTrackRoutes:
                 # Validate track orders
                 validated_orders = PlaylistValidation.validate_track_orders(track_orders)
                 
-                success = PlaylistService.reorder_playlist_tracks(
+                success = await PlaylistService.reorder_playlist_tracks(
                     db, playlist_uuid, user_id, validated_orders
                 )
                 
@@ -152,7 +152,7 @@ class PlaylistTrackRoutes:
             limit: int = Query(50, ge=1, le=100),
             offset: int = Query(0, ge=0),
             current_user: dict = Depends(get_current_user),
-            db: Session = Depends(get_db)
+            db: AsyncSession = Depends(get_async_db)
         ):
             try:
                 user_id = current_user["id"]
@@ -161,7 +161,7 @@ class PlaylistTrackRoutes:
                 # Validate search parameters
                 query, limit, offset = PlaylistValidation.validate_search_params(query, limit, offset)
                 
-                tracks, total = PlaylistService.search_tracks_in_playlist(
+                tracks, total = await PlaylistService.search_tracks_in_playlist(
                     db, playlist_uuid, user_id, query, limit, offset
                 )
                 
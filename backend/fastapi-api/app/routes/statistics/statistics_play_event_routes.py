@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db
+from app.database import get_async_db
 from app.dependencies.auth import get_current_user
 from app.services.statistics_service import StatisticsService
 from app.schemas.schemas import PlayEvent, StatisticsResponse
@@ -17,7 +17,7 @@ class StatisticsPlayEventRoutes:
         async def record_play_event(
             play_event: PlayEvent,
             current_user: dict = Depends(get_current_user),
-            db: Session = Depends(get_db)
+            db: AsyncSession = Depends(get_async_db)
         ):
             """
             Record a play event for a track
@@ -30,7 +30,7 @@ class StatisticsPlayEventRoutes:
             try:
                 stats_service = StatisticsService(db)
                 user_id = current_user["id"]
-                return stats_service.record_play_event(user_id, play_event)
+                return await stats_service.record_play_event(user_id, play_event)
             except Exception as e:
                 raise HTTPException(
                     status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db
+from app.database import get_async_db
 from app.dependencies.auth import get_current_user
 from app.services.statistics_service import StatisticsService
 from app.schemas.schemas import RatingUpdate, StatisticsResponse
@@ -17,7 +17,7 @@ class StatisticsRatingRoutes:
         async def update_track_rating(
             rating_update: RatingUpdate,
             current_user: dict = Depends(get_current_user),
-            db: Session = Depends(get_db)
+            db: AsyncSession = Depends(get_async_db)
         ):
             """
             Update user rating for a track (1-5 stars)
@@ -25,7 +25,7 @@ class StatisticsRatingRoutes:
             try:
                 stats_service = StatisticsService(db)
                 user_id = current_user["id"]
-                return stats_service.update_rating(user_id, rating_update)
+                return await stats_service.update_rating(user_id, rating_update)
             except ValueError as e:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db
+from app.database import get_async_db
 from app.dependencies.auth import get_current_user
 from app.services.statistics_service import StatisticsService
 from app.schemas.schemas import StatisticsSearchParams, StatisticsSearchResult
@@ -17,7 +17,7 @@ class StatisticsSearchRoutes:
         async def search_statistics(
             params: StatisticsSearchParams = Depends(),
             current_user: dict = Depends(get_current_user),
-            db: Session = Depends(get_db)
+            db: AsyncSession = Depends(get_async_db)
         ):
             """
             Search statistics with various filters for the current user
@@ -32,7 +32,7 @@ class StatisticsSearchRoutes:
                 stats_service = StatisticsService(db)
                 # Force search to be for current user only
                 params.user_id = current_user["id"]
-                results = stats_service.search_statistics(params)
+                results = await stats_service.search_statistics(params)
                 
                 # Count total results for pagination
                 total_results = len(results)  # This is simplified; for production, implement proper counting
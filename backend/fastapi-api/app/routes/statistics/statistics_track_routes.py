@@ -1,8 +1,8 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
 
-from app.database import get_db
+from app.database import get_async_db
 from app.services.statistics_service import StatisticsService
 from app.schemas.schemas import TrackStatisticsSummary
 
@@ -16,7 +16,7 @@ class StatisticsTrackRoutes:
         @router.get("/track/{track_id}/summary", response_model=TrackStatisticsSummary)
         async def get_track_statistics_summary(
             track_id: UUID,
-            db: Session = Depends(get_db)
+            db: AsyncSession = Depends(get_async_db)
         ):
             """
             Get comprehensive statistics summary for a track across all users
@@ -29,7 +29,7 @@ class StatisticsTrackRoutes:
             """
             try:
                 stats_service = StatisticsService(db)
-                return stats_service.get_track_summary(track_id)
+                return await stats_service.get_track_summary(track_id)
             except Exception as e:
                 raise HTTPException(
                     status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
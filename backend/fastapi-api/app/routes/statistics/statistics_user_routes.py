@@ -1,9 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 from uuid import UUID
 
-from app.database import get_db
+from app.database import get_async_db
 from app.dependencies.auth import get_current_user
 from app.services.statistics_service import StatisticsService
 from app.schemas.schemas import StatisticsResponse, UserStatisticsSummary
@@ -19,14 +19,14 @@ class StatisticsUserRoutes:
         async def get_user_track_statistics(
             track_id: UUID,
             current_user: dict = Depends(get_current_user),
-            db: Session = Depends(get_db)
+            db: AsyncSession = Depends(get_async_db)
         ):
             """
             Get statistics for a specific user-track combination
             """
             stats_service = StatisticsService(db)
             user_id = current_user["id"]
-            stats = stats_service.get_user_statistics(user_id, track_id)
+            stats = await stats_service.get_user_statistics(user_id, track_id)
             if not stats:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
@@ -37,7 +37,7 @@ class StatisticsUserRoutes:
         @router.get("/user/summary", response_model=UserStatisticsSummary)
         async def get_user_statistics_summary(
             current_user: dict = Depends(get_current_user),
-            db: Session = Depends(get_db)
+            db: AsyncSession = Depends(get_async_db)
         ):
             """
             Get comprehensive statistics summary for the current user
@@ -51,7 +51,7 @@ class StatisticsUserRoutes:
             try:
                 stats_service = StatisticsService(db)
                 user_id = current_user["id"]
-                return stats_service.get_user_summary(user_id)
+                return await stats_service.get_user_summary(user_id)
             except Exception as e:
                 raise HTTPException(
                     status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -61,7 +61,7 @@ class StatisticsUserRoutes:
         @router.get("/user/all", response_model=List[StatisticsResponse])
         async def get_all_user_statistics(
             current_user: dict = Depends(get_current_user),
-            db: Session = Depends(get_db)
+            db: AsyncSession = Depends(get_async_db)
         ):
             """
             Get all statistics for the current user (all tracks they've listened to)
@@ -69,7 +69,7 @@ class StatisticsUserRoutes:
             try:
                 stats_service = StatisticsService(db)
                 user_id = current_user["id"]
-                stats = stats_service.get_user_statistics(user_id)
+                stats = await stats_service.get_user_statistics(user_id)
                 if isinstance(stats, list):
                     return stats
                 elif stats:
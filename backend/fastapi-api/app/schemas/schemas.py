@@ -29,6 +29,8 @@ class TrackCreate(TrackBase):
     duration: timedelta
     cover_path: Optional[str] = None
     cover_thumbnail_path: Optional[str] = None
+    processing_status: str = "ready"
+    blob_sha256: Optional[str] = None
 
 class TrackResponse(TrackBase):
     model_config = ConfigDict(from_attributes=True)
@@ -47,6 +49,68 @@ class TrackResponse(TrackBase):
     cover_path: Optional[str] = None
     cover_thumbnail_path: Optional[str] = None
     updated_at: datetime
+    processing_status: str = "ready"
+    # Set on upload: the background job enriching the track (see GET /files/jobs/{id})
+    processing_job_id: Optional[UUID] = None
+
+class BatchUploadResult(BaseModel):
+    """Outcome of one file of a batch upload"""
+    filename: str
+    success: bool
+    track: Optional[TrackResponse] = None
+    error: Optional[str] = None
+
+class BatchUploadResponse(BaseModel):
+    uploaded: int
+    failed: int
+    results: List[BatchUploadResult]
+
+class AudioPreflightRequest(BaseModel):
+    """Hash of an audio file a client is about to upload"""
+    filename: str
+    size: int
+    sha256: str
+
+class AudioPreflightResponse(BaseModel):
+    """Whether the upload can be skipped; if so, the track created from the stored copy"""
+    exists: bool
+    track: Optional[TrackResponse] = None
+
+class UploadSessionCreate(BaseModel):
+    """Start of a resumable upload"""
+    filename: str
+    size: int
+    content_type: Optional[str] = None
+
+class UploadSessionResponse(BaseModel):
+    """State of a resumable upload; chunk i covers bytes [i * chunk_size, (i + 1) * chunk_size)"""
+    id: UUID
+    filename: str
+    total_size: int
+    chunk_size: int
+    total_chunks: int
+    status: str
+    # Chunks stored so far, and the length of the contiguous prefix they form
+    received_chunks: List[int]
+    received_bytes: int
+    expires_at: datetime
+    track: Optional[TrackResponse] = None
+
+class IngestJobResponse(BaseModel):
+    """Status of a background ingest job"""
+    model_config = ConfigDict(from_attributes=True)
+    
+    id: UUID
+    track_id: UUID
+    job_type: str
+    status: str
+    attempts: int
+    max_attempts: int
+    last_error: Optional[str] = None
+    run_after: datetime
+    created_at: datetime
+    updated_at: datetime
+    completed_at: Optional[datetime] = None
 
 class MetadataResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
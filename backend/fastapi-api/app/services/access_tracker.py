@@ -0,0 +1,132 @@
+import asyncio
+import logging
+import os
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+from uuid import UUID
+from sqlalchemy import DateTime, column, func, update, values
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import AsyncSessionLocal
+from app.models.models import Track
+from app.services.track_service import TrackService
+
+logger = logging.getLogger(__name__)
+
+# Rows per UPDATE statement, keeping bind parameters under PostgreSQL's limit
+FLUSH_BATCH_SIZE = 5000
+
+class AccessTracker:
+    """Write-behind buffer for Track.last_accessed
+
+    Streaming a track hits get_audio_file for every range request, or the
+    HLS endpoint for its playlist and every segment. Instead of one UPDATE
+    and commit each time, accesses are kept in memory (latest timestamp per
+    track) and written every `flush_interval` seconds with bulk
+    UPDATE ... FROM (VALUES ...) statements. last_accessed therefore lags by at
+    most flush_interval; buffered accesses are lost if the process is killed.
+    """
+
+    def __init__(self, flush_interval: float = 30.0, max_pending: int = 10000):
+        self.flush_interval = flush_interval
+        # Flush early once this many tracks are waiting
+        self.max_pending = max_pending
+
+        self._pending: Dict[UUID, datetime] = {}
+        self._flush_now = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+        self.touches = 0
+        self.flushes = 0
+        self.rows_written = 0
+        self.errors = 0
+
+    @classmethod
+    def from_env(cls) -> "AccessTracker":
+        """Build a tracker configured from LAST_ACCESSED_* variables"""
+        return cls(
+            flush_interval=float(os.getenv("LAST_ACCESSED_FLUSH_INTERVAL", "30")),
+            max_pending=int(os.getenv("LAST_ACCESSED_MAX_PENDING", "10000"))
+        )
+
+    async def touch(self, db: AsyncSession, track_id: UUID) -> None:
+        """Record an access to a track (written immediately when buffering is disabled)"""
+        if self.flush_interval <= 0:
+            await TrackService.update_last_accessed(db, track_id)
+            return
+
+        self.touches += 1
+        # Naive UTC, like CURRENT_TIMESTAMP in the UTC database containers
+        self._pending[track_id] = datetime.now(timezone.utc).replace(tzinfo=None)
+        if len(self._pending) >= self.max_pending:
+            self._flush_now.set()
+
+    def start(self) -> None:
+        if self.flush_interval <= 0 or self._task is not None:
+            return
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.flush()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._flush_now.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_now.clear()
+            await self.flush()
+
+    async def flush(self) -> int:
+        """Write all buffered access times in bulk UPDATEs and return the number of tracks"""
+        if not self._pending:
+            return 0
+
+        pending, self._pending = self._pending, {}
+        items = list(pending.items())
+
+        try:
+            async with AsyncSessionLocal() as db:
+                for offset in range(0, len(items), FLUSH_BATCH_SIZE):
+                    accessed = values(
+                        column("id", PG_UUID(as_uuid=True)),
+                        column("accessed_at", DateTime()),
+                        name="accessed"
+                    ).data(items[offset:offset + FLUSH_BATCH_SIZE])
+                    await db.execute(
+                        update(Track)
+                        .where(Track.id == accessed.c.id)
+                        .values(last_accessed=func.greatest(Track.last_accessed, accessed.c.accessed_at))
+                        .execution_options(synchronize_session=False)
+                    )
+                await db.commit()
+        except Exception as e:
+            self.errors += 1
+            logger.error(f"Error flushing last accessed times for {len(pending)} tracks: {str(e)}")
+            # Keep them for the next flush, without overwriting newer accesses
+            for track_id, accessed_at in pending.items():
+                self._pending.setdefault(track_id, accessed_at)
+            return 0
+
+        self.flushes += 1
+        self.rows_written += len(pending)
+        return len(pending)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "flush_interval": self.flush_interval,
+            "pending": len(self._pending),
+            "touches": self.touches,
+            "flushes": self.flushes,
+            "rows_written": self.rows_written,
+            "errors": self.errors
+        }
+
+# Started and stopped by the app lifespan
+access_tracker = AccessTracker.from_env()
@@ -0,0 +1,108 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy import and_, delete, exists, select
+from app.models.models import AudioBlob, Track
+from app.services.storage.file_manager import FileManager
+from typing import Iterable, Optional
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+class AudioBlobService:
+    """Content-addressed, reference-counted audio storage
+
+    Uploads are hashed while they are streamed to disk. The first copy of some
+    content is kept as the blob audio/blobs/{sha256}; later uploads of the same
+    bytes, by any user, become hard links to it. Every track keeps its own
+    file, storage key and logical size (so quotas still charge each user),
+    while the bytes are stored once. A trigger on tracks keeps
+    audio_blobs.ref_count equal to the number of tracks using a blob.
+
+    Blob rows are locked around the filesystem operations, so an upload of
+    some content and the purge of its last reference are serialized.
+    """
+
+    @staticmethod
+    async def attach(db: AsyncSession, file_manager: FileManager, filename: str, sha256: str, size: int) -> bool:
+        """Deduplicate a freshly stored audio file against existing content (no commit)
+
+        The blob row stays locked until the caller commits the track that
+        references it. Returns True if the file now shares an existing blob,
+        False if it became the blob (see discard_new_blobs).
+        """
+        await db.execute(
+            insert(AudioBlob)
+            .values(sha256=sha256, file_size=size)
+            .on_conflict_do_update(index_elements=[AudioBlob.sha256], set_={"file_size": size})
+        )
+        return await asyncio.to_thread(file_manager.share_blob, filename, sha256)
+
+    @staticmethod
+    async def discard_new_blobs(file_manager: FileManager, hashes: Iterable[str]) -> None:
+        """Unlink blobs that attach() created for tracks about to be rolled back
+
+        Call before the rollback, while the blob rows are still locked: the
+        rows disappear with it and the files would be left with no owner.
+        """
+        for sha256 in hashes:
+            await asyncio.to_thread(file_manager.delete_blob, sha256)
+
+    @staticmethod
+    async def link_existing(db: AsyncSession, file_manager: FileManager, sha256: str, size: int, filename: str, user_id: int) -> bool:
+        """Store an audio file from content the user already has, without an upload (no commit)
+
+        Only blobs referenced by one of the user's own tracks count: a hash
+        alone is no proof of having the bytes, and answering for other users'
+        content would hand it out (and reveal that it is stored). Other users'
+        copies are still shared when the file is actually uploaded.
+
+        Returns False if the user has no stored blob with this hash and size.
+        """
+        result = await db.execute(
+            select(AudioBlob)
+            .where(and_(
+                AudioBlob.sha256 == sha256,
+                exists().where(and_(Track.blob_sha256 == sha256, Track.user_id == user_id))
+            ))
+            .with_for_update(of=AudioBlob)
+        )
+        blob = result.scalars().first()
+        if blob is None or blob.file_size != size:
+            return False
+
+        try:
+            await asyncio.to_thread(file_manager.link_blob, sha256, filename)
+        except FileNotFoundError:
+            logger.warning(f"Audio blob {sha256} is recorded but missing from storage")
+            return False
+        return True
+
+    @staticmethod
+    async def purge_unreferenced(db: AsyncSession, file_manager: FileManager, hashes: Iterable[Optional[str]]) -> int:
+        """Delete the given blobs if no track references them any more, and return how many were deleted"""
+        hashes = list({sha256 for sha256 in hashes if sha256})
+        if not hashes:
+            return 0
+
+        try:
+            result = await db.execute(
+                delete(AudioBlob)
+                .where(and_(AudioBlob.sha256.in_(hashes), AudioBlob.ref_count <= 0))
+                .returning(AudioBlob.sha256)
+                .execution_options(synchronize_session=False)
+            )
+            purged = result.scalars().all()
+
+            # Unlink while the rows are still locked: a concurrent upload of the
+            # same content waits for the commit, then stores a new blob
+            for sha256 in purged:
+                await asyncio.to_thread(file_manager.delete_blob, sha256)
+
+            await db.commit()
+            return len(purged)
+
+        except Exception as e:
+            await db.rollback()
+            logger.error(f"Error purging unreferenced audio blobs: {str(e)}")
+            return 0
@@ -2,65 +2,135 @@ import httpx
 import os
 from fastapi import HTTPException
 import logging
+from typing import Optional
+from app.services.circuit_breaker import CircuitBreaker
+from app.services.http_client import AuthHttpClient
+from app.services.jwt_verifier import JWTVerifier
+from app.services.single_flight import SingleFlight
+from app.services.token_cache import TokenCache
 
 logger = logging.getLogger(__name__)
 
+# Shared across requests: AuthService is instantiated per request
+token_cache = TokenCache.from_env()
+jwt_verifier = JWTVerifier.from_env()
+# Concurrent verifications of one token share a single upstream call
+verifications = SingleFlight()
+auth_breaker = CircuitBreaker.from_env("auth-service", "AUTH_BREAKER")
+
 class AuthService:
-    def __init__(self):
+    def __init__(self, http_client: Optional[AuthHttpClient] = None):
         self.auth_service_url = os.getenv("AUTH_SERVICE_URL", "http://auth:80")
+        self.http_client = http_client
+        self.token_cache = token_cache
+        self.jwt_verifier = jwt_verifier
+        self.breaker = auth_breaker
     
     async def verify_token(self, token: str) -> dict:
+        """Verify token, using the in-process cache before the Symfony auth service"""
+        token_hash = TokenCache.hash_token(token)
+        
+        cached_user = self.token_cache.get(token_hash)
+        if cached_user is not None:
+            logger.debug(f"Token verified from cache for user ID: {cached_user.get('id')}")
+            return cached_user
+        
+        rejection = self.token_cache.get_rejection(token_hash)
+        if rejection is not None:
+            status_code, detail = rejection
+            raise HTTPException(status_code=status_code, detail=detail)
+        
+        user_data = await verifications.do(
+            token_hash, lambda: self._verify_uncached(token, token_hash)
+        )
+        return dict(user_data)
+    
+    async def _verify_uncached(self, token: str, token_hash: str) -> dict:
+        """Verify locally or against the auth service, then cache the outcome"""
+        try:
+            # Opt-in local signature check; None means fall back to /api/me
+            user_data = self.jwt_verifier.verify(token)
+            if user_data is None:
+                user_data = await self._fetch_user_guarded(token)
+        except HTTPException as e:
+            if e.status_code in (401, 403):
+                self.token_cache.reject(token_hash, e.status_code, e.detail)
+            elif e.status_code == 503:
+                # Auth service degraded: accept a recently verified identity
+                # within the stale grace window (AUTH_STALE_GRACE)
+                stale_user = self.token_cache.get_stale(token_hash)
+                if stale_user is not None:
+                    logger.warning(f"Auth service unavailable, using stale identity for user ID: {stale_user.get('id')}")
+                    return stale_user
+            raise
+        
+        self.token_cache.set(token_hash, user_data, TokenCache.get_token_expiry(token))
+        return user_data
+    
+    async def _fetch_user_guarded(self, token: str) -> dict:
+        """Call the auth service through the circuit breaker, failing fast while it is open"""
+        if not self.breaker.allow_request():
+            raise HTTPException(
+                status_code=503,
+                detail="Authentication service unavailable"
+            )
+        
+        return await self._fetch_user(token)
+    
+    async def _fetch_user(self, token: str) -> dict:
         """Verify token with Symfony auth service"""
         try:
-            async with httpx.AsyncClient(timeout=httpx.Timeout(10.0)) as client:
-                logger.debug(f"Verifying token with auth service: {self.auth_service_url}")
-                
-                response = await client.get(
-                    f"{self.auth_service_url}/api/me",
-                    headers={"Authorization": f"Bearer {token}"}
-                )
+            logger.debug(f"Verifying token with auth service: {self.auth_service_url}")
+            
+            response = await self._request_me(token)
+            
+            if response.status_code >= 500:
+                self.breaker.record_failure()
+            else:
+                self.breaker.record_success()
+            
+            if response.status_code == 200:
+                response_data = response.json()
+                user_data = response_data.get('user', response_data)  # Handle both formats
                 
-                if response.status_code == 200:
-                    response_data = response.json()
-                    user_data = response_data.get('user', response_data)  # Handle both formats
-                    
-                    # Validate required fields
-                    if not user_data.get('id') or not user_data.get('email'):
-                        logger.error(f"Invalid user data received from auth service: {user_data}")
-                        raise HTTPException(
-                            status_code=401,
-                            detail="Invalid user data from authentication service"
-                        )
-                    
-                    logger.info(f"Token verified successfully for user: {user_data.get('email')} (ID: {user_data.get('id')})")
-                    return user_data
-                    
-                elif response.status_code == 401:
-                    logger.warning("Authentication failed: Invalid or expired token")
+                # Validate required fields
+                if not user_data.get('id') or not user_data.get('email'):
+                    logger.error(f"Invalid user data received from auth service: {user_data}")
                     raise HTTPException(
                         status_code=401,
-                        detail="Invalid or expired token"
+                        detail="Invalid user data from authentication service"
                     )
-                    
-                elif response.status_code == 403:
-                    logger.warning("Authentication failed: Access forbidden")
-                    raise HTTPException(
-                        status_code=403,
-                        detail="Access forbidden"
-                    )
-                    
-                else:
-                    logger.error(f"Auth service returned unexpected status {response.status_code}: {response.text}")
-                    raise HTTPException(
-                        status_code=503,
-                        detail="Authentication service error"
-                    )
-                    
+                
+                logger.info(f"Token verified successfully for user: {user_data.get('email')} (ID: {user_data.get('id')})")
+                return user_data
+                
+            elif response.status_code == 401:
+                logger.warning("Authentication failed: Invalid or expired token")
+                raise HTTPException(
+                    status_code=401,
+                    detail="Invalid or expired token"
+                )
+                
+            elif response.status_code == 403:
+                logger.warning("Authentication failed: Access forbidden")
+                raise HTTPException(
+                    status_code=403,
+                    detail="Access forbidden"
+                )
+                
+            else:
+                logger.error(f"Auth service returned unexpected status {response.status_code}: {response.text}")
+                raise HTTPException(
+                    status_code=503,
+                    detail="Authentication service error"
+                )
+                
         except HTTPException:
             # Re-raise HTTP exceptions (comme dans storage_service)
             raise
             
         except httpx.TimeoutException:
+            self.breaker.record_failure(timeout=True)
             logger.error("Authentication request timeout")
             raise HTTPException(
                 status_code=503,
@@ -68,6 +138,7 @@ class AuthService:
             )
             
         except httpx.RequestError as e:
+            self.breaker.record_failure()
             logger.error(f"Auth service connection error: {str(e)}")
             raise HTTPException(
                 status_code=503,
@@ -79,4 +150,15 @@ class AuthService:
             raise HTTPException(
                 status_code=500,
                 detail="Internal authentication error"
-            )
\ No newline at end of file
+            )
+    
+    async def _request_me(self, token: str) -> httpx.Response:
+        """Call /api/me through the shared pool, or a one-off client outside the app"""
+        url = f"{self.auth_service_url}/api/me"
+        headers = {"Authorization": f"Bearer {token}"}
+        
+        if self.http_client is not None:
+            return await self.http_client.get(url, headers=headers)
+        
+        async with httpx.AsyncClient(timeout=httpx.Timeout(10.0)) as client:
+            return await client.get(url, headers=headers)
\ No newline at end of file
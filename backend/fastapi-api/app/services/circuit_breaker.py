@@ -0,0 +1,136 @@
+import os
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+class CircuitBreaker:
+    """Circuit breaker for calls to a remote service
+
+    The breaker opens after `timeout_threshold` consecutive timeouts, or when
+    the error rate over the last `window` seconds reaches `error_rate_threshold`
+    (with at least `min_calls` calls). While open, calls fail fast. After
+    `open_duration` seconds a single probe call is let through (half-open):
+    its success closes the breaker, its failure opens it again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        name: str,
+        timeout_threshold: int = 3,
+        error_rate_threshold: float = 0.5,
+        min_calls: int = 10,
+        window: float = 30.0,
+        open_duration: float = 15.0
+    ):
+        self.name = name
+        self.timeout_threshold = timeout_threshold
+        self.error_rate_threshold = error_rate_threshold
+        self.min_calls = min_calls
+        self.window = window
+        self.open_duration = open_duration
+
+        self.state = self.CLOSED
+        self.opened_at = 0.0
+        self.consecutive_timeouts = 0
+        self._probe_in_flight = False
+        self._probe_started_at = 0.0
+        # (timestamp, succeeded) for calls inside the sliding window
+        self._calls: Deque[Tuple[float, bool]] = deque()
+
+        self.times_opened = 0
+        self.rejected_calls = 0
+
+    @classmethod
+    def from_env(cls, name: str, prefix: str) -> "CircuitBreaker":
+        """Build a breaker configured from `{prefix}_*` environment variables"""
+        return cls(
+            name=name,
+            timeout_threshold=int(os.getenv(f"{prefix}_TIMEOUT_THRESHOLD", "3")),
+            error_rate_threshold=float(os.getenv(f"{prefix}_ERROR_RATE", "0.5")),
+            min_calls=int(os.getenv(f"{prefix}_MIN_CALLS", "10")),
+            window=float(os.getenv(f"{prefix}_WINDOW", "30")),
+            open_duration=float(os.getenv(f"{prefix}_OPEN_DURATION", "15"))
+        )
+
+    def allow_request(self) -> bool:
+        """Whether a call may go through right now"""
+        if self.state == self.CLOSED:
+            return True
+
+        now = time.monotonic()
+        if self.state == self.OPEN and now - self.opened_at >= self.open_duration:
+            self.state = self.HALF_OPEN
+            self._probe_in_flight = False
+            logger.info(f"Circuit breaker '{self.name}' half-open, probing")
+
+        # A probe whose outcome was never recorded is retried after open_duration
+        if self.state == self.HALF_OPEN and (
+            not self._probe_in_flight or now - self._probe_started_at >= self.open_duration
+        ):
+            self._probe_in_flight = True
+            self._probe_started_at = now
+            return True
+
+        self.rejected_calls += 1
+        return False
+
+    def record_success(self) -> None:
+        self.consecutive_timeouts = 0
+        self._record(True)
+
+        if self.state != self.CLOSED:
+            self.state = self.CLOSED
+            self._probe_in_flight = False
+            self._calls.clear()
+            logger.info(f"Circuit breaker '{self.name}' closed")
+
+    def record_failure(self, timeout: bool = False) -> None:
+        if timeout:
+            self.consecutive_timeouts += 1
+        self._record(False)
+
+        if self.state == self.HALF_OPEN:
+            self._open("probe failed")
+        elif self.state == self.CLOSED:
+            if self.consecutive_timeouts >= self.timeout_threshold:
+                self._open(f"{self.consecutive_timeouts} consecutive timeouts")
+            else:
+                error_rate = self._error_rate()
+                if len(self._calls) >= self.min_calls and error_rate >= self.error_rate_threshold:
+                    self._open(f"error rate {error_rate:.0%} over {len(self._calls)} calls")
+
+    def _open(self, reason: str) -> None:
+        self.state = self.OPEN
+        self.opened_at = time.monotonic()
+        self._probe_in_flight = False
+        self.times_opened += 1
+        logger.warning(f"Circuit breaker '{self.name}' opened: {reason}")
+
+    def _record(self, succeeded: bool) -> None:
+        now = time.monotonic()
+        self._calls.append((now, succeeded))
+        while self._calls and now - self._calls[0][0] > self.window:
+            self._calls.popleft()
+
+    def _error_rate(self) -> float:
+        if not self._calls:
+            return 0.0
+        failures = sum(1 for _, succeeded in self._calls if not succeeded)
+        return failures / len(self._calls)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_timeouts": self.consecutive_timeouts,
+            "window_calls": len(self._calls),
+            "window_error_rate": round(self._error_rate(), 3),
+            "times_opened": self.times_opened,
+            "rejected_calls": self.rejected_calls
+        }
@@ -0,0 +1,17 @@
+from typing import Dict
+
+def parse_accept(accept: str) -> Dict[str, float]:
+    """Media ranges of an Accept header with their q-values, e.g. {"image/avif": 1.0, "*/*": 0.8}"""
+    accepted = {}
+    for media_range in accept.split(","):
+        media_type, _, params = media_range.strip().partition(";")
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[media_type.strip().lower()] = q
+    return accepted
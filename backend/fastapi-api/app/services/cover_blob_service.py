@@ -0,0 +1,77 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy import and_, delete
+from app.models.models import CoverBlob
+from app.services.storage.file_manager import FileManager
+from typing import Iterable, Optional
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+class CoverBlobService:
+    """Content-addressed, reference-counted embedded covers
+
+    Ingest hashes each embedded cover and stores it once as
+    cover/{sha256}.jpg, with its thumbnails. A track carrying the same art
+    (typically the rest of its album) reuses those files without encoding
+    anything. tracks.cover_sha256 references the cover_blobs row, and a
+    trigger keeps ref_count equal to the number of tracks using it.
+
+    As with audio blobs, rows are locked around the filesystem operations:
+    a track taking a reference and the purge of the last one are serialized.
+    """
+
+    @staticmethod
+    async def attach(db: AsyncSession, file_manager: FileManager, sha256: str, size: int) -> bool:
+        """Lock a shared cover for a track about to reference it (no commit)
+
+        Returns False if its file is gone (purged after ingest wrote it), in
+        which case the track must not reference it.
+        """
+        await db.execute(
+            insert(CoverBlob)
+            .values(sha256=sha256, file_size=size)
+            .on_conflict_do_update(index_elements=[CoverBlob.sha256], set_={"file_size": size})
+        )
+        return await asyncio.to_thread(file_manager.shared_cover_exists, sha256)
+
+    @staticmethod
+    async def release(db: AsyncSession, file_manager: FileManager, sha256: str, size: int) -> int:
+        """Delete a shared cover written for a track that no longer exists, unless another track uses it"""
+        try:
+            await CoverBlobService.attach(db, file_manager, sha256, size)
+        except Exception as e:
+            await db.rollback()
+            logger.error(f"Error releasing shared cover {sha256}: {str(e)}")
+            return 0
+        return await CoverBlobService.purge_unreferenced(db, file_manager, [sha256])
+
+    @staticmethod
+    async def purge_unreferenced(db: AsyncSession, file_manager: FileManager, hashes: Iterable[Optional[str]]) -> int:
+        """Delete the given covers if no track references them any more, and return how many were deleted"""
+        hashes = list({sha256 for sha256 in hashes if sha256})
+        if not hashes:
+            return 0
+
+        try:
+            result = await db.execute(
+                delete(CoverBlob)
+                .where(and_(CoverBlob.sha256.in_(hashes), CoverBlob.ref_count <= 0))
+                .returning(CoverBlob.sha256)
+                .execution_options(synchronize_session=False)
+            )
+            purged = result.scalars().all()
+
+            # Unlink while the rows are still locked: an ingest attaching the
+            # same cover waits for the commit, then finds the file gone and retries
+            for sha256 in purged:
+                await asyncio.to_thread(file_manager.delete_shared_cover, sha256)
+
+            await db.commit()
+            return len(purged)
+
+        except Exception as e:
+            await db.rollback()
+            logger.error(f"Error purging unreferenced covers: {str(e)}")
+            return 0
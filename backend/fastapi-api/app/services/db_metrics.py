@@ -0,0 +1,150 @@
+import os
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+import logging
+
+logger = logging.getLogger(__name__)
+
+class RequestDBMetrics:
+    """Database usage of a single request"""
+
+    def __init__(self):
+        self.checkout_wait = 0.0
+        self.checkouts = 0
+        self.queries = 0
+        self.db_time = 0.0
+
+    def server_timing(self) -> str:
+        """Format the metrics as a Server-Timing header value (durations in ms)"""
+        return (
+            f'db-wait;dur={self.checkout_wait * 1000:.1f};desc="pool checkout", '
+            f'db;dur={self.db_time * 1000:.1f};desc="{self.queries} queries"'
+        )
+
+# Set by the request middleware; pool and cursor events add to it
+current_request_metrics: ContextVar[Optional[RequestDBMetrics]] = ContextVar("current_request_metrics", default=None)
+
+class DBMetrics:
+    """Aggregated pool and query metrics across requests"""
+
+    def __init__(self, slow_checkout: float = 0.1):
+        # Checkouts waiting longer than this (seconds) are counted and logged
+        self.slow_checkout = slow_checkout
+
+        self.requests = 0
+        self.checkouts = 0
+        self.slow_checkouts = 0
+        self.checkout_wait_total = 0.0
+        self.checkout_wait_max = 0.0
+        self.queries = 0
+        self.db_time_total = 0.0
+        self.db_time_max = 0.0
+
+    def record_checkout(self, wait: float) -> None:
+        self.checkouts += 1
+        self.checkout_wait_total += wait
+        self.checkout_wait_max = max(self.checkout_wait_max, wait)
+        if wait >= self.slow_checkout:
+            self.slow_checkouts += 1
+            logger.warning(f"Slow database connection checkout: waited {wait * 1000:.0f} ms")
+
+        request_metrics = current_request_metrics.get()
+        if request_metrics is not None:
+            request_metrics.checkouts += 1
+            request_metrics.checkout_wait += wait
+
+    def record_query(self, duration: float) -> None:
+        self.queries += 1
+        self.db_time_total += duration
+        self.db_time_max = max(self.db_time_max, duration)
+
+        request_metrics = current_request_metrics.get()
+        if request_metrics is not None:
+            request_metrics.queries += 1
+            request_metrics.db_time += duration
+
+    def record_request(self) -> None:
+        self.requests += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "checkouts": self.checkouts,
+            "slow_checkouts": self.slow_checkouts,
+            "checkout_wait_avg_ms": round(self.checkout_wait_total / self.checkouts * 1000, 2) if self.checkouts else 0.0,
+            "checkout_wait_max_ms": round(self.checkout_wait_max * 1000, 2),
+            "queries": self.queries,
+            "queries_per_request": round(self.queries / self.requests, 2) if self.requests else 0.0,
+            "query_time_avg_ms": round(self.db_time_total / self.queries * 1000, 2) if self.queries else 0.0,
+            "query_time_max_ms": round(self.db_time_max * 1000, 2)
+        }
+
+db_metrics = DBMetrics(slow_checkout=float(os.getenv("DB_SLOW_CHECKOUT_MS", "100")) / 1000)
+
+class InstrumentedAsyncPool(AsyncAdaptedQueuePool):
+    """Queue pool that measures how long each checkout waits for a connection
+
+    Pool events only fire once a connection has been handed out, so the wait
+    is timed around the public Pool.connect(), which every engine checkout
+    goes through.
+    """
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        finally:
+            db_metrics.record_checkout(time.perf_counter() - start)
+
+class DBMetricsMiddleware:
+    """Record pool checkout wait, query count and DB time for each request
+
+    A plain ASGI middleware: the only change it makes is a Server-Timing
+    header on http.response.start. Body messages, streamed or not, pass
+    through untouched.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_metrics = RequestDBMetrics()
+
+        async def send_with_server_timing(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append("Server-Timing", request_metrics.server_timing())
+            await send(message)
+
+        token = current_request_metrics.set(request_metrics)
+        try:
+            await self.app(scope, receive, send_with_server_timing)
+        finally:
+            current_request_metrics.reset(token)
+            db_metrics.record_request()
+
+def instrument_engine(engine: Engine) -> None:
+    """Time every statement executed through the engine"""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        db_metrics.record_query(time.perf_counter() - conn.info["query_start"].pop())
+
+    @event.listens_for(engine, "handle_error")
+    def handle_error(exception_context):
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("query_start"):
+            db_metrics.record_query(time.perf_counter() - conn.info["query_start"].pop())
@@ -0,0 +1,121 @@
+import httpx
+import os
+import time
+from typing import Any, Dict, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+class AuthHttpClient:
+    """Application-scoped, connection-pooled HTTP client for the auth service"""
+
+    def __init__(
+        self,
+        max_connections: int = 50,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 30.0,
+        timeout: float = 10.0,
+        connect_timeout: float = 2.0,
+        pool_timeout: float = 2.0
+    ):
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry
+        )
+        self.timeout = httpx.Timeout(timeout, connect=connect_timeout, pool=pool_timeout)
+        self._client: Optional[httpx.AsyncClient] = None
+
+        # Pool usage counters
+        self.requests_total = 0
+        self.in_flight = 0
+        self.in_flight_peak = 0
+        self.pool_timeouts = 0
+        self.new_connections = 0
+        self.reused_connections = 0
+        self.pool_wait_total = 0.0
+        self.pool_wait_max = 0.0
+
+    @classmethod
+    def from_env(cls) -> "AuthHttpClient":
+        """Build a client configured from AUTH_HTTP_* environment variables"""
+        return cls(
+            max_connections=int(os.getenv("AUTH_HTTP_MAX_CONNECTIONS", "50")),
+            max_keepalive_connections=int(os.getenv("AUTH_HTTP_MAX_KEEPALIVE", "20")),
+            keepalive_expiry=float(os.getenv("AUTH_HTTP_KEEPALIVE_EXPIRY", "30")),
+            timeout=float(os.getenv("AUTH_HTTP_TIMEOUT", "10")),
+            connect_timeout=float(os.getenv("AUTH_HTTP_CONNECT_TIMEOUT", "2")),
+            pool_timeout=float(os.getenv("AUTH_HTTP_POOL_TIMEOUT", "2"))
+        )
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(limits=self.limits, timeout=self.timeout)
+        return self._client
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            logger.info("Auth HTTP client closed")
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        """GET through the shared pool while recording pool usage"""
+        started_at = time.perf_counter()
+        acquired = False
+
+        async def trace(event_name: str, info: Dict[str, Any]) -> None:
+            # The first connection-level event marks the end of the pool wait
+            nonlocal acquired
+            if acquired:
+                return
+            if event_name in ("connection.connect_tcp.started",
+                              "http11.send_request_headers.started",
+                              "http2.send_request_headers.started"):
+                acquired = True
+                self._record_pool_wait(time.perf_counter() - started_at)
+                if event_name == "connection.connect_tcp.started":
+                    self.new_connections += 1
+                else:
+                    self.reused_connections += 1
+
+        self.requests_total += 1
+        self.in_flight += 1
+        self.in_flight_peak = max(self.in_flight_peak, self.in_flight)
+        try:
+            return await self.client.get(url, extensions={"trace": trace}, **kwargs)
+        except httpx.PoolTimeout:
+            self.pool_timeouts += 1
+            logger.warning(f"Auth HTTP pool exhausted ({self.limits.max_connections} connections)")
+            raise
+        finally:
+            self.in_flight -= 1
+
+    def _record_pool_wait(self, wait: float) -> None:
+        self.pool_wait_total += wait
+        self.pool_wait_max = max(self.pool_wait_max, wait)
+
+    def stats(self) -> Dict[str, Any]:
+        """Pool saturation statistics, used to size the pool
+
+        Saturation is in-flight requests over max_connections: above 1.0,
+        requests are queueing for a pooled connection.
+        """
+        max_connections = self.limits.max_connections or 0
+        acquisitions = self.new_connections + self.reused_connections
+        return {
+            "max_connections": max_connections,
+            "max_keepalive_connections": self.limits.max_keepalive_connections,
+            "keepalive_expiry": self.limits.keepalive_expiry,
+            "requests_total": self.requests_total,
+            "in_flight": self.in_flight,
+            "in_flight_peak": self.in_flight_peak,
+            "saturation": round(self.in_flight / max_connections, 3) if max_connections else None,
+            "peak_saturation": round(self.in_flight_peak / max_connections, 3) if max_connections else None,
+            "new_connections": self.new_connections,
+            "reused_connections": self.reused_connections,
+            "pool_timeouts": self.pool_timeouts,
+            "pool_wait_avg_ms": round(self.pool_wait_total / acquisitions * 1000, 3) if acquisitions else 0.0,
+            "pool_wait_max_ms": round(self.pool_wait_max * 1000, 3)
+        }
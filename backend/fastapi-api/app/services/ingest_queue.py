@@ -0,0 +1,277 @@
+import asyncio
+import logging
+import os
+import uuid
+from datetime import timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+from sqlalchemy import and_, or_, select, update, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import AsyncSessionLocal
+from app.models.models import IngestJob, Track
+from app.services.cover_blob_service import CoverBlobService
+from app.services.storage import StorageService
+from app.services.storage.file_manager import FileManager
+from app.services.storage.renditions import rendition_store
+from app.services.track_service import TrackService
+
+logger = logging.getLogger(__name__)
+
+def _pick_cover_paths(embedded_cover: Optional[Dict[str, Any]]) -> Dict[str, Optional[str]]:
+    """Cover hash, cover and thumbnail paths to record on the track (prefer medium, then large, then small)"""
+    if not embedded_cover:
+        return {"cover_sha256": None, "cover_path": None, "cover_thumbnail_path": None}
+
+    thumbnails = embedded_cover.get('thumbnails', {})
+    cover_thumbnail_path = None
+    for size in ('medium', 'large', 'small'):
+        if size in thumbnails:
+            cover_thumbnail_path = thumbnails[size]['path']
+            break
+
+    return {
+        "cover_sha256": embedded_cover.get('sha256'),
+        "cover_path": embedded_cover.get('path'),
+        "cover_thumbnail_path": cover_thumbnail_path
+    }
+
+class IngestQueue:
+    """Persistent job queue for post-upload track enrichment (metadata, covers, thumbnails)
+
+    Jobs live in the ingest_jobs table, so they survive restarts. Workers claim
+    them with SELECT ... FOR UPDATE SKIP LOCKED, which lets several API
+    processes share the queue. A claimed job is leased for `job_timeout`
+    seconds; if its worker dies the job becomes claimable again. Failures are
+    retried with exponential backoff up to the job's max_attempts.
+    """
+
+    def __init__(self, concurrency: int = 1, poll_interval: float = 5.0,
+                 job_timeout: float = 300.0, retry_delay: float = 10.0, max_attempts: int = 3):
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.job_timeout = job_timeout
+        self.retry_delay = retry_delay
+        self.max_attempts = max_attempts
+
+        self._wakeup = asyncio.Event()
+        self._workers: List[asyncio.Task] = []
+
+        self.enqueued = 0
+        self.completed = 0
+        self.retried = 0
+        self.failed = 0
+
+    @classmethod
+    def from_env(cls) -> "IngestQueue":
+        """Build a queue configured from INGEST_WORKER_* / INGEST_JOB_* variables"""
+        return cls(
+            concurrency=int(os.getenv("INGEST_WORKER_CONCURRENCY", "2")),
+            poll_interval=float(os.getenv("INGEST_POLL_INTERVAL", "5")),
+            job_timeout=float(os.getenv("INGEST_JOB_TIMEOUT", "300")),
+            retry_delay=float(os.getenv("INGEST_RETRY_DELAY", "10")),
+            max_attempts=int(os.getenv("INGEST_MAX_ATTEMPTS", "3"))
+        )
+
+    def add_jobs(self, db: AsyncSession, track_ids: List[UUID], user_id: int) -> List[IngestJob]:
+        """Add enrichment jobs to the session without committing; call notify() after the commit"""
+        jobs = [
+            IngestJob(id=uuid.uuid4(), track_id=track_id, user_id=user_id, max_attempts=self.max_attempts)
+            for track_id in track_ids
+        ]
+        db.add_all(jobs)
+        self.enqueued += len(jobs)
+        return jobs
+
+    @staticmethod
+    async def get_user_job(db: AsyncSession, job_id: UUID, user_id: int) -> Optional[IngestJob]:
+        """Get an ingest job by ID for a specific user"""
+        result = await db.execute(
+            select(IngestJob).where(and_(IngestJob.id == job_id, IngestJob.user_id == user_id))
+        )
+        return result.scalars().first()
+
+    def notify(self) -> None:
+        """Wake idle workers instead of waiting for the next poll"""
+        self._wakeup.set()
+
+    def start(self) -> None:
+        if self._workers or self.concurrency <= 0:
+            return
+
+        self._workers = [asyncio.create_task(self._worker(n)) for n in range(self.concurrency)]
+        logger.info(f"Ingest queue started with {self.concurrency} workers")
+
+    async def stop(self) -> None:
+        for task in self._workers:
+            task.cancel()
+        # Interrupted jobs keep their lease and are picked up again after a restart
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def _worker(self, worker_id: int) -> None:
+        while True:
+            try:
+                job = await self._claim()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Ingest worker {worker_id} could not claim a job: {str(e)}")
+                job = None
+
+            if job is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            await self._run(job)
+
+    async def _claim(self) -> Optional[Dict[str, Any]]:
+        """Lease the next due job, or return None when the queue is empty"""
+        async with AsyncSessionLocal() as db:
+            now = func.current_timestamp()
+            result = await db.execute(
+                select(IngestJob, Track.file_path)
+                .join(Track, Track.id == IngestJob.track_id)
+                .where(or_(
+                    and_(IngestJob.status == 'pending', IngestJob.run_after <= now),
+                    and_(IngestJob.status == 'running', IngestJob.locked_until < now)
+                ))
+                .order_by(IngestJob.run_after)
+                .limit(1)
+                .with_for_update(of=IngestJob, skip_locked=True)
+            )
+            row = result.first()
+            if row is None:
+                return None
+
+            job, file_path = row
+            job.status = 'running'
+            job.attempts += 1
+            job.locked_until = now + timedelta(seconds=self.job_timeout)
+            claimed = {
+                "id": job.id,
+                "track_id": job.track_id,
+                "user_id": job.user_id,
+                "attempts": job.attempts,
+                "max_attempts": job.max_attempts,
+                "file_path": file_path
+            }
+            await db.commit()
+            return claimed
+
+    async def _run(self, job: Dict[str, Any]) -> None:
+        storage = StorageService()
+        filename = Path(job["file_path"]).name
+
+        try:
+            processed = await storage.process_stored_audio(job["file_path"], filename)
+            applied = await self._apply(job, processed, storage.file_manager)
+        except Exception as e:
+            await self._record_failure(job, e)
+            return
+
+        if not applied:
+            # Track deleted while processing: drop its cover unless other tracks share it
+            embedded_cover = processed.get('embedded_cover')
+            if embedded_cover:
+                async with AsyncSessionLocal() as db:
+                    await CoverBlobService.release(db, storage.file_manager, embedded_cover['sha256'], embedded_cover['size'])
+            logger.info(f"Track {job['track_id']} deleted during ingest, discarded results")
+            return
+
+        self.completed += 1
+        logger.info(f"Ingest job {job['id']} completed for track {job['track_id']}")
+        
+        # Low-bitrate renditions for bandwidth-constrained clients (no-op unless enabled)
+        rendition_store.schedule(job["file_path"], filename, (processed.get('metadata') or {}).get('bitrate'))
+
+    async def _apply(self, job: Dict[str, Any], processed: Dict[str, Any], file_manager: FileManager) -> bool:
+        """Store the extracted duration, covers and metadata on the track and close the job"""
+        async with AsyncSessionLocal() as db:
+            metadata = processed.get('metadata') or {}
+            embedded_cover = processed.get('embedded_cover')
+            duration_seconds = metadata.get('duration', 0)
+
+            # Lock the shared cover before the track references it; if the last
+            # track using it was deleted since it was written, the retry rewrites it
+            if embedded_cover and not await CoverBlobService.attach(
+                db, file_manager, embedded_cover['sha256'], embedded_cover['size']
+            ):
+                raise RuntimeError(f"Shared cover {embedded_cover['sha256']} was deleted during ingest")
+
+            result = await db.execute(
+                update(Track).where(Track.id == job["track_id"]).values(
+                    duration=timedelta(seconds=duration_seconds) if duration_seconds else timedelta(0),
+                    processing_status='ready',
+                    **_pick_cover_paths(embedded_cover)
+                ).execution_options(synchronize_session=False)
+            )
+            if result.rowcount == 0:
+                await db.rollback()
+                return False
+
+            if embedded_cover:
+                await TrackService.save_cover_keys(db, job["track_id"], job["user_id"], embedded_cover)
+
+            # Committed below with the job's completion: a job is never re-run
+            # over results that were already stored
+            if metadata:
+                await TrackService.save_metadata(db=db, track_id=job["track_id"], metadata=metadata, commit=False)
+
+            await db.execute(
+                update(IngestJob).where(IngestJob.id == job["id"]).values(
+                    status='completed',
+                    locked_until=None,
+                    last_error=None,
+                    completed_at=func.current_timestamp()
+                )
+            )
+            await db.commit()
+            return True
+
+    async def _record_failure(self, job: Dict[str, Any], error: Exception) -> None:
+        """Schedule a retry with exponential backoff, or fail the job and its track"""
+        logger.error(f"Ingest job {job['id']} attempt {job['attempts']}/{job['max_attempts']} failed: {str(error)}")
+
+        try:
+            async with AsyncSessionLocal() as db:
+                if job["attempts"] >= job["max_attempts"]:
+                    self.failed += 1
+                    values = {"status": 'failed', "locked_until": None, "completed_at": func.current_timestamp()}
+                    await db.execute(
+                        update(Track).where(Track.id == job["track_id"]).values(processing_status='failed')
+                        .execution_options(synchronize_session=False)
+                    )
+                else:
+                    self.retried += 1
+                    delay = self.retry_delay * 2 ** (job["attempts"] - 1)
+                    values = {
+                        "status": 'pending',
+                        "locked_until": None,
+                        "run_after": func.current_timestamp() + timedelta(seconds=delay)
+                    }
+
+                await db.execute(
+                    update(IngestJob).where(IngestJob.id == job["id"]).values(last_error=str(error), **values)
+                )
+                await db.commit()
+        except Exception as e:
+            # The lease expires and the job is claimed again
+            logger.error(f"Error recording failure of ingest job {job['id']}: {str(e)}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": len(self._workers),
+            "enqueued": self.enqueued,
+            "completed": self.completed,
+            "retried": self.retried,
+            "failed": self.failed
+        }
+
+# Started and stopped by the app lifespan
+ingest_queue = IngestQueue.from_env()
@@ -0,0 +1,102 @@
+import jwt
+import os
+from fastapi import HTTPException
+from typing import Any, Dict, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+class JWTVerifier:
+    """Local verification of Lexik JWTs against the auth service public key"""
+
+    def __init__(
+        self,
+        enabled: bool = False,
+        public_key: Optional[str] = None,
+        algorithms: Optional[List[str]] = None,
+        leeway: float = 0.0
+    ):
+        self.public_key = public_key
+        self.algorithms = algorithms or ["RS256"]
+        self.leeway = leeway
+        self.enabled = enabled and bool(public_key)
+
+        if enabled and not public_key:
+            logger.error("Local JWT verification enabled but no public key configured, falling back to /api/me")
+
+    @classmethod
+    def from_env(cls) -> "JWTVerifier":
+        """Build a verifier configured from AUTH_JWT_* environment variables"""
+        enabled = os.getenv("AUTH_JWT_LOCAL_VERIFY", "false").lower() == "true"
+        public_key = os.getenv("AUTH_JWT_PUBLIC_KEY")
+
+        if enabled and not public_key:
+            key_path = os.getenv("AUTH_JWT_PUBLIC_KEY_PATH", "/jwt/public.pem")
+            try:
+                with open(key_path, "r") as f:
+                    public_key = f.read()
+            except OSError as e:
+                logger.error(f"Could not read JWT public key {key_path}: {str(e)}")
+
+        algorithms = [alg.strip() for alg in os.getenv("AUTH_JWT_ALGORITHMS", "RS256").split(",") if alg.strip()]
+
+        return cls(
+            enabled=enabled,
+            public_key=public_key,
+            algorithms=algorithms,
+            leeway=float(os.getenv("AUTH_JWT_LEEWAY", "0"))
+        )
+
+    def verify(self, token: str) -> Optional[Dict[str, Any]]:
+        """Verify signature and expiry, and build the user dict from the claims
+
+        Returns None when local verification is disabled or the claims do not
+        carry enough information, so the caller can fall back to /api/me.
+        """
+        if not self.enabled:
+            return None
+
+        try:
+            claims = jwt.decode(
+                token,
+                self.public_key,
+                algorithms=self.algorithms,
+                leeway=self.leeway,
+                options={"require": ["exp"]}
+            )
+        except jwt.ExpiredSignatureError:
+            logger.warning("Authentication failed: Expired token (local verification)")
+            raise HTTPException(status_code=401, detail="Invalid or expired token")
+        except jwt.InvalidTokenError as e:
+            logger.warning(f"Authentication failed: Invalid token (local verification): {str(e)}")
+            raise HTTPException(status_code=401, detail="Invalid or expired token")
+
+        user_data = self._user_from_claims(claims)
+        if user_data is None:
+            logger.debug("JWT claims incomplete, falling back to auth service")
+        return user_data
+
+    @staticmethod
+    def _user_from_claims(claims: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Map Lexik claims to the /api/me user format"""
+        user_id = claims.get("id")
+        # Lexik stores the user identifier under `user_id_claim` (email here)
+        email = claims.get("email") or claims.get("username")
+
+        if not user_id or not email or "@" not in str(email):
+            return None
+
+        role = claims.get("role")
+        if not role:
+            roles = claims.get("roles") or []
+            role = "admin" if "ROLE_ADMIN" in roles else "user"
+
+        user_data = {
+            "id": int(user_id) if str(user_id).isdigit() else user_id,
+            "email": email,
+            "role": role
+        }
+        if claims.get("username") and claims.get("username") != email:
+            user_data["username"] = claims["username"]
+
+        return user_data
@@ -1,4 +1,5 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.models import Track, Metadata
 from app.schemas.schemas import MetadataUpdate
 from typing import Optional, Dict, Any
@@ -11,21 +12,25 @@ class MetadataEditService:
     """Service for editing track metadata"""
     
     @staticmethod
-    def update_track_metadata(db: Session, track_id: UUID, user_id: int, metadata_update: MetadataUpdate) -> Optional[Dict[str, Any]]:
+    async def update_track_metadata(db: AsyncSession, track_id: UUID, user_id: int, metadata_update: MetadataUpdate) -> Optional[Dict[str, Any]]:
         """Update track metadata for a specific user's track"""
         try:
             # Verify track ownership
-            track = db.query(Track).filter(
-                Track.id == track_id,
-                Track.user_id == user_id
-            ).first()
+            result = await db.execute(
+                select(Track).where(
+                    Track.id == track_id,
+                    Track.user_id == user_id
+                )
+            )
+            track = result.scalars().first()
             
             if not track:
                 logger.warning(f"Track {track_id} not found or does not belong to user {user_id}")
                 return None
             
             # Get existing metadata
-            existing_metadata = db.query(Metadata).filter(Metadata.track_id == track_id).first()
+            result = await db.execute(select(Metadata).where(Metadata.track_id == track_id))
+            existing_metadata = result.scalars().first()
             
             if existing_metadata:
                 # Update existing metadata
@@ -48,28 +53,32 @@ class MetadataEditService:
                 current_metadata = update_data
                 logger.info(f"Created new metadata for track {track_id}")
             
-            db.commit()
+            await db.commit()
             return current_metadata
             
         except Exception as e:
-            db.rollback()
+            await db.rollback()
             logger.error(f"Error updating metadata for track {track_id}: {str(e)}")
             raise
     
     @staticmethod
-    def get_track_metadata(db: Session, track_id: UUID, user_id: int) -> Optional[Dict[str, Any]]:
+    async def get_track_metadata(db: AsyncSession, track_id: UUID, user_id: int) -> Optional[Dict[str, Any]]:
         """Get track metadata for a specific user's track"""
         try:
             # Verify track ownership
-            track = db.query(Track).filter(
-                Track.id == track_id,
-                Track.user_id == user_id
-            ).first()
+            result = await db.execute(
+                select(Track).where(
+                    Track.id == track_id,
+                    Track.user_id == user_id
+                )
+            )
+            track = result.scalars().first()
             
             if not track:
                 return None
             
-            metadata = db.query(Metadata).filter(Metadata.track_id == track_id).first()
+            result = await db.execute(select(Metadata).where(Metadata.track_id == track_id))
+            metadata = result.scalars().first()
             
             if metadata:
                 return metadata.metadata_json
@@ -1,5 +1,5 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, select
 from app.models.models import Playlist
 from app.schemas.schemas import PlaylistCreate
 from typing import List, Optional
@@ -12,7 +12,7 @@ class PlaylistManager:
     """Service for managing playlist CRUD operations"""
     
     @staticmethod
-    def create_playlist(db: Session, playlist_data: PlaylistCreate, user_id: int) -> Playlist:
+    async def create_playlist(db: AsyncSession, playlist_data: PlaylistCreate, user_id: int) -> Playlist:
         """Create a new playlist"""
         try:
             db_playlist = Playlist(
@@ -20,42 +20,43 @@ class PlaylistManager:
                 **playlist_data.model_dump()
             )
             db.add(db_playlist)
-            db.commit()
-            db.refresh(db_playlist)
+            await db.commit()
+            await db.refresh(db_playlist)
             
             logger.info(f"Playlist created: {db_playlist.id} for user {user_id}")
             return db_playlist
             
         except Exception as e:
-            db.rollback()
+            await db.rollback()
             logger.error(f"Error creating playlist: {str(e)}")
             raise
 
     @staticmethod
-    def get_user_playlists(db: Session, user_id: int, skip: int = 0, limit: int = 100) -> List[Playlist]:
+    async def get_user_playlists(db: AsyncSession, user_id: int, skip: int = 0, limit: int = 100) -> List[Playlist]:
         """Get all playlists for a user"""
-        return db.query(Playlist).filter(Playlist.user_id == user_id).offset(skip).limit(limit).all()
+        result = await db.execute(
+            select(Playlist).where(Playlist.user_id == user_id).offset(skip).limit(limit)
+        )
+        return result.scalars().all()
 
     @staticmethod
-    def get_playlist_by_id(db: Session, playlist_id: UUID, user_id: int) -> Optional[Playlist]:
+    async def get_playlist_by_id(db: AsyncSession, playlist_id: UUID, user_id: int) -> Optional[Playlist]:
         """Get playlist by ID for a specific user"""
-        return db.query(Playlist).filter(
-            and_(
-                Playlist.id == playlist_id,
-                Playlist.user_id == user_id
+        result = await db.execute(
+            select(Playlist).where(
+                and_(
+                    Playlist.id == playlist_id,
+                    Playlist.user_id == user_id
+                )
             )
-        ).first()
+        )
+        return result.scalars().first()
 
     @staticmethod
-    def update_playlist(db: Session, playlist_id: UUID, playlist_data: PlaylistCreate, user_id: int) -> Optional[Playlist]:
+    async def update_playlist(db: AsyncSession, playlist_id: UUID, playlist_data: PlaylistCreate, user_id: int) -> Optional[Playlist]:
         """Update a playlist"""
         try:
-            playlist = db.query(Playlist).filter(
-                and_(
-                    Playlist.id == playlist_id,
-                    Playlist.user_id == user_id
-                )
-            ).first()
+            playlist = await PlaylistManager.get_playlist_by_id(db, playlist_id, user_id)
             
             if not playlist:
                 return None
@@ -63,48 +64,38 @@ class PlaylistManager:
             for field, value in playlist_data.model_dump().items():
                 setattr(playlist, field, value)
             
-            db.commit()
-            db.refresh(playlist)
+            await db.commit()
+            await db.refresh(playlist)
             
             logger.info(f"Playlist updated: {playlist_id}")
             return playlist
             
         except Exception as e:
-            db.rollback()
+            await db.rollback()
             logger.error(f"Error updating playlist {playlist_id}: {str(e)}")
             raise
 
     @staticmethod
-    def delete_playlist(db: Session, playlist_id: UUID, user_id: int) -> bool:
+    async def delete_playlist(db: AsyncSession, playlist_id: UUID, user_id: int) -> bool:
         """Delete a playlist"""
         try:
-            playlist = db.query(Playlist).filter(
-                and_(
-                    Playlist.id == playlist_id,
-                    Playlist.user_id == user_id
-                )
-            ).first()
+            playlist = await PlaylistManager.get_playlist_by_id(db, playlist_id, user_id)
             
             if not playlist:
                 return False
                 
-            db.delete(playlist)
-            db.commit()
+            await db.delete(playlist)
+            await db.commit()
             logger.info(f"Playlist deleted: {playlist_id}")
             return True
             
         except Exception as e:
-            db.rollback()
+            await db.rollback()
             logger.error(f"Error deleting playlist {playlist_id}: {str(e)}")
             raise
 
     @staticmethod
-    def verify_playlist_ownership(db: Session, playlist_id: UUID, user_id: int) -> bool:
+    async def verify_playlist_ownership(db: AsyncSession, playlist_id: UUID, user_id: int) -> bool:
         """Verify that a playlist belongs to a user"""
-        playlist = db.query(Playlist).filter(
-            and_(
-                Playlist.id == playlist_id,
-                Playlist.user_id == user_id
-            )
-        ).first()
+        playlist = await PlaylistManager.get_playlist_by_id(db, playlist_id, user_id)
         return playlist is not None
@@ -1,5 +1,5 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, or_, func, select
 from app.models.models import Playlist, Track, playlist_tracks
 from typing import List, Tuple
 from uuid import UUID
@@ -11,8 +11,15 @@ class PlaylistSearch:
     """Service for playlist search and suggestions"""
     
     @staticmethod
-    def search_playlists(
-        db: Session, 
+    async def _paginate(db: AsyncSession, query, limit: int, offset: int) -> Tuple[list, int]:
+        """Run a count and a page of a select statement"""
+        total = await db.scalar(select(func.count()).select_from(query.subquery()))
+        result = await db.execute(query.offset(offset).limit(limit))
+        return result.scalars().all(), total
+    
+    @staticmethod
+    async def search_playlists(
+        db: AsyncSession, 
         user_id: int, 
         query: str, 
         search_in_tracks: bool = False,
@@ -22,13 +29,11 @@ class PlaylistSearch:
     ) -> Tuple[List[Playlist], int]:
         """Search playlists by name, description and optionally tracks"""
         try:
-            base_query = db.query(Playlist).filter(Playlist.user_id == user_id)
+            base_query = select(Playlist).where(Playlist.user_id == user_id)
             
             # Return all playlists if no query
             if not query or query.strip() == "":
-                total = base_query.count()
-                playlists = base_query.offset(offset).limit(limit).all()
-                return playlists, total
+                return await PlaylistSearch._paginate(db, base_query, limit, offset)
             
             search_term = f"%{query.lower()}%"
             conditions = [
@@ -41,18 +46,17 @@ class PlaylistSearch:
             
             # Add track search if enabled
             if search_in_tracks:
-                track_subquery = db.query(playlist_tracks.c.playlist_id).join(
+                track_subquery = select(playlist_tracks.c.playlist_id).join(
                     Track, playlist_tracks.c.track_id == Track.id
-                ).filter(
+                ).where(
                     Track.original_filename.ilike(search_term)
                 ).distinct()
                 
                 conditions.append(Playlist.id.in_(track_subquery))
             
             # Execute search
-            search_query = base_query.filter(or_(*conditions))
-            total = search_query.count()
-            playlists = search_query.offset(offset).limit(limit).all()
+            search_query = base_query.where(or_(*conditions))
+            playlists, total = await PlaylistSearch._paginate(db, search_query, limit, offset)
             
             logger.info(f"Search for '{query}' returned {total} playlists for user {user_id}")
             return playlists, total
@@ -62,8 +66,8 @@ class PlaylistSearch:
             return [], 0
 
     @staticmethod
-    def search_tracks_in_playlist(
-        db: Session, 
+    async def search_tracks_in_playlist(
+        db: AsyncSession, 
         playlist_id: UUID, 
         user_id: int, 
         query: str,
@@ -73,44 +77,44 @@ class PlaylistSearch:
         """Search tracks within a specific playlist"""
         try:
             # Verify playlist ownership
-            playlist = db.query(Playlist).filter(
-                and_(
-                    Playlist.id == playlist_id,
-                    Playlist.user_id == user_id
+            result = await db.execute(
+                select(Playlist.id).where(
+                    and_(
+                        Playlist.id == playlist_id,
+                        Playlist.user_id == user_id
+                    )
                 )
-            ).first()
+            )
+            playlist = result.first()
             
             if not playlist:
                 return [], 0
             
             # Return all tracks if no query
             if not query or query.strip() == "":
-                base_query = db.query(Track).join(
+                base_query = select(Track).join(
                     playlist_tracks,
                     Track.id == playlist_tracks.c.track_id
-                ).filter(
+                ).where(
                     playlist_tracks.c.playlist_id == playlist_id
                 ).order_by(playlist_tracks.c.position)
                 
-                total = base_query.count()
-                tracks = base_query.offset(offset).limit(limit).all()
-                return tracks, total
+                return await PlaylistSearch._paginate(db, base_query, limit, offset)
             
             search_term = f"%{query.lower()}%"
             
             # Search in track filenames within the playlist
-            base_query = db.query(Track).join(
+            base_query = select(Track).join(
                 playlist_tracks,
                 Track.id == playlist_tracks.c.track_id
-            ).filter(
+            ).where(
                 and_(
                     playlist_tracks.c.playlist_id == playlist_id,
                     Track.original_filename.ilike(search_term)
                 )
             ).order_by(playlist_tracks.c.position)
             
-            total = base_query.count()
-            tracks = base_query.offset(offset).limit(limit).all()
+            tracks, total = await PlaylistSearch._paginate(db, base_query, limit, offset)
             
             logger.info(f"Search for '{query}' in playlist {playlist_id} returned {total} tracks")
             return tracks, total
@@ -120,7 +124,7 @@ class PlaylistSearch:
             return [], 0
 
     @staticmethod
-    def get_playlist_suggestions(db: Session, user_id: int, query: str, limit: int = 5) -> List[str]:
+    async def get_playlist_suggestions(db: AsyncSession, user_id: int, query: str, limit: int = 5) -> List[str]:
         """Get playlist name suggestions based on partial query"""
         try:
             if not query or len(query) < 2:
@@ -128,12 +132,15 @@ class PlaylistSearch:
             
             search_term = f"{query.lower()}%"
             
-            suggestions = db.query(Playlist.name).filter(
-                and_(
-                    Playlist.user_id == user_id,
-                    Playlist.name.ilike(search_term)
-                )
-            ).distinct().limit(limit).all()
+            result = await db.execute(
+                select(Playlist.name).where(
+                    and_(
+                        Playlist.user_id == user_id,
+                        Playlist.name.ilike(search_term)
+                    )
+                ).distinct().limit(limit)
+            )
+            suggestions = result.all()
             
             return [suggestion[0] for suggestion in suggestions]
             
@@ -142,32 +149,38 @@ class PlaylistSearch:
             return []
 
     @staticmethod
-    def get_recent_playlists(db: Session, user_id: int, limit: int = 10) -> List[Playlist]:
+    async def get_recent_playlists(db: AsyncSession, user_id: int, limit: int = 10) -> List[Playlist]:
         """Get recently created playlists for a user"""
         try:
-            return db.query(Playlist).filter(
-                Playlist.user_id == user_id
-            ).order_by(Playlist.created_at.desc()).limit(limit).all()
+            result = await db.execute(
+                select(Playlist).where(
+                    Playlist.user_id == user_id
+                ).order_by(Playlist.created_at.desc()).limit(limit)
+            )
+            return result.scalars().all()
             
         except Exception as e:
             logger.error(f"Error getting recent playlists for user {user_id}: {str(e)}")
             return []
 
     @staticmethod
-    def get_popular_playlists(db: Session, user_id: int, limit: int = 10) -> List[Playlist]:
+    async def get_popular_playlists(db: AsyncSession, user_id: int, limit: int = 10) -> List[Playlist]:
         """Get playlists with most tracks for a user"""
         try:
             # Subquery to count tracks per playlist
-            track_counts = db.query(
+            track_counts = select(
                 playlist_tracks.c.playlist_id,
                 func.count(playlist_tracks.c.track_id).label('track_count')
             ).group_by(playlist_tracks.c.playlist_id).subquery()
             
-            return db.query(Playlist).join(
-                track_counts, Playlist.id == track_counts.c.playlist_id
-            ).filter(
-                Playlist.user_id == user_id
-            ).order_by(track_counts.c.track_count.desc()).limit(limit).all()
+            result = await db.execute(
+                select(Playlist).join(
+                    track_counts, Playlist.id == track_counts.c.playlist_id
+                ).where(
+                    Playlist.user_id == user_id
+                ).order_by(track_counts.c.track_count.desc()).limit(limit)
+            )
+            return result.scalars().all()
             
         except Exception as e:
             logger.error(f"Error getting popular playlists for user {user_id}: {str(e)}")
@@ -1,5 +1,5 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, func, select
 from app.models.models import Playlist, Track, playlist_tracks
 from typing import List, Optional
 from uuid import UUID
@@ -11,42 +11,49 @@ class PlaylistTrackManager:
     """Service for managing tracks within playlists"""
     
     @staticmethod
-    def add_track_to_playlist(db: Session, playlist_id: UUID, track_id: UUID, user_id: int, position: Optional[int] = None) -> bool:
+    async def add_track_to_playlist(db: AsyncSession, playlist_id: UUID, track_id: UUID, user_id: int, position: Optional[int] = None) -> bool:
         """Add a track to a playlist"""
         try:
             # Verify playlist ownership
-            playlist = db.query(Playlist).filter(
-                and_(
-                    Playlist.id == playlist_id,
-                    Playlist.user_id == user_id
+            result = await db.execute(
+                select(Playlist.id).where(
+                    and_(
+                        Playlist.id == playlist_id,
+                        Playlist.user_id == user_id
+                    )
                 )
-            ).first()
+            )
+            playlist = result.first()
             
             if not playlist:
                 logger.warning(f"Playlist {playlist_id} not found for user {user_id}")
                 return False
             
             # Verify track ownership
-            track = db.query(Track).filter(
-                and_(
-                    Track.id == track_id,
-                    Track.user_id == user_id
+            result = await db.execute(
+                select(Track.id).where(
+                    and_(
+                        Track.id == track_id,
+                        Track.user_id == user_id
+                    )
                 )
-            ).first()
+            )
+            track = result.first()
             
             if not track:
                 logger.warning(f"Track {track_id} not found for user {user_id}")
                 return False
             
             # Check if track already exists in playlist
-            existing = db.execute(
+            result = await db.execute(
                 playlist_tracks.select().where(
                     and_(
                         playlist_tracks.c.playlist_id == playlist_id,
                         playlist_tracks.c.track_id == track_id
                     )
                 )
-            ).first()
+            )
+            existing = result.first()
             
             if existing:
                 logger.warning(f"Track {track_id} already in playlist {playlist_id}")
@@ -54,15 +61,15 @@ class PlaylistTrackManager:
             
             # Determine position if not provided
             if position is None:
-                max_position = db.execute(
-                    func.max(playlist_tracks.c.position).select().where(
+                max_position = await db.scalar(
+                    select(func.max(playlist_tracks.c.position)).where(
                         playlist_tracks.c.playlist_id == playlist_id
                     )
-                ).scalar() or 0
+                ) or 0
                 position = max_position + 1
             
             # Add track to playlist
-            db.execute(
+            await db.execute(
                 playlist_tracks.insert().values(
                     playlist_id=playlist_id,
                     track_id=track_id,
@@ -70,32 +77,35 @@ class PlaylistTrackManager:
                 )
             )
             
-            db.commit()
+            await db.commit()
             logger.info(f"Track {track_id} added to playlist {playlist_id} at position {position}")
             return True
             
         except Exception as e:
-            db.rollback()
+            await db.rollback()
             logger.error(f"Error adding track {track_id} to playlist {playlist_id}: {str(e)}")
             raise
 
     @staticmethod
-    def remove_track_from_playlist(db: Session, playlist_id: UUID, track_id: UUID, user_id: int) -> bool:
+    async def remove_track_from_playlist(db: AsyncSession, playlist_id: UUID, track_id: UUID, user_id: int) -> bool:
         """Remove a track from a playlist"""
         try:
             # Verify playlist ownership
-            playlist = db.query(Playlist).filter(
-                and_(
-                    Playlist.id == playlist_id,
-                    Playlist.user_id == user_id
+            result = await db.execute(
+                select(Playlist.id).where(
+                    and_(
+                        Playlist.id == playlist_id,
+                        Playlist.user_id == user_id
+                    )
                 )
-            ).first()
+            )
+            playlist = result.first()
             
             if not playlist:
                 return False
             
             # Remove track from playlist
-            result = db.execute(
+            result = await db.execute(
                 playlist_tracks.delete().where(
                     and_(
                         playlist_tracks.c.playlist_id == playlist_id,
@@ -104,7 +114,7 @@ class PlaylistTrackManager:
                 )
             )
             
-            db.commit()
+            await db.commit()
             
             if result.rowcount > 0:
                 logger.info(f"Track {track_id} removed from playlist {playlist_id}")
@@ -114,12 +124,12 @@ class PlaylistTrackManager:
                 return False
             
         except Exception as e:
-            db.rollback()
+            await db.rollback()
             logger.error(f"Error removing track {track_id} from playlist {playlist_id}: {str(e)}")
             raise
 
     @staticmethod
-    def reorder_playlist_tracks(db: Session, playlist_id: UUID, user_id: int, track_orders: List[dict]) -> bool:
+    async def reorder_playlist_tracks(db: AsyncSession, playlist_id: UUID, user_id: int, track_orders: List[dict]) -> bool:
         """Reorder tracks in a playlist
         
         Args:
@@ -127,12 +137,15 @@ class PlaylistTrackManager:
         """
         try:
             # Verify playlist ownership
-            playlist = db.query(Playlist).filter(
-                and_(
-                    Playlist.id == playlist_id,
-                    Playlist.user_id == user_id
+            result = await db.execute(
+                select(Playlist.id).where(
+                    and_(
+                        Playlist.id == playlist_id,
+                        Playlist.user_id == user_id
+                    )
                 )
-            ).first()
+            )
+            playlist = result.first()
             
             if not playlist:
                 return False
@@ -142,7 +155,7 @@ class PlaylistTrackManager:
                 track_id = track_order["track_id"]
                 position = track_order["position"]
                 
-                db.execute(
+                await db.execute(
                     playlist_tracks.update().where(
                         and_(
                             playlist_tracks.c.playlist_id == playlist_id,
@@ -151,58 +164,64 @@ class PlaylistTrackManager:
                     ).values(position=position)
                 )
             
-            db.commit()
+            await db.commit()
             logger.info(f"Reordered tracks in playlist {playlist_id}")
             return True
             
         except Exception as e:
-            db.rollback()
+            await db.rollback()
             logger.error(f"Error reordering playlist {playlist_id}: {str(e)}")
             raise
 
     @staticmethod
-    def get_playlist_tracks(db: Session, playlist_id: UUID, user_id: int) -> List[Track]:
+    async def get_playlist_tracks(db: AsyncSession, playlist_id: UUID, user_id: int) -> List[Track]:
         """Get all tracks in a playlist ordered by position"""
         try:
             # Verify playlist ownership
-            playlist = db.query(Playlist).filter(
-                and_(
-                    Playlist.id == playlist_id,
-                    Playlist.user_id == user_id
+            result = await db.execute(
+                select(Playlist.id).where(
+                    and_(
+                        Playlist.id == playlist_id,
+                        Playlist.user_id == user_id
+                    )
                 )
-            ).first()
+            )
+            playlist = result.first()
             
             if not playlist:
                 return []
             
             # Get tracks ordered by position
-            tracks = db.query(Track).join(
-                playlist_tracks,
-                Track.id == playlist_tracks.c.track_id
-            ).filter(
-                playlist_tracks.c.playlist_id == playlist_id
-            ).order_by(playlist_tracks.c.position).all()
+            result = await db.execute(
+                select(Track).join(
+                    playlist_tracks,
+                    Track.id == playlist_tracks.c.track_id
+                ).where(
+                    playlist_tracks.c.playlist_id == playlist_id
+                ).order_by(playlist_tracks.c.position)
+            )
             
-            return tracks
+            return result.scalars().all()
             
         except Exception as e:
             logger.error(f"Error getting tracks for playlist {playlist_id}: {str(e)}")
             return []
 
     @staticmethod
-    def get_track_position_in_playlist(db: Session, playlist_id: UUID, track_id: UUID) -> Optional[int]:
+    async def get_track_position_in_playlist(db: AsyncSession, playlist_id: UUID, track_id: UUID) -> Optional[int]:
         """Get the position of a track in a playlist"""
         try:
-            result = db.execute(
+            result = await db.execute(
                 playlist_tracks.select().where(
                     and_(
                         playlist_tracks.c.playlist_id == playlist_id,
                         playlist_tracks.c.track_id == track_id
                     )
                 )
-            ).first()
+            )
+            row = result.first()
             
-            return result.position if result else None
+            return row.position if row else None
             
         except Exception as e:
             logger.error(f"Error getting track position: {str(e)}")
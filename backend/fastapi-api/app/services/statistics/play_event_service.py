@@ -1,4 +1,4 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, timedelta
 from uuid import UUID
 
@@ -8,13 +8,13 @@ from .statistics_manager import StatisticsManager
 class PlayEventService:
     """Service for managing play events and listening statistics"""
     
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
         self.stats_manager = StatisticsManager(db)
     
-    def record_play_event(self, user_id: int, play_event: PlayEvent) -> StatisticsResponse:
+    async def record_play_event(self, user_id: int, play_event: PlayEvent) -> StatisticsResponse:
         """Record a play event and update statistics"""
-        stats = self.stats_manager.get_or_create_statistics(user_id, play_event.track_id)
+        stats = await self.stats_manager.get_or_create_statistics(user_id, play_event.track_id)
         
         # Update play count
         stats.play_count += 1
@@ -33,7 +33,7 @@ class PlayEventService:
         if play_event.completed or play_event.listen_duration >= completion_threshold:
             stats.complete_plays += 1
         
-        self.db.commit()
-        self.db.refresh(stats)
+        await self.db.commit()
+        await self.db.refresh(stats)
         
         return StatisticsResponse.model_validate(stats)
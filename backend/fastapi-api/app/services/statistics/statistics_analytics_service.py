@@ -1,5 +1,5 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import func, desc
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, desc, select
 from typing import List
 
 from app.models.models import Statistics, Track
@@ -8,31 +8,33 @@ from app.schemas.schemas import TrackResponse
 class StatisticsAnalyticsService:
     """Service for analytics and rankings based on statistics"""
     
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
     
-    def get_top_tracks_global(self, limit: int = 10) -> List[TrackResponse]:
+    async def get_top_tracks_global(self, limit: int = 10) -> List[TrackResponse]:
         """Get globally most played tracks"""
         top_tracks_query = (
-            self.db.query(Track)
+            select(Track)
             .join(Statistics)
             .group_by(Track.id)
             .order_by(desc(func.sum(Statistics.play_count)))
             .limit(limit)
         )
         
-        return [TrackResponse.model_validate(track) for track in top_tracks_query.all()]
+        result = await self.db.execute(top_tracks_query)
+        return [TrackResponse.model_validate(track) for track in result.scalars().all()]
     
-    def get_top_rated_tracks(self, limit: int = 10, min_ratings: int = 5) -> List[TrackResponse]:
+    async def get_top_rated_tracks(self, limit: int = 10, min_ratings: int = 5) -> List[TrackResponse]:
         """Get highest rated tracks (with minimum number of ratings)"""
         top_rated_query = (
-            self.db.query(Track)
+            select(Track)
             .join(Statistics)
-            .filter(Statistics.user_rating.isnot(None))
+            .where(Statistics.user_rating.isnot(None))
             .group_by(Track.id)
             .having(func.count(Statistics.user_rating) >= min_ratings)
             .order_by(desc(func.avg(Statistics.user_rating)))
             .limit(limit)
         )
         
-        return [TrackResponse.model_validate(track) for track in top_rated_query.all()]
+        result = await self.db.execute(top_rated_query)
+        return [TrackResponse.model_validate(track) for track in result.scalars().all()]
@@ -1,5 +1,5 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, select
 from typing import Optional
 from datetime import datetime, timedelta
 from uuid import UUID
@@ -10,14 +10,17 @@ from app.schemas.schemas import StatisticsResponse
 class StatisticsManager:
     """Service for basic statistics management operations"""
     
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
     
-    def get_or_create_statistics(self, user_id: int, track_id: UUID) -> Statistics:
+    async def get_or_create_statistics(self, user_id: int, track_id: UUID) -> Statistics:
         """Get existing statistics or create new ones for user-track pair"""
-        stats = self.db.query(Statistics).filter(
-            and_(Statistics.user_id == user_id, Statistics.track_id == track_id)
-        ).first()
+        result = await self.db.execute(
+            select(Statistics).where(
+                and_(Statistics.user_id == user_id, Statistics.track_id == track_id)
+            )
+        )
+        stats = result.scalars().first()
         
         if not stats:
             stats = Statistics(
@@ -29,22 +32,24 @@ class StatisticsManager:
                 complete_plays=0
             )
             self.db.add(stats)
-            self.db.commit()
-            self.db.refresh(stats)
+            await self.db.commit()
+            await self.db.refresh(stats)
         
         return stats
     
-    def get_user_statistics(self, user_id: int, track_id: Optional[UUID] = None) -> Optional[StatisticsResponse]:
+    async def get_user_statistics(self, user_id: int, track_id: Optional[UUID] = None) -> Optional[StatisticsResponse]:
         """Get statistics for a specific user-track pair"""
-        query = self.db.query(Statistics).filter(Statistics.user_id == user_id)
+        query = select(Statistics).where(Statistics.user_id == user_id)
         
         if track_id:
-            query = query.filter(Statistics.track_id == track_id)
-            stats = query.first()
+            query = query.where(Statistics.track_id == track_id)
+            result = await self.db.execute(query)
+            stats = result.scalars().first()
             return StatisticsResponse.model_validate(stats) if stats else None
         
         # Return all user statistics if no track specified
-        all_stats = query.all()
+        result = await self.db.execute(query)
+        all_stats = result.scalars().all()
         return [StatisticsResponse.model_validate(stat) for stat in all_stats]
     
     @staticmethod
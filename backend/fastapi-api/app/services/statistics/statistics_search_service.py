@@ -1,4 +1,5 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 
 from app.models.models import Statistics
@@ -7,37 +8,38 @@ from app.schemas.schemas import StatisticsSearchParams, StatisticsResponse
 class StatisticsSearchService:
     """Service for searching and filtering statistics"""
     
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
     
-    def search_statistics(self, params: StatisticsSearchParams) -> List[StatisticsResponse]:
+    async def search_statistics(self, params: StatisticsSearchParams) -> List[StatisticsResponse]:
         """Search statistics with various filters"""
-        query = self.db.query(Statistics)
+        query = select(Statistics)
         
         # Apply filters
         if params.user_id:
-            query = query.filter(Statistics.user_id == params.user_id)
+            query = query.where(Statistics.user_id == params.user_id)
         
         if params.track_id:
-            query = query.filter(Statistics.track_id == params.track_id)
+            query = query.where(Statistics.track_id == params.track_id)
         
         if params.min_play_count:
-            query = query.filter(Statistics.play_count >= params.min_play_count)
+            query = query.where(Statistics.play_count >= params.min_play_count)
         
         if params.min_rating:
-            query = query.filter(Statistics.user_rating >= params.min_rating)
+            query = query.where(Statistics.user_rating >= params.min_rating)
         
         if params.max_rating:
-            query = query.filter(Statistics.user_rating <= params.max_rating)
+            query = query.where(Statistics.user_rating <= params.max_rating)
         
         if params.date_from:
-            query = query.filter(Statistics.last_played >= params.date_from)
+            query = query.where(Statistics.last_played >= params.date_from)
         
         if params.date_to:
-            query = query.filter(Statistics.last_played <= params.date_to)
+            query = query.where(Statistics.last_played <= params.date_to)
         
         # Apply pagination
         query = query.offset(params.offset).limit(params.limit)
         
-        results = query.all()
+        result = await self.db.execute(query)
+        results = result.scalars().all()
         return [StatisticsResponse.model_validate(stat) for stat in results]
@@ -1,5 +1,5 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import desc
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import desc, select
 from typing import List
 from datetime import timedelta
 from uuid import UUID
@@ -11,14 +11,15 @@ from .statistics_manager import StatisticsManager
 class StatisticsSummaryService:
     """Service for generating comprehensive statistics summaries"""
     
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
         self.stats_manager = StatisticsManager(db)
     
-    def get_user_summary(self, user_id: int) -> UserStatisticsSummary:
+    async def get_user_summary(self, user_id: int) -> UserStatisticsSummary:
         """Get comprehensive statistics summary for a user"""
         # Get all user statistics and calculate totals in Python
-        user_stats = self.db.query(Statistics).filter(Statistics.user_id == user_id).all()
+        result = await self.db.execute(select(Statistics).where(Statistics.user_id == user_id))
+        user_stats = result.scalars().all()
         
         # Calculate totals
         total_tracks = len(user_stats)
@@ -39,24 +40,26 @@ class StatisticsSummaryService:
         
         # Get favorite tracks (top 5 most played)
         favorite_tracks_query = (
-            self.db.query(Track)
+            select(Track)
             .join(Statistics)
-            .filter(Statistics.user_id == user_id)
+            .where(Statistics.user_id == user_id)
             .order_by(desc(Statistics.play_count))
             .limit(5)
         )
-        favorite_tracks = [TrackResponse.model_validate(track) for track in favorite_tracks_query.all()]
+        result = await self.db.execute(favorite_tracks_query)
+        favorite_tracks = [TrackResponse.model_validate(track) for track in result.scalars().all()]
         
         # Get recently played tracks (last 10)
         recently_played_query = (
-            self.db.query(Track)
+            select(Track)
             .join(Statistics)
-            .filter(Statistics.user_id == user_id)
-            .filter(Statistics.last_played.isnot(None))
+            .where(Statistics.user_id == user_id)
+            .where(Statistics.last_played.isnot(None))
             .order_by(desc(Statistics.last_played))
             .limit(10)
         )
-        recently_played = [TrackResponse.model_validate(track) for track in recently_played_query.all()]
+        result = await self.db.execute(recently_played_query)
+        recently_played = [TrackResponse.model_validate(track) for track in result.scalars().all()]
         
         return UserStatisticsSummary(
             user_id=user_id,
@@ -70,10 +73,11 @@ class StatisticsSummaryService:
             recently_played=recently_played
         )
     
-    def get_track_summary(self, track_id: UUID) -> TrackStatisticsSummary:
+    async def get_track_summary(self, track_id: UUID) -> TrackStatisticsSummary:
         """Get comprehensive statistics summary for a track"""
         # Get all statistics for this track and calculate totals in Python
-        track_stats = self.db.query(Statistics).filter(Statistics.track_id == track_id).all()
+        result = await self.db.execute(select(Statistics).where(Statistics.track_id == track_id))
+        track_stats = result.scalars().all()
         
         # Calculate totals
         total_plays = sum(stat.play_count for stat in track_stats)
@@ -0,0 +1,33 @@
+import logging
+from pathlib import Path
+from typing import Dict, Any
+from mutagen import File as MutagenFile
+
+from .cover_processor import CoverProcessor
+from .metadata_extractor import MetadataExtractor
+
+logger = logging.getLogger(__name__)
+
+class AudioProbe:
+    """Single-pass audio probe: parses the container once for every ingest consumer"""
+
+    def __init__(self, cover_processor: CoverProcessor, metadata_extractor: MetadataExtractor = None):
+        self.cover_processor = cover_processor
+        self.metadata_extractor = metadata_extractor or MetadataExtractor()
+
+    def probe(self, file_path: Path) -> Dict[str, Any]:
+        """Parse an audio file once and return its metadata and embedded picture
+
+        `metadata` holds the tags, technical info and duration (as produced by
+        MetadataExtractor), `picture` the embedded cover bytes or None.
+        """
+        try:
+            audio_file = MutagenFile(str(file_path))
+        except Exception as e:
+            logger.error(f"Failed to parse audio file {file_path}: {str(e)}")
+            return {"metadata": {}, "picture": None}
+
+        return {
+            "metadata": self.metadata_extractor.extract_from_audio(audio_file, file_path),
+            "picture": self.cover_processor.extract_picture(audio_file)
+        }
@@ -1,4 +1,7 @@
+import hashlib
 import logging
+import os
+import uuid
 from pathlib import Path
 from typing import Optional, Dict, Any
 import aiofiles
@@ -7,7 +10,8 @@ from mutagen import File as MutagenFile
 from mutagen.flac import Picture
 import base64
 
-from .thumbnail_generator import ThumbnailGenerator
+from .file_manager import FileManager
+from .thumbnail_generator import ThumbnailGenerator, THUMBNAIL_EAGER_SIZES
 
 logger = logging.getLogger(__name__)
 
@@ -21,7 +25,14 @@ class CoverProcessor:
     def extract_embedded_cover(self, audio_file_path: Path) -> Optional[bytes]:
         """Extract embedded cover art from audio file"""
         try:
-            audio_file = MutagenFile(str(audio_file_path))
+            return self.extract_picture(MutagenFile(str(audio_file_path)))
+        except Exception as e:
+            logger.error(f"Error extracting embedded cover from {audio_file_path}: {str(e)}")
+            return None
+    
+    def extract_picture(self, audio_file) -> Optional[bytes]:
+        """Extract embedded cover art from an already parsed mutagen file"""
+        try:
             if audio_file is None:
                 return None
             
@@ -65,36 +76,48 @@ class CoverProcessor:
             return None
             
         except Exception as e:
-            logger.error(f"Error extracting embedded cover from {audio_file_path}: {str(e)}")
+            logger.error(f"Error extracting embedded cover: {str(e)}")
             return None
     
-    async def extract_and_process_cover(self, audio_file_path: str, audio_filename: str, user_id: str) -> Optional[Dict[str, Any]]:
-        """Extract cover from audio file and generate thumbnails"""
+    def process_embedded_cover(self, audio_file_path: str, audio_filename: str) -> Optional[Dict[str, Any]]:
+        """Extract cover from audio file and generate thumbnails (blocking, run in the ingest pool)"""
         embedded_cover = self.extract_embedded_cover(Path(audio_file_path))
         
         if not embedded_cover:
             return None
         
+        return self.save_embedded_cover(embedded_cover, audio_filename)
+    
+    def save_embedded_cover(self, embedded_cover: bytes, audio_filename: str) -> Optional[Dict[str, Any]]:
+        """Store an extracted cover by content hash and generate thumbnails, unless already stored (blocking)"""
         try:
-            audio_base_name = Path(audio_filename).stem
-            cover_filename = f"{audio_base_name}_cover.jpg"
+            sha256 = hashlib.sha256(embedded_cover).hexdigest()
+            cover_filename = FileManager.shared_cover_filename(sha256)
             cover_path = self.cover_path / cover_filename
             
-            # Save original cover
-            async with aiofiles.open(cover_path, 'wb') as f:
-                await f.write(embedded_cover)
-            
-            # Generate thumbnails
-            thumbnails = await self.thumbnail_generator.generate_all_thumbnails(
-                embedded_cover, cover_filename, self.cover_path
-            )
-            
-            logger.info(f"Processed cover for {audio_filename}: {len(thumbnails)} thumbnails generated")
+            # Same art as a track processed before (e.g. the rest of its album): nothing to encode
+            thumbnails = self.thumbnail_generator.get_all_thumbnails(cover_filename, self.cover_path)
+            eager_sizes = [name for name in THUMBNAIL_EAGER_SIZES if name in ThumbnailGenerator.THUMBNAIL_SIZES]
+            if cover_path.exists() and all(name in thumbnails for name in eager_sizes):
+                logger.info(f"Processed cover for {audio_filename}: reused shared cover {sha256}")
+            else:
+                # Save original cover (temporary file and rename: other tracks may be reading it)
+                temp_path = cover_path.with_name(f".{cover_filename}.{uuid.uuid4().hex}.part")
+                temp_path.write_bytes(embedded_cover)
+                os.replace(temp_path, cover_path)
+                
+                # Generate thumbnails
+                thumbnails = self.thumbnail_generator.write_all_thumbnails(
+                    embedded_cover, cover_filename, self.cover_path
+                )
+                
+                logger.info(f"Processed cover for {audio_filename}: {len(thumbnails)} thumbnails generated")
             
             return {
                 "filename": cover_filename,
                 "path": str(cover_path),
                 "size": len(embedded_cover),
+                "sha256": sha256,
                 "content_type": "image/jpeg",
                 "thumbnails": thumbnails
             }
@@ -108,12 +131,10 @@ class CoverProcessor:
         # Validate and save the image file
         file_manager.validate_image_file(file)
         
-        # Read content for thumbnails before saving (as save_image_file will consume the file)
-        content = await file.read()
-        
-        # Reset file pointer and save
-        file.file.seek(0)
+        # Stream the upload to disk, then read the stored image back for thumbnails
         file_info = await file_manager.save_image_file(file, user_id)
+        async with aiofiles.open(file_info["path"], 'rb') as f:
+            content = await f.read()
         
         # Generate thumbnails
         thumbnails = await self.thumbnail_generator.generate_all_thumbnails(
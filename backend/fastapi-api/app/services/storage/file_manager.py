@@ -1,8 +1,12 @@
+import asyncio
+import hashlib
+import os
 import uuid
 import logging
 import re
+import shutil
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import AsyncIterator, Dict, Any, List, Optional
 import aiofiles
 from fastapi import UploadFile, HTTPException
 
@@ -19,10 +23,20 @@ class FileManager:
     
     ALLOWED_AUDIO_EXTENSIONS = ['.mp3', '.wav', '.flac', '.ogg', '.aac', '.m4a']
     
+    # Uploads are streamed to disk in chunks of this size (bounds memory per upload)
+    UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", str(1024 * 1024)))
+    
+    # Embedded covers shared by content hash ({sha256}.jpg) and their thumbnails
+    SHARED_COVER_PATTERN = re.compile(r"^[0-9a-f]{64}[._]")
+    
     def __init__(self, base_path: Path):
         self.base_path = base_path
         self.audio_path = base_path / "audio"
+        self.blob_path = self.audio_path / "blobs"
         self.cover_path = base_path / "cover"
+        self.rendition_path = base_path / "renditions"
+        self.hls_path = base_path / "hls"
+        self.thumbnail_cache_path = base_path / "thumbnails"
     
     def validate_audio_file(self, file: UploadFile) -> None:
         """Validate audio file type and extension"""
@@ -47,44 +61,160 @@ class FileManager:
         unique_id = str(uuid.uuid4())
         return f"{user_id}_{unique_id}{file_extension}"
     
+    async def _stream_to_file(self, file: UploadFile, file_path: Path) -> Dict[str, Any]:
+        """Stream an upload to disk chunk by chunk (see _write_chunks)"""
+        await file.seek(0)
+        
+        async def upload_chunks() -> AsyncIterator[bytes]:
+            while True:
+                chunk = await file.read(self.UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield chunk
+        
+        return await self._write_chunks(upload_chunks(), file_path)
+    
+    async def _write_chunks(self, chunks: AsyncIterator[bytes], file_path: Path) -> Dict[str, Any]:
+        """Write chunks to a temporary file while hashing them, then rename it into place
+        
+        The temporary file lives next to the destination so the rename is atomic
+        and readers never see a partial file.
+        """
+        temp_path = file_path.with_name(f".{file_path.name}.part")
+        sha256 = hashlib.sha256()
+        size = 0
+        
+        try:
+            async with aiofiles.open(temp_path, 'wb') as f:
+                async for chunk in chunks:
+                    sha256.update(chunk)
+                    size += len(chunk)
+                    await f.write(chunk)
+                
+                # Make the bytes durable before the file becomes visible: uploads
+                # are acknowledged before any processing runs
+                await f.flush()
+                await asyncio.to_thread(os.fsync, f.fileno())
+            
+            os.replace(temp_path, file_path)
+        except BaseException:
+            temp_path.unlink(missing_ok=True)
+            raise
+        
+        return {"size": size, "sha256": sha256.hexdigest()}
+    
     async def save_audio_file(self, file: UploadFile, user_id: str) -> Dict[str, Any]:
         """Save audio file to storage"""
         filename = self._generate_filename(file.filename, user_id)
         file_path = self.audio_path / filename
         
-        content = await file.read()
-        async with aiofiles.open(file_path, 'wb') as f:
-            await f.write(content)
+        written = await self._stream_to_file(file, file_path)
         
-        logger.info(f"Saved audio file: {filename} ({len(content)} bytes)")
+        logger.info(f"Saved audio file: {filename} ({written['size']} bytes)")
         
         return {
             "filename": filename,
             "original_filename": file.filename,
             "path": str(file_path),
-            "size": len(content),
+            "size": written["size"],
+            "sha256": written["sha256"],
             "content_type": file.content_type
         }
     
+    async def save_audio_parts(self, part_paths: List[Path], original_filename: str, user_id: str, content_type: Optional[str] = None) -> Dict[str, Any]:
+        """Save an audio file assembled from uploaded parts, streamed in order"""
+        filename = self._generate_filename(original_filename, user_id)
+        file_path = self.audio_path / filename
+        
+        async def part_chunks() -> AsyncIterator[bytes]:
+            for part_path in part_paths:
+                async with aiofiles.open(part_path, 'rb') as part:
+                    while True:
+                        chunk = await part.read(self.UPLOAD_CHUNK_SIZE)
+                        if not chunk:
+                            break
+                        yield chunk
+        
+        written = await self._write_chunks(part_chunks(), file_path)
+        
+        logger.info(f"Assembled audio file: {filename} from {len(part_paths)} parts ({written['size']} bytes)")
+        
+        return {
+            "filename": filename,
+            "original_filename": original_filename,
+            "path": str(file_path),
+            "size": written["size"],
+            "sha256": written["sha256"],
+            "content_type": content_type
+        }
+    
     async def save_image_file(self, file: UploadFile, user_id: str) -> Dict[str, Any]:
         """Save image file to storage"""
         filename = self._generate_filename(file.filename, user_id)
         file_path = self.cover_path / filename
         
-        content = await file.read()
-        async with aiofiles.open(file_path, 'wb') as f:
-            await f.write(content)
+        written = await self._stream_to_file(file, file_path)
         
-        logger.info(f"Saved image file: {filename} ({len(content)} bytes)")
+        logger.info(f"Saved image file: {filename} ({written['size']} bytes)")
         
         return {
             "filename": filename,
             "original_filename": file.filename,
             "path": str(file_path),
-            "size": len(content),
+            "size": written["size"],
+            "sha256": written["sha256"],
             "content_type": file.content_type
         }
     
+    def share_blob(self, filename: str, sha256: str) -> bool:
+        """Make a stored audio file and the blob of its content the same file on disk
+        
+        The first copy of some content becomes the blob (a hard link, so the
+        track file itself is untouched); later copies are atomically replaced
+        by a hard link to the existing blob. Returns True if the file was
+        deduplicated.
+        """
+        file_path = self.audio_path / filename
+        blob_file = self.blob_path / sha256
+        self.blob_path.mkdir(parents=True, exist_ok=True)
+        
+        try:
+            os.link(file_path, blob_file)
+            return False
+        except FileExistsError:
+            pass
+        
+        temp_path = file_path.with_name(f".{file_path.name}.link")
+        os.link(blob_file, temp_path)
+        os.replace(temp_path, file_path)
+        logger.info(f"Audio file {filename} deduplicated against blob {sha256}")
+        return True
+    
+    def link_blob(self, sha256: str, filename: str) -> Path:
+        """Create a stored audio file as a hard link to an existing blob (FileNotFoundError if absent)"""
+        file_path = self.audio_path / filename
+        os.link(self.blob_path / sha256, file_path)
+        return file_path
+    
+    def delete_blob(self, sha256: str) -> None:
+        """Delete an audio blob once no track file shares it"""
+        (self.blob_path / sha256).unlink(missing_ok=True)
+        logger.info(f"Deleted audio blob: {sha256}")
+    
+    @staticmethod
+    def shared_cover_filename(sha256: str) -> str:
+        return f"{sha256}.jpg"
+    
+    def shared_cover_exists(self, sha256: str) -> bool:
+        return (self.cover_path / self.shared_cover_filename(sha256)).exists()
+    
+    def delete_shared_cover(self, sha256: str) -> None:
+        """Delete a shared embedded cover and its thumbnails once no track references it"""
+        cover_filename = self.shared_cover_filename(sha256)
+        (self.cover_path / cover_filename).unlink(missing_ok=True)
+        self._delete_thumbnails_for_cover(cover_filename)
+        logger.info(f"Deleted shared cover: {cover_filename}")
+    
     def delete_file(self, filename: str, file_type: str = "audio", include_thumbnails: bool = True) -> bool:
         """Delete file and optionally related thumbnails"""
         try:
@@ -96,7 +226,10 @@ class FileManager:
                 deleted = True
                 logger.info(f"Deleted {file_type} file: {filename}")
             
-            # Delete related covers and thumbnails for audio files
+            # Delete related covers, thumbnails, renditions and HLS output for audio files
+            if file_type == "audio" and deleted:
+                self._delete_renditions(filename)
+                shutil.rmtree(self.hls_path / Path(filename).stem, ignore_errors=True)
             if file_type == "audio" and include_thumbnails and deleted:
                 self._delete_related_covers(filename)
             elif file_type == "cover" and include_thumbnails and deleted:
@@ -108,8 +241,22 @@ class FileManager:
             logger.error(f"Error deleting {file_type} file {filename}: {str(e)}")
             return False
     
+    def _delete_renditions(self, audio_filename: str) -> None:
+        """Delete transcoded renditions of an audio file"""
+        for rendition_file in self.rendition_path.glob(f"{Path(audio_filename).stem}.*"):
+            try:
+                rendition_file.unlink()
+                logger.info(f"Deleted rendition: {rendition_file.name}")
+            except Exception as e:
+                logger.error(f"Error deleting rendition {rendition_file.name}: {str(e)}")
+    
     def _delete_related_covers(self, audio_filename: str) -> None:
-        """Delete covers and thumbnails related to an audio file"""
+        """Delete the per-track covers and thumbnails of an audio file
+        
+        Only covers stored before covers were shared by content hash are
+        named after the audio file; shared ones go with their last track
+        (CoverBlobService.purge_unreferenced).
+        """
         base_name = Path(audio_filename).stem
         cover_pattern = f"{base_name}_cover.*"
         
@@ -135,6 +282,10 @@ class FileManager:
                     logger.info(f"Deleted thumbnail: {thumb_name}")
                 except Exception as e:
                     logger.error(f"Error deleting thumbnail {thumb_name}: {str(e)}")
+        
+        # On-demand sizes cached by ThumbnailCache
+        for thumb_path in self.thumbnail_cache_path.glob(f"{Path(cover_filename).stem}_*.*"):
+            thumb_path.unlink(missing_ok=True)
     
     def get_file_path(self, filename: str, file_type: str = "audio") -> Optional[Path]:
         """Get file path if it exists"""
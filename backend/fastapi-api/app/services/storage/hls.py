@@ -0,0 +1,292 @@
+import asyncio
+import fcntl
+import logging
+import os
+import re
+import shutil
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Set, Tuple
+
+from .renditions import run_ffmpeg
+
+logger = logging.getLogger(__name__)
+
+PLAYLIST_NAME = "index.m3u8"
+SEGMENT_PATTERN = re.compile(r"^segment_\d{5}\.ts$")
+# Written into a track directory once ffmpeg has finished
+COMPLETE_MARKER = ".complete"
+
+# Sources that can go into MPEG-TS as they are; everything else is encoded to AAC
+COPYABLE_EXTENSIONS = {".mp3", ".aac"}
+
+class HLSStore:
+    """Lazily generated, disk-cached HLS output of tracks
+
+    The first playlist or segment request for a track starts segmenting it
+    with ffmpeg into STORAGE_PATH/hls/{audio stem}/ (index.m3u8 plus
+    fixed-duration MPEG-TS segments) and only waits until the playlist lists
+    its first `min_segments` segments, or the requested segment exists.
+    ffmpeg writes an EVENT playlist and moves each segment into place once
+    complete; a .complete marker is added when the run ends. At most
+    `concurrency` ffmpeg processes run at once, and a lock file keeps two API
+    processes from generating the same track. Whole directories are evicted
+    least-recently-used under a disk budget, skipping output played in the
+    last `evict_grace` seconds, and regenerated on the next request.
+    """
+
+    def __init__(
+        self,
+        base_path: Path,
+        enabled: bool = False,
+        ffmpeg_path: str = "ffmpeg",
+        segment_duration: int = 6,
+        audio_bitrate: int = 192,
+        disk_budget: int = 5 * 1024 ** 3,
+        concurrency: int = 2,
+        min_segments: int = 2,
+        wait_timeout: float = 30.0,
+        evict_grace: float = 300.0,
+        poll_interval: float = 0.2
+    ):
+        self.hls_path = base_path / "hls"
+        self.enabled = enabled
+        self.ffmpeg_path = ffmpeg_path
+        self.segment_duration = segment_duration
+        self.audio_bitrate = audio_bitrate
+        self.disk_budget = disk_budget
+        self.concurrency = concurrency
+        self.min_segments = min_segments
+        self.wait_timeout = wait_timeout
+        self.evict_grace = evict_grace
+        self.poll_interval = poll_interval
+
+        self._generations: Dict[str, asyncio.Task] = {}
+        # Tracks whose output is being written, by this process or another one
+        self._writing: Set[str] = set()
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+        self.generated = 0
+        self.failed = 0
+        self.evicted = 0
+        self.timeouts = 0
+
+    @classmethod
+    def from_env(cls) -> "HLSStore":
+        """Build a store configured from HLS_* variables"""
+        return cls(
+            base_path=Path(os.getenv("STORAGE_PATH", "/storage")),
+            enabled=os.getenv("HLS_ENABLED", "false").lower() == "true",
+            ffmpeg_path=os.getenv("FFMPEG_PATH", "ffmpeg"),
+            segment_duration=int(os.getenv("HLS_SEGMENT_DURATION", "6")),
+            audio_bitrate=int(os.getenv("HLS_AUDIO_BITRATE", "192")),
+            disk_budget=int(os.getenv("HLS_DISK_BUDGET", str(5 * 1024 ** 3))),
+            concurrency=int(os.getenv("HLS_CONCURRENCY", "2")),
+            min_segments=int(os.getenv("HLS_MIN_SEGMENTS", "2")),
+            wait_timeout=float(os.getenv("HLS_WAIT_TIMEOUT", "30")),
+            evict_grace=float(os.getenv("HLS_EVICT_GRACE", "300"))
+        )
+
+    def directory_for(self, storage_key: str) -> Path:
+        return self.hls_path / Path(storage_key).stem
+
+    async def get_file(self, source_path: Path, storage_key: str, name: str) -> Tuple[Path, bool]:
+        """Path of the playlist or a segment of a track, and whether the output is complete
+
+        Generation is started if needed. Raises FileNotFoundError for a
+        segment that does not exist, TimeoutError if the file is not ready
+        within `wait_timeout`.
+        """
+        directory = self.directory_for(storage_key)
+        path = directory / name
+
+        complete = await asyncio.to_thread(self._touch, directory)
+        if not complete:
+            complete = await self._wait_until_ready(source_path, storage_key, path)
+
+        if not path.is_file():
+            raise FileNotFoundError(name)
+        return path, complete
+
+    def partial_playlist(self, path: Path) -> str:
+        """A playlist still being written, marked to start playback at its beginning
+
+        Players treat an EVENT playlist without EXT-X-ENDLIST as live and
+        would otherwise join near its end.
+        """
+        header, _, rest = path.read_text().partition("\n")
+        return f"{header}\n#EXT-X-START:TIME-OFFSET=0\n{rest}"
+
+    def _touch(self, directory: Path) -> bool:
+        """Mark complete output recently used (directory mtime is the LRU clock; file mtimes feed ETags)"""
+        if not (directory / COMPLETE_MARKER).exists():
+            return False
+        try:
+            os.utime(directory)
+        except FileNotFoundError:
+            return False
+        return True
+
+    async def _wait_until_ready(self, source_path: Path, storage_key: str, path: Path) -> bool:
+        """Start or join the generation, returning once `path` can be served; True if the output is complete"""
+        generation = self._generations.get(storage_key)
+        if generation is None:
+            generation = asyncio.create_task(self._generate(source_path, storage_key))
+            self._generations[storage_key] = generation
+            generation.add_done_callback(lambda task: self._finished(storage_key, task))
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.wait_timeout
+        while True:
+            if generation.done():
+                # Raises the ffmpeg error, if any
+                generation.result()
+                return True
+            # Until then the directory may hold leftovers of a run that died
+            if storage_key in self._writing and await asyncio.to_thread(self._ready, path):
+                return False
+            if loop.time() >= deadline:
+                self.timeouts += 1
+                raise TimeoutError(f"HLS output of {storage_key} not ready after {self.wait_timeout}s")
+            await asyncio.wait({generation}, timeout=self.poll_interval)
+
+    def _finished(self, storage_key: str, task: asyncio.Task) -> None:
+        self._generations.pop(storage_key, None)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"HLS generation of {storage_key} failed: {str(task.exception())}")
+
+    def _ready(self, path: Path) -> bool:
+        """Whether a file of output still being generated can be served"""
+        if path.name != PLAYLIST_NAME:
+            # Segments are moved into place once complete
+            return path.is_file()
+        try:
+            return path.read_text().count("#EXTINF") >= self.min_segments
+        except FileNotFoundError:
+            return False
+
+    async def _generate(self, source_path: Path, storage_key: str) -> None:
+        directory = self.directory_for(storage_key)
+
+        try:
+            # Another API process may hold the lock; its output appears in the same directory
+            while True:
+                if (directory / COMPLETE_MARKER).exists():
+                    return
+                lock_fd = await asyncio.to_thread(self._try_lock, directory)
+                if lock_fd is not None:
+                    break
+                self._writing.add(storage_key)
+                await asyncio.sleep(self.poll_interval)
+            self._writing.discard(storage_key)
+
+            try:
+                if (directory / COMPLETE_MARKER).exists():
+                    return
+
+                if self._semaphore is None:
+                    self._semaphore = asyncio.Semaphore(self.concurrency)
+                async with self._semaphore:
+                    await self._segment(source_path, storage_key, directory)
+            finally:
+                fcntl.flock(lock_fd, fcntl.LOCK_UN)
+                os.close(lock_fd)
+        finally:
+            self._writing.discard(storage_key)
+
+        self.generated += 1
+        logger.info(f"HLS output generated for {storage_key}")
+        await asyncio.to_thread(self.evict, directory)
+
+    def _try_lock(self, directory: Path) -> Optional[int]:
+        """Take the generation lock of a track directory, or None if another process holds it"""
+        self.hls_path.mkdir(parents=True, exist_ok=True)
+        lock_fd = os.open(self.hls_path / f".{directory.name}.lock", os.O_CREAT | os.O_RDWR)
+        try:
+            fcntl.flock(lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(lock_fd)
+            return None
+        return lock_fd
+
+    async def _segment(self, source_path: Path, storage_key: str, directory: Path) -> None:
+        """Run ffmpeg into the track directory, then mark the output complete"""
+        # Output of a run that died midway is incomplete: start over
+        await asyncio.to_thread(shutil.rmtree, directory, True)
+        directory.mkdir(parents=True)
+        self._writing.add(storage_key)
+
+        if source_path.suffix.lower() in COPYABLE_EXTENSIONS:
+            codec_args = ["-c:a", "copy"]
+        else:
+            codec_args = ["-c:a", "aac", "-b:a", f"{self.audio_bitrate}k"]
+
+        try:
+            await run_ffmpeg(
+                self.ffmpeg_path,
+                "-i", str(source_path),
+                "-vn", "-map", "0:a:0",
+                *codec_args,
+                "-f", "hls",
+                "-hls_time", str(self.segment_duration),
+                "-hls_playlist_type", "event",
+                # Segments and playlist updates are written aside and renamed when complete
+                "-hls_flags", "temp_file",
+                "-hls_segment_filename", str(directory / "segment_%05d.ts"),
+                str(directory / PLAYLIST_NAME)
+            )
+        except BaseException:
+            await asyncio.to_thread(shutil.rmtree, directory, True)
+            self.failed += 1
+            raise
+
+        (directory / COMPLETE_MARKER).touch()
+
+    def evict(self, keep: Optional[Path] = None) -> int:
+        """Delete least recently used track directories until the total fits the disk budget
+
+        `keep` (the output just generated), output still being generated and
+        output used in the last `evict_grace` seconds are counted but never
+        removed.
+        """
+        directories = []
+        for directory in self.hls_path.iterdir() if self.hls_path.exists() else []:
+            if directory.name.startswith(".") or not directory.is_dir():
+                continue
+            try:
+                size = sum(path.stat().st_size for path in directory.iterdir())
+                complete = (directory / COMPLETE_MARKER).exists()
+                directories.append((directory, directory.stat().st_mtime, size, complete))
+            except FileNotFoundError:
+                continue
+
+        total = sum(size for _, _, size, _ in directories)
+        recently_used = time.time() - self.evict_grace
+        removed = 0
+        for directory, last_used, size, complete in sorted(directories, key=lambda item: item[1]):
+            if total <= self.disk_budget:
+                break
+            if directory == keep or not complete or last_used >= recently_used:
+                continue
+            shutil.rmtree(directory, ignore_errors=True)
+            total -= size
+            removed += 1
+
+        if removed:
+            self.evicted += removed
+            logger.info(f"Evicted HLS output of {removed} tracks to stay under {self.disk_budget} bytes")
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "segment_duration": self.segment_duration,
+            "in_progress": len(self._generations),
+            "generated": self.generated,
+            "failed": self.failed,
+            "evicted": self.evicted,
+            "timeouts": self.timeouts
+        }
+
+# Shared by the HLS endpoints
+hls_store = HLSStore.from_env()
@@ -0,0 +1,108 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+def _init_worker() -> None:
+    """Configure logging in pool processes (spawned workers start blank)"""
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+class IngestPool:
+    """Bounded process pool for the CPU-bound part of ingest (tag parsing, thumbnailing)
+
+    Keeps mutagen and Pillow work off the event loop. Functions submitted
+    must be module-level so they can be pickled. Without a started pool
+    (scripts, INGEST_PROCESS_WORKERS=0) work runs in a thread instead.
+    """
+
+    def __init__(self, max_workers: int = 2):
+        self.max_workers = max_workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+        # Serializes replacing a broken executor
+        self._restart_lock = threading.Lock()
+
+        self.in_flight = 0
+        self.completed = 0
+        self.failed = 0
+        self.restarts = 0
+
+    @classmethod
+    def from_env(cls) -> "IngestPool":
+        """Build a pool sized from INGEST_PROCESS_WORKERS"""
+        default_workers = min(2, os.cpu_count() or 1)
+        return cls(max_workers=int(os.getenv("INGEST_PROCESS_WORKERS", str(default_workers))))
+
+    def start(self) -> None:
+        if self.max_workers <= 0 or self._executor is not None:
+            return
+
+        # spawn: workers must not inherit the event loop or open DB connections
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker
+        )
+        logger.info(f"Ingest process pool started with {self.max_workers} workers")
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Run func(*args) in the pool and await its result"""
+        self.in_flight += 1
+        executor = self._executor
+        try:
+            if executor is None:
+                result = await asyncio.to_thread(func, *args)
+            else:
+                result = await asyncio.get_running_loop().run_in_executor(executor, func, *args)
+            self.completed += 1
+            return result
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM on a malformed file): replace the pool
+            self.failed += 1
+            self._restart(executor)
+            raise
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            self.in_flight -= 1
+
+    def _restart(self, broken_executor: Optional[ProcessPoolExecutor]) -> None:
+        """Replace a broken executor, once
+
+        Every task in flight on it fails with BrokenProcessPool; only the
+        first to get here restarts, the others find a new executor in place.
+        """
+        with self._restart_lock:
+            if broken_executor is None or self._executor is not broken_executor:
+                return
+            logger.error("Ingest process pool broken, restarting")
+            self._executor = None
+            broken_executor.shutdown(wait=False, cancel_futures=True)
+            self.restarts += 1
+            self.start()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.max_workers if self._executor is not None else 0,
+            "in_flight": self.in_flight,
+            "completed": self.completed,
+            "failed": self.failed,
+            "restarts": self.restarts
+        }
+
+# Shared by every StorageService; started and stopped by the app lifespan
+ingest_pool = IngestPool.from_env()
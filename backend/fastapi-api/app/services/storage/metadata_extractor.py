@@ -74,6 +74,15 @@ class MetadataExtractor:
         """Extract comprehensive metadata from audio file"""
         try:
             audio_file = MutagenFile(file_path)
+        except Exception as e:
+            logger.error(f"Failed to parse audio file {file_path}: {str(e)}")
+            return {}
+        
+        return self.extract_from_audio(audio_file, file_path)
+    
+    def extract_from_audio(self, audio_file, file_path: Path) -> Dict[str, Any]:
+        """Extract comprehensive metadata from an already parsed mutagen file"""
+        try:
             if not audio_file:
                 return {}
             
@@ -0,0 +1,256 @@
+import asyncio
+import logging
+import os
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Optional, Set
+
+from fastapi import HTTPException
+
+from app.services.content_negotiation import parse_accept
+from app.services.single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+# Output settings per codec: file extension, ffmpeg muxer, response media type, encoder arguments
+CODECS = {
+    "opus": {"extension": "ogg", "format": "ogg", "media_type": "audio/ogg", "args": ["-c:a", "libopus"]},
+    "aac": {"extension": "m4a", "format": "ipod", "media_type": "audio/mp4", "args": ["-c:a", "aac", "-movflags", "+faststart"]}
+}
+
+async def run_ffmpeg(ffmpeg_path: str, *args: str) -> None:
+    """Run ffmpeg non-interactively, raising RuntimeError with its stderr on failure"""
+    process = await asyncio.create_subprocess_exec(
+        ffmpeg_path, "-nostdin", "-y", "-v", "error", *args,
+        stdout=asyncio.subprocess.DEVNULL,
+        stderr=asyncio.subprocess.PIPE
+    )
+    try:
+        _, stderr = await process.communicate()
+    except asyncio.CancelledError:
+        process.kill()
+        raise
+
+    if process.returncode != 0:
+        raise RuntimeError(f"ffmpeg exited with {process.returncode}: {stderr.decode(errors='replace').strip()[-500:]}")
+
+class RenditionProfile:
+    """A named transcoding target, e.g. low = Opus at 64 kbps"""
+
+    def __init__(self, name: str, codec: str, bitrate: int):
+        if codec not in CODECS:
+            raise ValueError(f"Unsupported rendition codec '{codec}'. Available: {list(CODECS)}")
+        self.name = name
+        self.codec = codec
+        self.bitrate = bitrate  # kbps
+        self.extension = CODECS[codec]["extension"]
+        self.media_type = CODECS[codec]["media_type"]
+
+    @classmethod
+    def parse_all(cls, spec: str) -> Dict[str, "RenditionProfile"]:
+        """Parse "name:codec:kbps,..." (e.g. "low:opus:64,medium:aac:128")"""
+        profiles = {}
+        for item in filter(None, (part.strip() for part in spec.split(","))):
+            name, codec, bitrate = item.split(":")
+            profiles[name] = cls(name, codec, int(bitrate.rstrip("k")))
+        return profiles
+
+class RenditionStore:
+    """Disk cache of low-bitrate transcodes of uploaded tracks
+
+    Renditions are produced in the background by a local ffmpeg binary,
+    named {audio stem}.{profile}.{ext} under STORAGE_PATH/renditions, and
+    evicted least-recently-used (by access time, so ETags stay stable) once
+    the directory exceeds its disk budget. A rendition that is missing or was
+    evicted is regenerated after the first request for it; that request gets
+    the original.
+    """
+
+    def __init__(
+        self,
+        base_path: Path,
+        profiles: Dict[str, RenditionProfile],
+        enabled: bool = False,
+        ffmpeg_path: str = "ffmpeg",
+        disk_budget: int = 10 * 1024 ** 3,
+        concurrency: int = 1
+    ):
+        self.rendition_path = base_path / "renditions"
+        self.profiles = profiles
+        self.enabled = enabled and bool(profiles)
+        self.ffmpeg_path = ffmpeg_path
+        self.disk_budget = disk_budget
+        self.concurrency = concurrency
+
+        self._transcodes = SingleFlight()
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+        self.generated = 0
+        self.failed = 0
+        self.evicted = 0
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_env(cls) -> "RenditionStore":
+        """Build a store configured from RENDITION_* variables"""
+        return cls(
+            base_path=Path(os.getenv("STORAGE_PATH", "/storage")),
+            profiles=RenditionProfile.parse_all(os.getenv("RENDITION_PROFILES", "low:opus:64,medium:opus:128")),
+            enabled=os.getenv("RENDITIONS_ENABLED", "false").lower() == "true",
+            ffmpeg_path=os.getenv("FFMPEG_PATH", "ffmpeg"),
+            disk_budget=int(os.getenv("RENDITION_DISK_BUDGET", str(10 * 1024 ** 3))),
+            concurrency=int(os.getenv("RENDITION_CONCURRENCY", "1"))
+        )
+
+    def path_for(self, storage_key: str, profile: RenditionProfile) -> Path:
+        return self.rendition_path / f"{Path(storage_key).stem}.{profile.name}.{profile.extension}"
+
+    def select_profile(self, quality: Optional[str], accept: Optional[str], original_type: str) -> Optional[RenditionProfile]:
+        """Pick the rendition for a request: explicit `quality`, else Accept negotiation, else the original"""
+        if quality:
+            if quality == "original":
+                return None
+            if quality not in self.profiles:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Invalid quality. Available: {['original'] + list(self.profiles)}"
+                )
+            return self.profiles[quality]
+
+        if not accept:
+            return None
+
+        accepted = parse_accept(accept)
+
+        original_q = max(
+            accepted.get(original_type, 0.0), accepted.get("audio/*", 0.0), accepted.get("*/*", 0.0)
+        )
+        if original_q > 0:
+            return None
+
+        # The client cannot play the original: lowest bitrate among acceptable types first
+        candidates = [
+            profile for profile in self.profiles.values() if accepted.get(profile.media_type, 0.0) > 0
+        ]
+        return min(candidates, key=lambda profile: profile.bitrate) if candidates else None
+
+    def get(self, storage_key: str, profile: RenditionProfile) -> Optional[Path]:
+        """Path of a cached rendition, marking it recently used, or None"""
+        path = self.path_for(storage_key, profile)
+        try:
+            stat_result = path.stat()
+            # Bump the access time only: mtime feeds the ETag
+            os.utime(path, (time.time(), stat_result.st_mtime))
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return path
+
+    def schedule(self, source_path: str, storage_key: str, source_bitrate: Optional[int] = None, profile_name: Optional[str] = None) -> None:
+        """Transcode a track in the background (every useful profile, or just `profile_name`)"""
+        if not self.enabled:
+            return
+
+        profiles = [self.profiles[profile_name]] if profile_name else self.profiles.values()
+        for profile in profiles:
+            # Transcoding up to the source bitrate only costs disk
+            if source_bitrate and source_bitrate <= profile.bitrate * 1000:
+                continue
+            task = asyncio.create_task(self._generate_logged(Path(source_path), storage_key, profile))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _generate_logged(self, source_path: Path, storage_key: str, profile: RenditionProfile) -> None:
+        try:
+            await self._transcodes.do(
+                (storage_key, profile.name), lambda: self._generate(source_path, storage_key, profile)
+            )
+        except Exception as e:
+            self.failed += 1
+            logger.error(f"Rendition {profile.name} of {storage_key} failed: {str(e)}")
+
+    async def _generate(self, source_path: Path, storage_key: str, profile: RenditionProfile) -> Path:
+        output_path = self.path_for(storage_key, profile)
+        if output_path.exists():
+            return output_path
+
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+
+        async with self._semaphore:
+            self.rendition_path.mkdir(parents=True, exist_ok=True)
+            await self._transcode(source_path, output_path, profile)
+
+        self.generated += 1
+        logger.info(f"Rendition {profile.name} generated for {storage_key}")
+        await asyncio.to_thread(self.evict, output_path)
+        return output_path
+
+    async def _transcode(self, source_path: Path, output_path: Path, profile: RenditionProfile) -> None:
+        """Run ffmpeg into a temporary file and move it into place"""
+        # Unique per run: another API process may be transcoding the same rendition
+        temp_path = output_path.with_name(f".{output_path.name}.{uuid.uuid4().hex}.part")
+        codec = CODECS[profile.codec]
+
+        try:
+            await run_ffmpeg(
+                self.ffmpeg_path,
+                "-i", str(source_path),
+                "-vn", "-map_metadata", "0",
+                *codec["args"], "-b:a", f"{profile.bitrate}k",
+                "-f", codec["format"], str(temp_path)
+            )
+        except BaseException:
+            temp_path.unlink(missing_ok=True)
+            raise
+
+        os.replace(temp_path, output_path)
+
+    def evict(self, keep: Optional[Path] = None) -> int:
+        """Delete least recently used renditions until the directory fits the disk budget
+
+        `keep` (the rendition just generated) is counted but never removed.
+        """
+        files = []
+        for path in self.rendition_path.glob("*.*"):
+            if path.name.startswith("."):
+                continue
+            try:
+                files.append((path, path.stat()))
+            except FileNotFoundError:
+                continue
+
+        total = sum(stat_result.st_size for _, stat_result in files)
+        removed = 0
+        for path, stat_result in sorted(files, key=lambda item: item[1].st_atime):
+            if total <= self.disk_budget:
+                break
+            if path == keep:
+                continue
+            path.unlink(missing_ok=True)
+            total -= stat_result.st_size
+            removed += 1
+
+        if removed:
+            self.evicted += removed
+            logger.info(f"Evicted {removed} renditions to stay under {self.disk_budget} bytes")
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "profiles": {name: f"{profile.codec} {profile.bitrate}k" for name, profile in self.profiles.items()},
+            "hits": self.hits,
+            "misses": self.misses,
+            "in_progress": len(self._tasks),
+            "generated": self.generated,
+            "failed": self.failed,
+            "evicted": self.evicted
+        }
+
+# Shared by the ingest queue and the audio endpoints
+rendition_store = RenditionStore.from_env()
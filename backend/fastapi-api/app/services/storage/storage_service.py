@@ -7,9 +7,24 @@ from typing import Optional, Dict, Any
 from .file_manager import FileManager
 from .cover_processor import CoverProcessor
 from .metadata_extractor import MetadataExtractor
+from .audio_probe import AudioProbe
+from .ingest_pool import ingest_pool
 
 logger = logging.getLogger(__name__)
 
+def process_audio_file(file_path: str, audio_filename: str, cover_path: str) -> Dict[str, Any]:
+    """Ingest pool entry point: extract metadata and the embedded cover with thumbnails"""
+    cover_processor = CoverProcessor(Path(cover_path))
+    
+    # One mutagen parse feeds both metadata and cover extraction
+    probed = AudioProbe(cover_processor).probe(Path(file_path))
+    
+    cover_info = None
+    if probed["picture"]:
+        cover_info = cover_processor.save_embedded_cover(probed["picture"], audio_filename)
+    
+    return {"embedded_cover": cover_info, "metadata": probed["metadata"]}
+
 class StorageService:
     """Main storage service that orchestrates file operations"""
     
@@ -34,33 +49,35 @@ class StorageService:
         self.audio_path.mkdir(parents=True, exist_ok=True)
         self.cover_path.mkdir(parents=True, exist_ok=True)
     
-    async def save_audio_file(self, file: UploadFile, user_id: str) -> Dict[str, Any]:
-        """Save audio file with metadata and cover extraction"""
+    async def store_audio_file(self, file: UploadFile, user_id: str) -> Dict[str, Any]:
+        """Validate and durably store an audio upload, without any processing"""
         try:
-            # Validate file type
             self.file_manager.validate_audio_file(file)
+            return await self.file_manager.save_audio_file(file, user_id)
             
-            # Save audio file
-            file_info = await self.file_manager.save_audio_file(file, user_id)
-            
-            # Extract and process cover
-            cover_info = await self.cover_processor.extract_and_process_cover(
-                file_info['path'], file_info['filename'], user_id
-            )
-            
-            # Extract metadata
-            metadata = self.metadata_extractor.extract_audio_metadata(Path(file_info['path']))
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"Error storing audio file {file.filename} for user {user_id}: {str(e)}")
+            raise HTTPException(status_code=500, detail=f"Error saving audio file: {str(e)}")
+    
+    async def process_stored_audio(self, file_path: str, filename: str) -> Dict[str, Any]:
+        """Extract cover, thumbnails and metadata of a stored audio file in the ingest process pool"""
+        return await ingest_pool.run(process_audio_file, file_path, filename, str(self.cover_path))
+    
+    async def save_audio_file(self, file: UploadFile, user_id: str) -> Dict[str, Any]:
+        """Save audio file with metadata and cover extraction"""
+        file_info = await self.store_audio_file(file, user_id)
+        try:
+            processed = await self.process_stored_audio(file_info['path'], file_info['filename'])
             
             return {
                 **file_info,
-                "embedded_cover": cover_info,
-                "metadata": metadata
+                **processed
             }
             
-        except HTTPException:
-            raise
         except Exception as e:
-            logger.error(f"Error saving audio file {file.filename} for user {user_id}: {str(e)}")
+            logger.error(f"Error processing audio file {file.filename} for user {user_id}: {str(e)}")
             raise HTTPException(status_code=500, detail=f"Error saving audio file: {str(e)}")
     
     async def save_cover_file(self, file: UploadFile, user_id: str) -> Dict[str, Any]:
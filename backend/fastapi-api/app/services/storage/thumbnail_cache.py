@@ -0,0 +1,258 @@
+import asyncio
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from fastapi import HTTPException
+from PIL import Image
+
+from app.services.content_negotiation import parse_accept
+from app.services.single_flight import SingleFlight
+from .ingest_pool import ingest_pool
+from .thumbnail_generator import ThumbnailGenerator, render_thumbnail
+
+logger = logging.getLogger(__name__)
+
+# Output settings per format: Pillow format, file extension, response media type
+IMAGE_FORMATS = {
+    "avif": {"format": "AVIF", "extension": "avif", "media_type": "image/avif"},
+    "webp": {"format": "WEBP", "extension": "webp", "media_type": "image/webp"},
+    "jpeg": {"format": "JPEG", "extension": "jpg", "media_type": "image/jpeg"}
+}
+
+def _encoders() -> Dict[str, bool]:
+    """Whether this Pillow build can write each format (AVIF needs libavif)"""
+    try:
+        Image.init()
+        return {name: spec["format"] in Image.SAVE for name, spec in IMAGE_FORMATS.items()}
+    except Exception as e:
+        logger.warning(f"Could not list Pillow encoders, offering JPEG thumbnails only: {str(e)}")
+        return {name: name == "jpeg" for name in IMAGE_FORMATS}
+
+# Checked once: features.check() warns on every call for feature names an
+# older Pillow does not know (e.g. "avif")
+ENCODERS = _encoders()
+
+class ThumbnailFormat:
+    """A thumbnail encoding clients can negotiate, e.g. avif at quality 60"""
+
+    def __init__(self, name: str, quality: int):
+        if name not in IMAGE_FORMATS:
+            raise ValueError(f"Unsupported thumbnail format '{name}'. Available: {list(IMAGE_FORMATS)}")
+        self.name = name
+        self.quality = quality
+        self.pillow_format = IMAGE_FORMATS[name]["format"]
+        self.extension = IMAGE_FORMATS[name]["extension"]
+        self.media_type = IMAGE_FORMATS[name]["media_type"]
+
+    @classmethod
+    def parse_all(cls, spec: str) -> Dict[str, "ThumbnailFormat"]:
+        """Parse "name:quality,..." in order of preference (e.g. "avif:60,webp:85,jpeg:85")
+
+        Formats this Pillow build cannot encode (AVIF needs libavif) are left out.
+        """
+        formats = {}
+        for item in filter(None, (part.strip() for part in spec.split(","))):
+            name, quality = item.split(":")
+            thumbnail_format = cls(name, int(quality))
+            if not ENCODERS[name]:
+                logger.warning(f"Pillow cannot encode {name}, not offering {name} thumbnails")
+                continue
+            formats[name] = thumbnail_format
+        return formats
+
+class ThumbnailCache:
+    """Cover thumbnails rendered on first request, at any allowed size
+
+    A thumbnail is a square image of `size` pixels in one of the configured
+    formats, picked from the request's Accept header (the last format is the
+    fallback, for clients that list none of them). It is named
+    {cover stem}_{size}.{ext} under STORAGE_PATH/thumbnails and rendered in
+    the ingest pool on the first request for it; concurrent requests for the
+    same cover, size and format share one render. Files are evicted
+    least-recently-used (by access time, so ETags stay stable) once the
+    directory exceeds its disk budget, and rendered again when next requested.
+
+    The directory's size is scanned once, then kept up to date from the size
+    of each render. Only when it goes over budget is the directory scanned
+    again (which also corrects for other workers' renders and deleted covers)
+    and trimmed to LOW_WATERMARK of the budget, in a thread.
+    """
+
+    # Eviction trims to this fraction of the budget, so it does not rerun on every render
+    LOW_WATERMARK = 0.9
+    # Hits bump a thumbnail's access time at most this often (seconds)
+    TOUCH_INTERVAL = 60.0
+
+    def __init__(self, base_path: Path, sizes: List[int], formats: Dict[str, ThumbnailFormat], disk_budget: int = 1024 ** 3):
+        if not formats:
+            raise ValueError("At least one thumbnail format is required")
+        self.cache_path = base_path / "thumbnails"
+        self.sizes = sorted(set(sizes))
+        self.formats = formats
+        self.fallback = list(formats.values())[-1]
+        self.disk_budget = disk_budget
+
+        self._renders = SingleFlight()
+        # Bytes in the directory as far as this process knows; None until scanned
+        self._total: Optional[int] = None
+        self._evicting = False
+
+        self.hits = 0
+        self.misses = 0
+        self.generated = 0
+        self.failed = 0
+        self.evicted = 0
+
+    @classmethod
+    def from_env(cls) -> "ThumbnailCache":
+        """Build a cache configured from THUMBNAIL_CACHE_* variables"""
+        sizes = os.getenv("THUMBNAIL_CACHE_SIZES", "64,96,128,150,192,256,300,384,450,512,600,768,900,1200")
+        return cls(
+            base_path=Path(os.getenv("STORAGE_PATH", "/storage")),
+            sizes=[int(size) for size in sizes.split(",") if size.strip()],
+            formats=ThumbnailFormat.parse_all(os.getenv("THUMBNAIL_CACHE_FORMATS", "avif:60,webp:85,jpeg:85")),
+            disk_budget=int(os.getenv("THUMBNAIL_CACHE_DISK_BUDGET", str(1024 ** 3)))
+        )
+
+    def resolve_size(self, size: str) -> int:
+        """Pixel size of a request: a named size (small, medium, large) or an allowed pixel count"""
+        if size in ThumbnailGenerator.THUMBNAIL_SIZES:
+            return ThumbnailGenerator.THUMBNAIL_SIZES[size][0]
+        if size.isdigit() and int(size) in self.sizes:
+            return int(size)
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid size. Available sizes: {list(ThumbnailGenerator.THUMBNAIL_SIZES.keys()) + self.sizes}"
+        )
+
+    def select_format(self, accept: Optional[str]) -> ThumbnailFormat:
+        """Format for a request: the highest q-value among the formats the Accept header names
+
+        Ties go to the configured order. Wildcards do not count: a client has
+        to name AVIF or WebP to get it, otherwise it gets the fallback.
+        """
+        accepted = parse_accept(accept) if accept else {}
+        candidates = [
+            thumbnail_format for thumbnail_format in self.formats.values()
+            if accepted.get(thumbnail_format.media_type, 0.0) > 0
+        ]
+        if not candidates:
+            return self.fallback
+        return max(candidates, key=lambda thumbnail_format: accepted[thumbnail_format.media_type])
+
+    def path_for(self, cover_filename: str, size: int, thumbnail_format: ThumbnailFormat) -> Path:
+        return self.cache_path / f"{Path(cover_filename).stem}_{size}.{thumbnail_format.extension}"
+
+    async def get(self, cover_path: Path, size: int, thumbnail_format: ThumbnailFormat) -> Path:
+        """Path of a cover's thumbnail at `size` pixels in a format, rendering it if needed"""
+        path = self.path_for(cover_path.name, size, thumbnail_format)
+        if await asyncio.to_thread(self._touch, path):
+            self.hits += 1
+            return path
+        self.misses += 1
+
+        await self._renders.do(
+            (cover_path.name, size, thumbnail_format.name),
+            lambda: self._render(cover_path, path, size, thumbnail_format)
+        )
+        return path
+
+    def _touch(self, path: Path) -> bool:
+        """Mark a cached thumbnail as used; False if it is not cached (blocking)"""
+        try:
+            stat_result = path.stat()
+        except FileNotFoundError:
+            return False
+
+        now = time.time()
+        if now - stat_result.st_atime > self.TOUCH_INTERVAL:
+            # Bump the access time only: mtime feeds the ETag
+            try:
+                os.utime(path, (now, stat_result.st_mtime))
+            except FileNotFoundError:
+                return False
+        return True
+
+    def _prepare(self, path: Path) -> bool:
+        """Create the cache directory; True if the thumbnail was rendered meanwhile (blocking)"""
+        if path.exists():
+            return True
+        self.cache_path.mkdir(parents=True, exist_ok=True)
+        return False
+
+    async def _render(self, cover_path: Path, path: Path, size: int, thumbnail_format: ThumbnailFormat) -> None:
+        if await asyncio.to_thread(self._prepare, path):
+            return
+
+        try:
+            written = await ingest_pool.run(
+                render_thumbnail, str(cover_path), str(path), size, thumbnail_format.quality, thumbnail_format.pillow_format
+            )
+        except Exception:
+            self.failed += 1
+            raise
+
+        self.generated += 1
+        logger.debug(f"Thumbnail rendered: {path.name}")
+
+        if self._total is not None:
+            self._total += written
+        if (self._total is None or self._total > self.disk_budget) and not self._evicting:
+            self._evicting = True
+            try:
+                await asyncio.to_thread(self.evict, path)
+            finally:
+                self._evicting = False
+
+    def evict(self, keep: Optional[Path] = None) -> int:
+        """Scan the directory and, if it exceeds the disk budget, delete least recently used thumbnails
+
+        Deletes down to LOW_WATERMARK of the budget. `keep` (the thumbnail
+        just rendered) is counted but never removed.
+        """
+        files = []
+        for path in self.cache_path.glob("*.*"):
+            if path.name.startswith("."):
+                continue
+            try:
+                files.append((path, path.stat()))
+            except FileNotFoundError:
+                continue
+
+        total = sum(stat_result.st_size for _, stat_result in files)
+        removed = 0
+        if total > self.disk_budget:
+            target = self.disk_budget * self.LOW_WATERMARK
+            for path, stat_result in sorted(files, key=lambda item: item[1].st_atime):
+                if total <= target:
+                    break
+                if path == keep:
+                    continue
+                path.unlink(missing_ok=True)
+                total -= stat_result.st_size
+                removed += 1
+        self._total = total
+
+        if removed:
+            self.evicted += removed
+            logger.info(f"Evicted {removed} cached thumbnails to stay under {self.disk_budget} bytes")
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "sizes": self.sizes,
+            "formats": {name: thumbnail_format.quality for name, thumbnail_format in self.formats.items()},
+            "hits": self.hits,
+            "misses": self.misses,
+            "generated": self.generated,
+            "failed": self.failed,
+            "evicted": self.evicted,
+            "disk_usage": self._total,
+            "single_flight": self._renders.stats()
+        }
+
+# Shared by the thumbnail endpoint
+thumbnail_cache = ThumbnailCache.from_env()
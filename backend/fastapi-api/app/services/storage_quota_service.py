@@ -1,5 +1,5 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, select
 from app.models.models import User, Track
 from typing import Dict, Optional
 import logging
@@ -10,16 +10,16 @@ class StorageQuotaService:
     """Service for managing user storage quotas and usage"""
     
     @staticmethod
-    def get_user_storage_info(db: Session, user_id: int) -> Dict[str, int]:
+    async def get_user_storage_info(db: AsyncSession, user_id: int) -> Dict[str, int]:
         """Get complete storage information for a user"""
         try:
             # Get user with quota
-            user = db.query(User).filter(User.id == user_id).first()
+            user = await db.get(User, user_id)
             if not user:
                 raise ValueError(f"User {user_id} not found")
             
             # Calculate used storage - convert to int to avoid Decimal issues
-            used_storage_raw = db.query(func.sum(Track.file_size)).filter(Track.user_id == user_id).scalar()
+            used_storage_raw = await db.scalar(select(func.sum(Track.file_size)).where(Track.user_id == user_id))
             used_storage = int(used_storage_raw) if used_storage_raw is not None else 0
             
             quota = int(user.storage_quota)
@@ -38,10 +38,10 @@ class StorageQuotaService:
             raise
 
     @staticmethod
-    def get_used_storage(db: Session, user_id: int) -> int:
+    async def get_used_storage(db: AsyncSession, user_id: int) -> int:
         """Get the total storage used by a user in bytes"""
         try:
-            used_storage_raw = db.query(func.sum(Track.file_size)).filter(Track.user_id == user_id).scalar()
+            used_storage_raw = await db.scalar(select(func.sum(Track.file_size)).where(Track.user_id == user_id))
             return int(used_storage_raw) if used_storage_raw is not None else 0
             
         except Exception as e:
@@ -49,10 +49,10 @@ class StorageQuotaService:
             return 0
 
     @staticmethod
-    def get_user_quota(db: Session, user_id: int) -> int:
+    async def get_user_quota(db: AsyncSession, user_id: int) -> int:
         """Get the storage quota for a user in bytes"""
         try:
-            user = db.query(User).filter(User.id == user_id).first()
+            user = await db.get(User, user_id)
             return int(user.storage_quota) if user else 0
             
         except Exception as e:
@@ -60,10 +60,10 @@ class StorageQuotaService:
             return 0
 
     @staticmethod
-    def check_upload_allowed(db: Session, user_id: int, file_size: int) -> Dict[str, any]:
+    async def check_upload_allowed(db: AsyncSession, user_id: int, file_size: int) -> Dict[str, any]:
         """Check if a user can upload a file of given size"""
         try:
-            storage_info = StorageQuotaService.get_user_storage_info(db, user_id)
+            storage_info = await StorageQuotaService.get_user_storage_info(db, user_id)
             
             quota = storage_info["quota"]
             used = storage_info["used"]
@@ -110,20 +110,20 @@ class StorageQuotaService:
         return f"{bytes_value:.1f} PB"
 
     @staticmethod
-    def update_user_quota(db: Session, user_id: int, new_quota: int) -> bool:
+    async def update_user_quota(db: AsyncSession, user_id: int, new_quota: int) -> bool:
         """Update a user's storage quota (admin function)"""
         try:
-            user = db.query(User).filter(User.id == user_id).first()
+            user = await db.get(User, user_id)
             if not user:
                 return False
             
             user.storage_quota = new_quota
-            db.commit()
+            await db.commit()
             
             logger.info(f"Updated storage quota for user {user_id} to {new_quota} bytes")
             return True
             
         except Exception as e:
-            db.rollback()
+            await db.rollback()
             logger.error(f"Error updating quota for user {user_id}: {str(e)}")
             raise
@@ -0,0 +1,181 @@
+import base64
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+class TokenCache:
+    """Bounded in-process TTL cache of verified user payloads, keyed by token hash"""
+
+    def __init__(self, ttl: float = 60.0, negative_ttl: float = 5.0, max_size: int = 10000, stale_grace: float = 0.0):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_size = max_size
+        # How long after verification an identity may still be served stale
+        # while the auth service is unavailable (0 disables)
+        self.stale_grace = stale_grace
+
+        # token_hash -> (expires_at, stale_until, user_data)
+        self._verified: "OrderedDict[str, Tuple[float, float, Dict[str, Any]]]" = OrderedDict()
+        # token_hash -> (expires_at, status_code, detail)
+        self._rejected: "OrderedDict[str, Tuple[float, int, str]]" = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.negative_hits = 0
+        self.stale_hits = 0
+
+    @classmethod
+    def from_env(cls) -> "TokenCache":
+        """Build a cache configured from AUTH_CACHE_* environment variables"""
+        return cls(
+            ttl=float(os.getenv("AUTH_CACHE_TTL", "60")),
+            negative_ttl=float(os.getenv("AUTH_CACHE_NEGATIVE_TTL", "5")),
+            max_size=int(os.getenv("AUTH_CACHE_MAX_SIZE", "10000")),
+            stale_grace=float(os.getenv("AUTH_STALE_GRACE", "0"))
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0 and self.max_size > 0
+
+    @staticmethod
+    def hash_token(token: str) -> str:
+        """Hash a bearer token so raw credentials are never kept in memory"""
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def get_token_expiry(token: str) -> Optional[float]:
+        """Read the (unverified) `exp` claim of a JWT, if any"""
+        try:
+            payload_segment = token.split(".")[1]
+            payload_segment += "=" * (-len(payload_segment) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(payload_segment))
+            exp = payload.get("exp")
+            return float(exp) if exp is not None else None
+        except Exception:
+            return None
+
+    def get(self, token_hash: str) -> Optional[Dict[str, Any]]:
+        """Return the cached user payload for a token hash, or None"""
+        if not self.enabled:
+            return None
+
+        entry = self._verified.get(token_hash)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, stale_until, user_data = entry
+        now = time.time()
+        if expires_at <= now:
+            if stale_until <= now:
+                del self._verified[token_hash]
+            self.misses += 1
+            return None
+
+        self._verified.move_to_end(token_hash)
+        self.hits += 1
+        return dict(user_data)
+
+    def set(self, token_hash: str, user_data: Dict[str, Any], token_expiry: Optional[float] = None) -> None:
+        """Cache a verified user payload, never beyond the token's own expiry"""
+        if not self.enabled:
+            return
+
+        now = time.time()
+        expires_at = now + self.ttl
+        stale_until = now + max(self.ttl, self.stale_grace)
+        if token_expiry is not None:
+            expires_at = min(expires_at, token_expiry)
+            stale_until = min(stale_until, token_expiry)
+        if expires_at <= now:
+            return
+
+        self._verified[token_hash] = (expires_at, stale_until, dict(user_data))
+        self._verified.move_to_end(token_hash)
+        self._rejected.pop(token_hash, None)
+        self._evict(self._verified)
+
+    def get_stale(self, token_hash: str) -> Optional[Dict[str, Any]]:
+        """Return a recently verified payload past its TTL but within the stale grace
+
+        Only meant for when the auth service cannot be reached. The token's
+        own expiry is still honoured.
+        """
+        if not self.enabled or self.stale_grace <= 0:
+            return None
+
+        entry = self._verified.get(token_hash)
+        if entry is None:
+            return None
+
+        _, stale_until, user_data = entry
+        if stale_until <= time.time():
+            del self._verified[token_hash]
+            return None
+
+        self.stale_hits += 1
+        return dict(user_data)
+
+    def get_rejection(self, token_hash: str) -> Optional[Tuple[int, str]]:
+        """Return (status_code, detail) if the token was recently rejected"""
+        if self.negative_ttl <= 0:
+            return None
+
+        entry = self._rejected.get(token_hash)
+        if entry is None:
+            return None
+
+        expires_at, status_code, detail = entry
+        if expires_at <= time.time():
+            del self._rejected[token_hash]
+            return None
+
+        self.negative_hits += 1
+        return status_code, detail
+
+    def reject(self, token_hash: str, status_code: int, detail: str) -> None:
+        """Remember a rejected token for a short period"""
+        if self.negative_ttl <= 0 or self.max_size <= 0:
+            return
+
+        self._rejected[token_hash] = (time.time() + self.negative_ttl, status_code, detail)
+        self._rejected.move_to_end(token_hash)
+        self._verified.pop(token_hash, None)
+        self._evict(self._rejected)
+
+    def invalidate(self, token_hash: str) -> None:
+        """Drop any cached state for a token hash"""
+        self._verified.pop(token_hash, None)
+        self._rejected.pop(token_hash, None)
+
+    def clear(self) -> None:
+        self._verified.clear()
+        self._rejected.clear()
+
+    def _evict(self, entries: OrderedDict) -> None:
+        """Evict least recently used entries above the size bound"""
+        while len(entries) > self.max_size:
+            entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        """Cache counters for monitoring"""
+        return {
+            "enabled": self.enabled,
+            "ttl": self.ttl,
+            "negative_ttl": self.negative_ttl,
+            "max_size": self.max_size,
+            "stale_grace": self.stale_grace,
+            "size": len(self._verified),
+            "rejected_size": len(self._rejected),
+            "hits": self.hits,
+            "misses": self.misses,
+            "negative_hits": self.negative_hits,
+            "stale_hits": self.stale_hits
+        }
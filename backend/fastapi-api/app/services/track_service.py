@@ -1,114 +1,130 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, func, Text
-from app.models.models import Track, Metadata, Statistics
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy import and_, or_, func, Text, select, update, delete
+from app.models.models import Track, Metadata, Statistics, CoverKey
 from app.schemas.schemas import TrackCreate, TrackResponse
-from typing import List, Optional
+from pathlib import Path
+from typing import Any, Dict, List, Optional
 from uuid import UUID
 import logging
+import uuid
 
 logger = logging.getLogger(__name__)
 
 class TrackService:
     
     @staticmethod
-    def create_track(db: Session, track_data: TrackCreate, user_id: int) -> Track:
-        """Create a new track record"""
-        try:
-            db_track = Track(
+    def add_tracks(db: AsyncSession, tracks_data: List[TrackCreate], user_id: int) -> List[Track]:
+        """Add track records to the session without committing (uploads commit them with their ingest jobs)"""
+        db_tracks = [
+            Track(
+                id=uuid.uuid4(),
                 user_id=user_id,
+                storage_key=Path(track_data.file_path).name,
                 **track_data.model_dump()
             )
-            db.add(db_track)
-            db.commit()
-            db.refresh(db_track)
-            
-            logger.info(f"Track created in database: {db_track.id} for user {user_id}")
-            return db_track
-            
-        except Exception as e:
-            db.rollback()
-            logger.error(f"Error creating track in database: {str(e)}")
-            raise
+            for track_data in tracks_data
+        ]
+        db.add_all(db_tracks)
+        return db_tracks
+
+    @staticmethod
+    async def get_tracks_by_ids(db: AsyncSession, track_ids: List[UUID]) -> List[Track]:
+        """Load tracks by ID in one query, refreshing any already in the session"""
+        result = await db.execute(
+            select(Track).where(Track.id.in_(track_ids)).execution_options(populate_existing=True)
+        )
+        return result.scalars().all()
 
     @staticmethod
-    def get_user_tracks(db: Session, user_id: int, skip: int = 0, limit: int = 100) -> List[Track]:
+    async def get_user_tracks(db: AsyncSession, user_id: int, skip: int = 0, limit: int = 100) -> List[Track]:
         """Get all tracks for a user"""
-        return db.query(Track).filter(Track.user_id == user_id).offset(skip).limit(limit).all()
+        result = await db.execute(
+            select(Track).where(Track.user_id == user_id).offset(skip).limit(limit)
+        )
+        return result.scalars().all()
 
     @staticmethod
-    def get_track_by_filename(db: Session, filename: str, user_id: int) -> Optional[Track]:
-        """Get track by filename for a specific user"""
-        return db.query(Track).filter(
-            and_(
-                Track.file_path.contains(filename),
-                Track.user_id == user_id
+    async def get_track_by_filename(db: AsyncSession, filename: str, user_id: int) -> Optional[Track]:
+        """Get track by stored filename for a specific user (authorizes and loads in one query)"""
+        result = await db.execute(
+            select(Track).options(joinedload(Track.track_metadata)).where(
+                and_(
+                    Track.storage_key == filename,
+                    Track.user_id == user_id
+                )
             )
-        ).first()
+        )
+        return result.unique().scalars().first()
 
     @staticmethod
-    def get_track_by_id(db: Session, track_id: UUID, user_id: int) -> Optional[Track]:
+    async def get_track_by_id(db: AsyncSession, track_id: UUID, user_id: int) -> Optional[Track]:
         """Get track by ID for a specific user"""
-        return db.query(Track).filter(
-            and_(
-                Track.id == track_id,
-                Track.user_id == user_id
+        result = await db.execute(
+            select(Track).where(
+                and_(
+                    Track.id == track_id,
+                    Track.user_id == user_id
+                )
             )
-        ).first()
+        )
+        return result.scalars().first()
 
     @staticmethod
-    def delete_track(db: Session, track_id: UUID, user_id: int) -> bool:
+    async def delete_track(db: AsyncSession, track_id: UUID, user_id: int) -> bool:
         """Delete a track"""
         try:
-            track = db.query(Track).filter(
-                and_(
-                    Track.id == track_id,
-                    Track.user_id == user_id
-                )
-            ).first()
+            track = await TrackService.get_track_by_id(db, track_id, user_id)
             
             if not track:
                 return False
                 
-            db.delete(track)
-            db.commit()
+            await db.delete(track)
+            await db.commit()
             logger.info(f"Track deleted from database: {track_id}")
             return True
             
         except Exception as e:
-            db.rollback()
+            await db.rollback()
             logger.error(f"Error deleting track {track_id}: {str(e)}")
             raise
 
     @staticmethod
-    def delete_all_user_tracks(db: Session, user_id: int) -> int:
+    async def delete_all_user_tracks(db: AsyncSession, user_id: int) -> int:
         """Delete all tracks for a user and return the number of deleted tracks"""
         try:
-            # Get all tracks for the user
-            tracks = db.query(Track).filter(Track.user_id == user_id).all()
-            track_count = len(tracks)
+            # Count tracks for the user
+            track_count = await db.scalar(
+                select(func.count()).select_from(Track).where(Track.user_id == user_id)
+            )
             
             if track_count == 0:
                 logger.info(f"No tracks found for user {user_id}")
                 return 0
             
             # Delete all tracks (this will cascade to metadata and statistics)
-            deleted_count = db.query(Track).filter(Track.user_id == user_id).delete()
-            db.commit()
+            result = await db.execute(
+                delete(Track).where(Track.user_id == user_id).execution_options(synchronize_session=False)
+            )
+            deleted_count = result.rowcount
+            await db.commit()
             
             logger.info(f"All tracks deleted from database for user {user_id}: {deleted_count} tracks")
             return deleted_count
             
         except Exception as e:
-            db.rollback()
+            await db.rollback()
             logger.error(f"Error deleting all tracks for user {user_id}: {str(e)}")
             raise
 
     @staticmethod
-    def save_metadata(db: Session, track_id: UUID, metadata: dict) -> None:
-        """Save track metadata"""
+    async def save_metadata(db: AsyncSession, track_id: UUID, metadata: dict, commit: bool = True) -> None:
+        """Save track metadata (with commit=False, only flushed: the caller commits it with its own changes)"""
         try:
             # Check if metadata already exists
-            existing_metadata = db.query(Metadata).filter(Metadata.track_id == track_id).first()
+            result = await db.execute(select(Metadata).where(Metadata.track_id == track_id))
+            existing_metadata = result.scalars().first()
             
             if existing_metadata:
                 existing_metadata.metadata_json = metadata
@@ -119,31 +135,51 @@ class TrackService:
                 )
                 db.add(db_metadata)
             
-            db.commit()
+            if commit:
+                await db.commit()
+            else:
+                await db.flush()
             logger.info(f"Metadata saved for track: {track_id}")
             
         except Exception as e:
-            db.rollback()
+            if commit:
+                await db.rollback()
             logger.error(f"Error saving metadata for track {track_id}: {str(e)}")
             raise
 
     @staticmethod
-    def update_last_accessed(db: Session, track_id: UUID) -> None:
+    async def save_cover_keys(db: AsyncSession, track_id: UUID, user_id: int, embedded_cover: Dict[str, Any]) -> None:
+        """Register a track's cover and thumbnail filenames for ownership lookups (no commit)"""
+        keys = [{"key": embedded_cover["filename"], "kind": "cover"}]
+        keys += [
+            {"key": thumbnail["filename"], "kind": "thumbnail"}
+            for thumbnail in embedded_cover.get("thumbnails", {}).values()
+        ]
+        
+        await db.execute(
+            insert(CoverKey)
+            .values([{**key, "track_id": track_id, "user_id": user_id} for key in keys])
+            .on_conflict_do_nothing(index_elements=[CoverKey.key, CoverKey.track_id])
+        )
+
+    @staticmethod
+    async def update_last_accessed(db: AsyncSession, track_id: UUID) -> None:
         """Update track last accessed timestamp"""
         try:
-            track = db.query(Track).filter(Track.id == track_id).first()
-            if track:
-                track.last_accessed = func.now()
-                db.commit()
+            await db.execute(
+                update(Track).where(Track.id == track_id).values(last_accessed=func.now())
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
                 
         except Exception as e:
             logger.error(f"Error updating last accessed for track {track_id}: {str(e)}")
 
     @staticmethod
-    def get_user_total_storage(db: Session, user_id: int) -> int:
+    async def get_user_total_storage(db: AsyncSession, user_id: int) -> int:
         """Get total storage used by a user in bytes"""
         try:
-            total_size = db.query(func.sum(Track.file_size)).filter(Track.user_id == user_id).scalar()
+            total_size = await db.scalar(select(func.sum(Track.file_size)).where(Track.user_id == user_id))
             return total_size or 0
             
         except Exception as e:
@@ -151,7 +187,7 @@ class TrackService:
             return 0
 
     @staticmethod
-    def search_tracks(db: Session, user_id: int, search_query: Optional[str] = None, 
+    async def search_tracks(db: AsyncSession, user_id: int, search_query: Optional[str] = None, 
                      search_in_filename: bool = True, search_in_metadata: bool = True,
                      file_type: Optional[str] = None, 
                      # min_duration: Optional[int] = None,  # DISABLED: Duration filtering not implemented
@@ -162,7 +198,7 @@ class TrackService:
             if offset < 0:
                 offset = 0
             
-            query = db.query(Track).filter(Track.user_id == user_id)
+            query = select(Track).where(Track.user_id == user_id)
             
             if search_query:
                 search_conditions = []
@@ -171,7 +207,7 @@ class TrackService:
                     search_conditions.append(Track.original_filename.ilike(f"%{search_query}%"))
                 
                 if search_in_metadata:
-                    metadata_track_ids = db.query(Metadata.track_id).filter(
+                    metadata_track_ids = select(Metadata.track_id).where(
                         or_(
                             Metadata.metadata_json.op('->>')('title').ilike(f"%{search_query}%"),
                             Metadata.metadata_json.op('->>')('artist').ilike(f"%{search_query}%"),
@@ -179,20 +215,18 @@ class TrackService:
                             Metadata.metadata_json.op('->>')('genre').ilike(f"%{search_query}%"),
                             Metadata.metadata_json.cast(Text).ilike(f"%{search_query}%")
                         )
-                    ).subquery()
+                    )
                     
-                    search_conditions.append(Track.id.in_(
-                        db.query(metadata_track_ids.c.track_id)
-                    ))
+                    search_conditions.append(Track.id.in_(metadata_track_ids))
                 
                 if search_conditions:
                     if len(search_conditions) == 1:
-                        query = query.filter(search_conditions[0])
+                        query = query.where(search_conditions[0])
                     else:
-                        query = query.filter(or_(*search_conditions))
+                        query = query.where(or_(*search_conditions))
             
             if file_type:
-                query = query.filter(Track.file_type.ilike(file_type))
+                query = query.where(Track.file_type.ilike(file_type))
             
             # Filter by duration - DISABLED: Duration filtering not implemented
             # if min_duration is not None:
@@ -202,10 +236,11 @@ class TrackService:
             #     logger.warning("Duration filtering not yet implemented - skipping max_duration filter")
             
             # Get total count before pagination
-            total_count = query.count()
+            total_count = await db.scalar(select(func.count()).select_from(query.subquery()))
             
             # Apply pagination and get results
-            tracks = query.offset(offset).limit(limit).all()
+            result = await db.execute(query.offset(offset).limit(limit))
+            tracks = result.scalars().all()
             
             # Prepare filters info
             filters_applied = {
@@ -0,0 +1,322 @@
+import asyncio
+import logging
+import os
+import shutil
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional
+from uuid import UUID
+import aiofiles
+from fastapi import HTTPException
+from sqlalchemy import and_, delete, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import AsyncSessionLocal
+from app.models.models import UploadSession, User
+
+logger = logging.getLogger(__name__)
+
+class UploadSessionService:
+    """Resumable chunked uploads
+
+    A session records the file's name and size and fixes a chunk size; the
+    client then PUTs chunks by index, in any order and as often as needed
+    (a chunk is written to a temporary file and renamed into place, so a
+    retried or concurrent PUT simply replaces it). Chunks live under
+    STORAGE_PATH/uploads/{session id}/ and are streamed into the final audio
+    file when the session is completed.
+
+    Sessions expire `ttl` seconds after their last chunk. A background task
+    deletes expired sessions and any chunk directory left untouched that long.
+    Until then the declared size of each unfinished session is reserved
+    against its user's quota, and a user has at most `max_per_user` of them.
+    """
+
+    def __init__(self, base_path: Path, chunk_size: int = 8 * 1024 * 1024, ttl: float = 86400.0, gc_interval: float = 600.0, max_per_user: int = 10):
+        self.upload_path = base_path / "uploads"
+        self.chunk_size = chunk_size
+        self.ttl = ttl
+        self.gc_interval = gc_interval
+        self.max_per_user = max_per_user
+
+        self._task: Optional[asyncio.Task] = None
+
+        self.created = 0
+        self.completed = 0
+        self.chunks_written = 0
+        self.collected = 0
+
+    @classmethod
+    def from_env(cls) -> "UploadSessionService":
+        """Build a service configured from UPLOAD_SESSION_* variables"""
+        return cls(
+            base_path=Path(os.getenv("STORAGE_PATH", "/storage")),
+            chunk_size=int(os.getenv("UPLOAD_SESSION_CHUNK_SIZE", str(8 * 1024 * 1024))),
+            ttl=float(os.getenv("UPLOAD_SESSION_TTL", "86400")),
+            gc_interval=float(os.getenv("UPLOAD_SESSION_GC_INTERVAL", "600")),
+            max_per_user=int(os.getenv("UPLOAD_SESSION_MAX_PER_USER", "10"))
+        )
+
+    def _expires_at(self) -> datetime:
+        # Naive UTC, like CURRENT_TIMESTAMP in the UTC database containers
+        return datetime.now(timezone.utc).replace(tzinfo=None) + timedelta(seconds=self.ttl)
+
+    def session_dir(self, session_id: UUID) -> Path:
+        return self.upload_path / str(session_id)
+
+    @staticmethod
+    def total_chunks(session: UploadSession) -> int:
+        return max(1, -(-session.total_size // session.chunk_size))
+
+    @staticmethod
+    def chunk_length(session: UploadSession, index: int) -> int:
+        """Exact length chunk `index` must have (the last one may be shorter)"""
+        return min(session.chunk_size, session.total_size - index * session.chunk_size)
+
+    def chunk_path(self, session: UploadSession, index: int) -> Path:
+        return self.session_dir(session.id) / f"{index:06d}"
+
+    def received_chunks(self, session: UploadSession) -> List[int]:
+        """Indexes of the chunks stored for a session, in order"""
+        directory = self.session_dir(session.id)
+        if not directory.exists():
+            return []
+        return sorted(int(path.name) for path in directory.iterdir() if path.name.isdigit())
+
+    def describe(self, session: UploadSession) -> Dict[str, Any]:
+        """Session fields for UploadSessionResponse, including upload progress"""
+        received = self.received_chunks(session) if session.status != 'completed' else []
+
+        # Resume offset: bytes covered by chunks 0..n-1 without a gap
+        received_bytes = 0
+        for expected, index in enumerate(received):
+            if index != expected:
+                break
+            received_bytes += self.chunk_length(session, index)
+        if session.status == 'completed':
+            received_bytes = session.total_size
+
+        return {
+            "id": session.id,
+            "filename": session.original_filename,
+            "total_size": session.total_size,
+            "chunk_size": session.chunk_size,
+            "total_chunks": self.total_chunks(session),
+            "status": session.status,
+            "received_chunks": received,
+            "received_bytes": received_bytes,
+            "expires_at": session.expires_at
+        }
+
+    async def create(self, db: AsyncSession, user_id: int, filename: str, total_size: int, content_type: Optional[str] = None) -> UploadSession:
+        """Open an upload session"""
+        try:
+            session = UploadSession(
+                user_id=user_id,
+                original_filename=filename,
+                content_type=content_type,
+                total_size=total_size,
+                chunk_size=self.chunk_size,
+                expires_at=self._expires_at()
+            )
+            db.add(session)
+            await db.commit()
+            await db.refresh(session)
+        except Exception as e:
+            await db.rollback()
+            logger.error(f"Error creating upload session for user {user_id}: {str(e)}")
+            raise
+
+        self.session_dir(session.id).mkdir(parents=True, exist_ok=True)
+        self.created += 1
+        logger.info(f"Upload session {session.id} created for user {user_id}: {filename} ({total_size} bytes)")
+        return session
+
+    @staticmethod
+    def _unfinished(user_id: int):
+        return and_(
+            UploadSession.user_id == user_id,
+            UploadSession.status != 'completed',
+            UploadSession.expires_at >= datetime.now(timezone.utc).replace(tzinfo=None)
+        )
+
+    @staticmethod
+    async def reserved_bytes(db: AsyncSession, user_id: int, exclude: Optional[UUID] = None) -> int:
+        """Declared size of a user's unfinished sessions (other than `exclude`), held against the quota"""
+        condition = UploadSessionService._unfinished(user_id)
+        if exclude is not None:
+            condition = and_(condition, UploadSession.id != exclude)
+        reserved = await db.scalar(select(func.sum(UploadSession.total_size)).where(condition))
+        return int(reserved) if reserved is not None else 0
+
+    async def check_capacity(self, db: AsyncSession, user_id: int) -> None:
+        """Raise 429 if the user already has `max_per_user` unfinished sessions
+
+        Locks the user's row until the transaction ends, so concurrent
+        session creations are counted (and their quota checked) one at a time.
+        """
+        await db.execute(select(User.id).where(User.id == user_id).with_for_update())
+        unfinished = await db.scalar(select(func.count()).select_from(UploadSession).where(self._unfinished(user_id)))
+        if unfinished >= self.max_per_user:
+            raise HTTPException(
+                status_code=429,
+                detail=f"Too many unfinished upload sessions (at most {self.max_per_user}); complete or delete one first"
+            )
+
+    @staticmethod
+    async def get_user_session(db: AsyncSession, session_id: UUID, user_id: int) -> Optional[UploadSession]:
+        """Get an upload session by ID for a specific user"""
+        result = await db.execute(
+            select(UploadSession).where(and_(UploadSession.id == session_id, UploadSession.user_id == user_id))
+        )
+        return result.scalars().first()
+
+    async def write_chunk(self, db: AsyncSession, session: UploadSession, index: int, body: AsyncIterator[bytes]) -> None:
+        """Store chunk `index` from a request body, replacing any earlier copy"""
+        if session.status != 'open':
+            raise HTTPException(status_code=409, detail=f"Upload session is {session.status}")
+        if not 0 <= index < self.total_chunks(session):
+            raise HTTPException(status_code=400, detail=f"Chunk index must be between 0 and {self.total_chunks(session) - 1}")
+
+        expected = self.chunk_length(session, index)
+        chunk_path = self.chunk_path(session, index)
+        chunk_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = chunk_path.with_name(f".{chunk_path.name}.{uuid.uuid4().hex}.part")
+
+        received = 0
+        try:
+            async with aiofiles.open(temp_path, 'wb') as f:
+                async for data in body:
+                    received += len(data)
+                    if received > expected:
+                        raise HTTPException(status_code=413, detail=f"Chunk {index} must be {expected} bytes")
+                    await f.write(data)
+
+            if received != expected:
+                raise HTTPException(status_code=400, detail=f"Chunk {index} must be {expected} bytes, got {received}")
+
+            os.replace(temp_path, chunk_path)
+        except BaseException:
+            temp_path.unlink(missing_ok=True)
+            raise
+
+        # Every chunk keeps the session alive for another ttl
+        session.expires_at = self._expires_at()
+        await db.commit()
+        self.chunks_written += 1
+
+    async def begin_assembly(self, db: AsyncSession, session: UploadSession) -> bool:
+        """Move a session from open to assembling; False if another request got there first"""
+        result = await db.execute(
+            update(UploadSession)
+            .where(and_(UploadSession.id == session.id, UploadSession.status == 'open'))
+            .values(status='assembling', expires_at=self._expires_at())
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+        if result.rowcount != 1:
+            return False
+
+        await db.refresh(session)
+        return True
+
+    @staticmethod
+    def mark_completed(session: UploadSession, track_id: UUID) -> None:
+        """Record a session's track (no commit: it is committed with the track)"""
+        session.status = 'completed'
+        session.track_id = track_id
+
+    async def finish_assembly(self, session: UploadSession) -> None:
+        """Drop the chunks of a session completed with its track"""
+        self.completed += 1
+        await asyncio.to_thread(shutil.rmtree, self.session_dir(session.id), True)
+
+    async def reopen(self, session_id: UUID) -> None:
+        """Return a session to open after a failed assembly (in its own transaction)"""
+        try:
+            async with AsyncSessionLocal() as db:
+                await db.execute(
+                    update(UploadSession).where(UploadSession.id == session_id).values(status='open')
+                )
+                await db.commit()
+        except Exception as e:
+            # It expires and is garbage-collected instead
+            logger.error(f"Error reopening upload session {session_id}: {str(e)}")
+
+    async def delete(self, db: AsyncSession, session: UploadSession) -> None:
+        """Abort a session and drop its chunks"""
+        await db.execute(delete(UploadSession).where(UploadSession.id == session.id))
+        await db.commit()
+        await asyncio.to_thread(shutil.rmtree, self.session_dir(session.id), True)
+
+    def start(self) -> None:
+        if self.gc_interval <= 0 or self._task is not None:
+            return
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.gc_interval)
+            await self.collect_garbage()
+
+    async def collect_garbage(self) -> int:
+        """Delete expired sessions and stale chunk directories, and return how many were removed"""
+        try:
+            async with AsyncSessionLocal() as db:
+                result = await db.execute(
+                    delete(UploadSession)
+                    .where(UploadSession.expires_at < datetime.now(timezone.utc).replace(tzinfo=None))
+                    .returning(UploadSession.id)
+                    .execution_options(synchronize_session=False)
+                )
+                expired = result.scalars().all()
+                await db.commit()
+        except Exception as e:
+            logger.error(f"Error deleting expired upload sessions: {str(e)}")
+            return 0
+
+        stale = await asyncio.to_thread(self._remove_directories, expired)
+        if expired or stale:
+            self.collected += len(expired)
+            logger.info(f"Upload session GC: {len(expired)} expired sessions, {stale} stale chunk directories removed")
+        return len(expired)
+
+    def _remove_directories(self, expired: List[UUID]) -> int:
+        """Delete the chunks of expired sessions, then any chunk directory idle for ttl; returns the latter count"""
+        for session_id in expired:
+            shutil.rmtree(self.session_dir(session_id), ignore_errors=True)
+
+        # Chunk writes touch the directory, so one idle for ttl belongs to a
+        # session that no longer exists (e.g. its row was deleted with its user)
+        removed = 0
+        cutoff = time.time() - self.ttl
+        for directory in self.upload_path.iterdir() if self.upload_path.exists() else []:
+            try:
+                if directory.is_dir() and directory.stat().st_mtime < cutoff:
+                    shutil.rmtree(directory, ignore_errors=True)
+                    removed += 1
+            except FileNotFoundError:
+                continue
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "chunk_size": self.chunk_size,
+            "ttl": self.ttl,
+            "max_per_user": self.max_per_user,
+            "created": self.created,
+            "completed": self.completed,
+            "chunks_written": self.chunks_written,
+            "collected": self.collected
+        }
+
+# Shared by the upload session endpoints; garbage collection runs in the app lifespan
+upload_session_service = UploadSessionService.from_env()
@@ -0,0 +1,88 @@
+"""Concurrent request benchmark for the API
+
+Fires N requests at a fixed concurrency against one endpoint and reports
+throughput and latency percentiles. Run it before and after a change to
+compare, e.g.:
+
+    python benchmarks/concurrent_requests.py --token $TOKEN --path /files/tracks -c 50 -n 2000
+
+Pass --range to measure streaming, e.g. `--range bytes=0-` against an
+/files/audio/{filename} path.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from typing import List
+
+import httpx
+
+
+async def worker(client: httpx.AsyncClient, path: str, queue: asyncio.Queue, latencies: List[float], errors: List[int]):
+    while True:
+        try:
+            queue.get_nowait()
+        except asyncio.QueueEmpty:
+            return
+
+        start = time.perf_counter()
+        try:
+            response = await client.get(path)
+            if response.status_code >= 400:
+                errors.append(response.status_code)
+        except httpx.HTTPError:
+            errors.append(0)
+        latencies.append(time.perf_counter() - start)
+
+
+def percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def run(base_url: str, path: str, token: str, concurrency: int, requests: int, byte_range: str = ""):
+    headers = {"Authorization": f"Bearer {token}"} if token else {}
+    if byte_range:
+        headers["Range"] = byte_range
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    queue: asyncio.Queue = asyncio.Queue()
+    for _ in range(requests):
+        queue.put_nowait(None)
+
+    latencies: List[float] = []
+    errors: List[int] = []
+
+    async with httpx.AsyncClient(base_url=base_url, headers=headers, limits=limits, timeout=60) as client:
+        # Warm up connections and caches
+        await client.get(path)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(client, path, queue, latencies, errors) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    print(f"{base_url}{path}: {requests} requests, concurrency {concurrency}")
+    print(f"  total time:  {elapsed:.2f}s")
+    print(f"  throughput:  {requests / elapsed:.1f} req/s")
+    print(f"  latency avg: {statistics.mean(latencies) * 1000:.1f} ms")
+    for pct in (50, 90, 99):
+        print(f"  latency p{pct}: {percentile(latencies, pct) * 1000:.1f} ms")
+    print(f"  errors:      {len(errors)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent request benchmark")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--path", default="/files/tracks")
+    parser.add_argument("--token", default="", help="Bearer token of a test user")
+    parser.add_argument("-c", "--concurrency", type=int, default=50)
+    parser.add_argument("-n", "--requests", type=int, default=2000)
+    parser.add_argument("--range", default="", help="Range header to send, e.g. bytes=0-")
+    args = parser.parse_args()
+
+    asyncio.run(run(args.base_url, args.path, args.token, args.concurrency, args.requests, args.range))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Thumbnail generation benchmark
+
+Times generating every thumbnail size for one cover, comparing the previous
+approach (decode, convert and resize the full image once per size) with
+ThumbnailGenerator.create_thumbnails (one decode, cascaded resizes, parallel
+encodes). Reports wall and CPU time per cover, e.g.:
+
+    python benchmarks/thumbnails.py -n 20
+    python benchmarks/thumbnails.py --image cover.jpg
+
+Without --image a synthetic 3000x3000 JPEG is used.
+"""
+import argparse
+import io
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, Tuple
+
+from PIL import Image, ImageDraw
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services.storage.thumbnail_generator import ThumbnailGenerator  # noqa: E402
+
+
+def synthetic_cover(size: int) -> bytes:
+    img = Image.linear_gradient('L').resize((size, size)).convert('RGB')
+    draw = ImageDraw.Draw(img)
+    for n in range(0, size, max(1, size // 40)):
+        draw.line((0, n, size, size - n), fill=(n % 256, 80, 255 - n % 256), width=3)
+    output = io.BytesIO()
+    img.save(output, format='JPEG', quality=92)
+    return output.getvalue()
+
+
+def per_size_thumbnails(image_content: bytes, sizes: Dict[str, Tuple[int, int]]) -> Dict[str, bytes]:
+    """The previous pipeline: a full decode and resize for each size"""
+    thumbnails = {}
+    for size_name, size in sizes.items():
+        img = Image.open(io.BytesIO(image_content))
+        if img.mode in ('RGBA', 'LA', 'P'):
+            background = Image.new('RGB', img.size, (255, 255, 255))
+            if img.mode == 'P':
+                img = img.convert('RGBA')
+            background.paste(img, mask=img.split()[-1] if img.mode in ('RGBA', 'LA') else None)
+            img = background
+        elif img.mode != 'RGB':
+            img = img.convert('RGB')
+
+        img.thumbnail(size, Image.Resampling.LANCZOS)
+        thumbnail = Image.new('RGB', size, (255, 255, 255))
+        thumbnail.paste(img, ((size[0] - img.size[0]) // 2, (size[1] - img.size[1]) // 2))
+
+        output = io.BytesIO()
+        thumbnail.save(output, format='WEBP', quality=85, optimize=True)
+        thumbnails[size_name] = output.getvalue()
+    return thumbnails
+
+
+def measure(name: str, run: Callable[[], Dict[str, bytes]], count: int) -> None:
+    run()  # warm up
+    wall = time.perf_counter()
+    cpu = time.process_time()
+    for _ in range(count):
+        thumbnails = run()
+    wall = (time.perf_counter() - wall) / count
+    cpu = (time.process_time() - cpu) / count
+
+    total = sum(len(content) for content in thumbnails.values())
+    print(f"{name:<12} wall {wall * 1000:8.1f} ms/cover   cpu {cpu * 1000:8.1f} ms/cover   output {total / 1024:.1f} KiB")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--image", type=Path, help="cover image to use instead of a synthetic JPEG")
+    parser.add_argument("--size", type=int, default=3000, help="synthetic cover width and height")
+    parser.add_argument("-n", "--count", type=int, default=10, help="covers per measurement")
+    args = parser.parse_args()
+
+    image_content = args.image.read_bytes() if args.image else synthetic_cover(args.size)
+    with Image.open(io.BytesIO(image_content)) as img:
+        print(f"Source: {img.format} {img.size[0]}x{img.size[1]} {img.mode}, {len(image_content) / 1024:.1f} KiB")
+
+    generator = ThumbnailGenerator()
+    sizes = generator.THUMBNAIL_SIZES
+    measure("per-size", lambda: per_size_thumbnails(image_content, sizes), args.count)
+    measure("decode-once", lambda: generator.create_thumbnails(image_content, sizes), args.count)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,20 @@
 import logging
 import os
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from app.database import DB_MAX_OVERFLOW, async_engine
+from app.services.db_metrics import DBMetricsMiddleware, db_metrics
 from app.routes import files, playlists, statistics
+from app.services.http_client import AuthHttpClient
+from app.services.storage.ingest_pool import ingest_pool
+from app.services.storage.renditions import rendition_store
+from app.services.storage.hls import hls_store
+from app.services.storage.thumbnail_cache import thumbnail_cache
+from app.services.ingest_queue import ingest_queue
+from app.services.access_tracker import access_tracker
+from app.services.upload_session_service import upload_session_service
+from app.services import auth_service
 
 # Configure logging
 logging.basicConfig(
@@ -14,7 +26,27 @@ logging.basicConfig(
     ]
 )
 
-app = FastAPI(title="Sinuzoid API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Connection-pooled client shared by every auth verification
+    app.state.auth_http_client = AuthHttpClient.from_env()
+    # Process pool for CPU-bound upload processing (metadata, covers, thumbnails)
+    ingest_pool.start()
+    # Background workers enriching uploaded tracks
+    ingest_queue.start()
+    # Write-behind flushing of track last_accessed times
+    access_tracker.start()
+    # Garbage collection of abandoned resumable uploads
+    upload_session_service.start()
+    yield
+    await ingest_queue.stop()
+    await access_tracker.stop()
+    await upload_session_service.stop()
+    await app.state.auth_http_client.close()
+    ingest_pool.shutdown()
+    await async_engine.dispose()
+
+app = FastAPI(title="Sinuzoid API", lifespan=lifespan)
 
 # CORS middleware
 app.add_middleware(
@@ -26,6 +58,9 @@ app.add_middleware(
     expose_headers=["Content-Disposition"],  # Expose Content-Disposition header to frontend
 )
 
+# Per-request DB metrics and Server-Timing header
+app.add_middleware(DBMetricsMiddleware)
+
 # Include routers
 app.include_router(files.router)
 app.include_router(playlists.router)
@@ -38,3 +73,42 @@ async def root():
 @app.get("/health")
 async def health_check():
     return {"status": "healthy"}
+
+@app.get("/health/auth-client")
+async def auth_client_stats(request: Request):
+    """Connection pool, cache and circuit breaker stats for the auth service client"""
+    return {
+        "pool": request.app.state.auth_http_client.stats(),
+        "token_cache": auth_service.token_cache.stats(),
+        "single_flight": auth_service.verifications.stats(),
+        "circuit_breaker": auth_service.auth_breaker.stats()
+    }
+
+@app.get("/health/db")
+async def db_stats():
+    """Connection pool state and aggregated per-request database metrics"""
+    pool = async_engine.pool
+    return {
+        "pool": {
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "overflow": pool.overflow(),
+            "checked_in": pool.checkedin(),
+            "max_overflow": DB_MAX_OVERFLOW,
+            "timeout": pool.timeout()
+        },
+        "requests": db_metrics.stats(),
+        "last_accessed_buffer": access_tracker.stats()
+    }
+
+@app.get("/health/ingest")
+async def ingest_stats():
+    """Ingest process pool usage, background job queue, resumable upload, rendition, HLS and thumbnail cache counters"""
+    return {
+        "pool": ingest_pool.stats(),
+        "queue": ingest_queue.stats(),
+        "upload_sessions": upload_session_service.stats(),
+        "renditions": rendition_store.stats(),
+        "hls": hls_store.stats(),
+        "thumbnails": thumbnail_cache.stats()
+    }
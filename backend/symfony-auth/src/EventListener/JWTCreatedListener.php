@@ -0,0 +1,31 @@
+<?php
+
+namespace App\EventListener;
+
+use App\Entity\User;
+use Lexik\Bundle\JWTAuthenticationBundle\Event\JWTCreatedEvent;
+use Lexik\Bundle\JWTAuthenticationBundle\Events;
+use Symfony\Component\EventDispatcher\Attribute\AsEventListener;
+
+/**
+ * Adds the user id and role to the JWT payload so that the FastAPI
+ * service can build the current user from the token alone.
+ */
+#[AsEventListener(event: Events::JWT_CREATED)]
+class JWTCreatedListener
+{
+    public function __invoke(JWTCreatedEvent $event): void
+    {
+        $user = $event->getUser();
+
+        if (!$user instanceof User) {
+            return;
+        }
+
+        $payload = $event->getData();
+        $payload['id'] = $user->getId();
+        $payload['role'] = $user->getRole();
+
+        $event->setData($payload);
+    }
+}
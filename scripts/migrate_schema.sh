@@ -0,0 +1,147 @@
+#!/bin/bash
+
+# Bring a database created from an older sinuzoid_database.sql up to date with
+# the API's models: the ingest job queue (tracks.processing_status,
+# ingest_jobs), content-addressed audio and covers (audio_blobs, cover_blobs,
+# tracks.blob_sha256/cover_sha256 and their reference-count triggers) and
+# resumable uploads (upload_sessions). Existing tracks are marked ready and
+# keep their private files. Safe to run more than once; run
+# scripts/migrate_storage_keys.sh as well.
+
+set -a
+source .env
+set +a
+
+docker compose exec -T db psql -U ${POSTGRES_USER} -d ${POSTGRES_DB} -v ON_ERROR_STOP=1 --single-transaction <<'SQL'
+-- Ingest job queue
+ALTER TABLE public.tracks ADD COLUMN IF NOT EXISTS processing_status character varying(20);
+
+UPDATE public.tracks
+SET processing_status = 'ready'
+WHERE processing_status IS NULL;
+
+ALTER TABLE public.tracks ALTER COLUMN processing_status SET DEFAULT 'ready'::character varying;
+ALTER TABLE public.tracks ALTER COLUMN processing_status SET NOT NULL;
+
+CREATE TABLE IF NOT EXISTS public.ingest_jobs (
+    id uuid NOT NULL,
+    track_id uuid NOT NULL,
+    user_id integer NOT NULL,
+    job_type character varying(30) DEFAULT 'enrich'::character varying NOT NULL,
+    status character varying(20) DEFAULT 'pending'::character varying NOT NULL,
+    attempts integer DEFAULT 0 NOT NULL,
+    max_attempts integer DEFAULT 3 NOT NULL,
+    last_error text,
+    run_after timestamp(0) without time zone DEFAULT CURRENT_TIMESTAMP NOT NULL,
+    locked_until timestamp(0) without time zone,
+    created_at timestamp(0) without time zone DEFAULT CURRENT_TIMESTAMP NOT NULL,
+    updated_at timestamp(0) without time zone DEFAULT CURRENT_TIMESTAMP NOT NULL,
+    completed_at timestamp(0) without time zone,
+    CONSTRAINT ingest_jobs_pkey PRIMARY KEY (id),
+    CONSTRAINT ingest_jobs_status_check CHECK (((status)::text = ANY ((ARRAY['pending'::character varying, 'running'::character varying, 'completed'::character varying, 'failed'::character varying])::text[]))),
+    CONSTRAINT ingest_jobs_track_id_fkey FOREIGN KEY (track_id) REFERENCES public.tracks(id) ON DELETE CASCADE,
+    CONSTRAINT ingest_jobs_user_id_fkey FOREIGN KEY (user_id) REFERENCES public.users(id) ON DELETE CASCADE
+);
+
+CREATE INDEX IF NOT EXISTS idx_ingest_jobs_claim ON public.ingest_jobs USING btree (run_after) WHERE ((status)::text = ANY ((ARRAY['pending'::character varying, 'running'::character varying])::text[]));
+CREATE INDEX IF NOT EXISTS idx_ingest_jobs_track_id ON public.ingest_jobs USING btree (track_id);
+
+CREATE OR REPLACE TRIGGER update_ingest_jobs_updated_at BEFORE UPDATE ON public.ingest_jobs FOR EACH ROW EXECUTE FUNCTION public.update_updated_at_column();
+
+-- Content-addressed audio and covers, reference-counted by triggers on tracks
+CREATE TABLE IF NOT EXISTS public.audio_blobs (
+    sha256 character varying(64) NOT NULL,
+    file_size bigint NOT NULL,
+    ref_count integer DEFAULT 0 NOT NULL,
+    created_at timestamp(0) without time zone DEFAULT CURRENT_TIMESTAMP NOT NULL,
+    CONSTRAINT audio_blobs_pkey PRIMARY KEY (sha256)
+);
+
+CREATE TABLE IF NOT EXISTS public.cover_blobs (
+    sha256 character varying(64) NOT NULL,
+    file_size bigint NOT NULL,
+    ref_count integer DEFAULT 0 NOT NULL,
+    created_at timestamp(0) without time zone DEFAULT CURRENT_TIMESTAMP NOT NULL,
+    CONSTRAINT cover_blobs_pkey PRIMARY KEY (sha256)
+);
+
+ALTER TABLE public.tracks ADD COLUMN IF NOT EXISTS blob_sha256 character varying(64);
+ALTER TABLE public.tracks ADD COLUMN IF NOT EXISTS cover_sha256 character varying(64);
+
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'tracks_blob_sha256_fkey') THEN
+        ALTER TABLE ONLY public.tracks
+            ADD CONSTRAINT tracks_blob_sha256_fkey FOREIGN KEY (blob_sha256) REFERENCES public.audio_blobs(sha256);
+    END IF;
+    IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'tracks_cover_sha256_fkey') THEN
+        ALTER TABLE ONLY public.tracks
+            ADD CONSTRAINT tracks_cover_sha256_fkey FOREIGN KEY (cover_sha256) REFERENCES public.cover_blobs(sha256);
+    END IF;
+END $$;
+
+CREATE INDEX IF NOT EXISTS idx_tracks_blob_sha256 ON public.tracks USING btree (blob_sha256) WHERE (blob_sha256 IS NOT NULL);
+CREATE INDEX IF NOT EXISTS idx_tracks_cover_sha256 ON public.tracks USING btree (cover_sha256) WHERE (cover_sha256 IS NOT NULL);
+
+CREATE OR REPLACE FUNCTION public.update_audio_blob_ref_count() RETURNS trigger
+    LANGUAGE plpgsql
+    AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.blob_sha256 IS NOT NULL THEN
+        UPDATE public.audio_blobs SET ref_count = ref_count - 1 WHERE sha256 = OLD.blob_sha256;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.blob_sha256 IS NOT NULL THEN
+        UPDATE public.audio_blobs SET ref_count = ref_count + 1 WHERE sha256 = NEW.blob_sha256;
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION public.update_cover_blob_ref_count() RETURNS trigger
+    LANGUAGE plpgsql
+    AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.cover_sha256 IS NOT NULL THEN
+        UPDATE public.cover_blobs SET ref_count = ref_count - 1 WHERE sha256 = OLD.cover_sha256;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.cover_sha256 IS NOT NULL THEN
+        UPDATE public.cover_blobs SET ref_count = ref_count + 1 WHERE sha256 = NEW.cover_sha256;
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE TRIGGER update_audio_blob_ref_count AFTER INSERT OR DELETE OR UPDATE OF blob_sha256 ON public.tracks FOR EACH ROW EXECUTE FUNCTION public.update_audio_blob_ref_count();
+CREATE OR REPLACE TRIGGER update_cover_blob_ref_count AFTER INSERT OR DELETE OR UPDATE OF cover_sha256 ON public.tracks FOR EACH ROW EXECUTE FUNCTION public.update_cover_blob_ref_count();
+
+-- Recount references, in case tracks were changed while the triggers were missing
+UPDATE public.audio_blobs AS b
+SET ref_count = (SELECT count(*) FROM public.tracks AS t WHERE t.blob_sha256 = b.sha256);
+
+UPDATE public.cover_blobs AS b
+SET ref_count = (SELECT count(*) FROM public.tracks AS t WHERE t.cover_sha256 = b.sha256);
+
+-- Resumable uploads
+CREATE TABLE IF NOT EXISTS public.upload_sessions (
+    id uuid NOT NULL,
+    user_id integer NOT NULL,
+    original_filename character varying(255) NOT NULL,
+    content_type character varying(100),
+    total_size bigint NOT NULL,
+    chunk_size integer NOT NULL,
+    status character varying(20) DEFAULT 'open'::character varying NOT NULL,
+    track_id uuid,
+    expires_at timestamp(0) without time zone NOT NULL,
+    created_at timestamp(0) without time zone DEFAULT CURRENT_TIMESTAMP NOT NULL,
+    updated_at timestamp(0) without time zone DEFAULT CURRENT_TIMESTAMP NOT NULL,
+    CONSTRAINT upload_sessions_pkey PRIMARY KEY (id),
+    CONSTRAINT upload_sessions_status_check CHECK (((status)::text = ANY ((ARRAY['open'::character varying, 'assembling'::character varying, 'completed'::character varying])::text[]))),
+    CONSTRAINT upload_sessions_track_id_fkey FOREIGN KEY (track_id) REFERENCES public.tracks(id) ON DELETE SET NULL,
+    CONSTRAINT upload_sessions_user_id_fkey FOREIGN KEY (user_id) REFERENCES public.users(id) ON DELETE CASCADE
+);
+
+CREATE INDEX IF NOT EXISTS idx_upload_sessions_expires_at ON public.upload_sessions USING btree (expires_at);
+CREATE INDEX IF NOT EXISTS idx_upload_sessions_user_id ON public.upload_sessions USING btree (user_id);
+
+CREATE OR REPLACE TRIGGER update_upload_sessions_updated_at BEFORE UPDATE ON public.upload_sessions FOR EACH ROW EXECUTE FUNCTION public.update_updated_at_column();
+SQL
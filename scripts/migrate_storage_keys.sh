@@ -0,0 +1,56 @@
+#!/bin/bash
+
+# Bring a database created before tracks.storage_key and cover_keys up to date:
+# adds the column and table if missing, fills storage_key from file_path and
+# registers every track's {base}_cover.jpg and its thumbnails in cover_keys.
+# Safe to run more than once. If FILE_OWNERSHIP_LEGACY_FALLBACK was enabled for
+# the upgrade, turn it off again once this has run.
+
+set -a
+source .env
+set +a
+
+docker compose exec -T db psql -U ${POSTGRES_USER} -d ${POSTGRES_DB} -v ON_ERROR_STOP=1 --single-transaction <<'SQL'
+ALTER TABLE public.tracks ADD COLUMN IF NOT EXISTS storage_key character varying(255);
+
+UPDATE public.tracks
+SET storage_key = regexp_replace(file_path, '^.*/', '')
+WHERE storage_key IS NULL;
+
+ALTER TABLE public.tracks ALTER COLUMN storage_key SET NOT NULL;
+
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'tracks_storage_key_key') THEN
+        ALTER TABLE ONLY public.tracks
+            ADD CONSTRAINT tracks_storage_key_key UNIQUE (storage_key);
+    END IF;
+END $$;
+
+CREATE TABLE IF NOT EXISTS public.cover_keys (
+    key character varying(255) NOT NULL,
+    track_id uuid NOT NULL,
+    user_id integer NOT NULL,
+    kind character varying(20) DEFAULT 'cover'::character varying NOT NULL,
+    CONSTRAINT cover_keys_pkey PRIMARY KEY (key, track_id),
+    CONSTRAINT cover_keys_track_id_fkey FOREIGN KEY (track_id) REFERENCES public.tracks(id) ON DELETE CASCADE,
+    CONSTRAINT cover_keys_user_id_fkey FOREIGN KEY (user_id) REFERENCES public.users(id) ON DELETE CASCADE
+);
+
+CREATE INDEX IF NOT EXISTS idx_cover_keys_track_id ON public.cover_keys USING btree (track_id);
+
+-- Per-track covers: {audio stem}_cover.jpg, thumbnails {cover stem}_thumb_{size}.webp
+INSERT INTO public.cover_keys (key, track_id, user_id, kind)
+SELECT regexp_replace(cover_path, '^.*/', ''), id, user_id, 'cover'
+FROM public.tracks
+WHERE cover_path IS NOT NULL
+UNION ALL
+SELECT regexp_replace(regexp_replace(cover_path, '^.*/', ''), '\.[^.]*$', '') || '_thumb_' || size || '.webp', id, user_id, 'thumbnail'
+FROM public.tracks, unnest(ARRAY['small', 'medium', 'large']) AS size
+WHERE cover_path IS NOT NULL
+UNION ALL
+SELECT regexp_replace(cover_thumbnail_path, '^.*/', ''), id, user_id, 'thumbnail'
+FROM public.tracks
+WHERE cover_thumbnail_path IS NOT NULL
+ON CONFLICT (key, track_id) DO NOTHING;
+SQL
@@ -16,6 +16,48 @@ SET xmloption = content;
 SET client_min_messages = warning;
 SET row_security = off;
 
+--
+-- Name: update_audio_blob_ref_count(); Type: FUNCTION; Schema: public; Owner: postgres
+--
+
+CREATE FUNCTION public.update_audio_blob_ref_count() RETURNS trigger
+    LANGUAGE plpgsql
+    AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.blob_sha256 IS NOT NULL THEN
+        UPDATE public.audio_blobs SET ref_count = ref_count - 1 WHERE sha256 = OLD.blob_sha256;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.blob_sha256 IS NOT NULL THEN
+        UPDATE public.audio_blobs SET ref_count = ref_count + 1 WHERE sha256 = NEW.blob_sha256;
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+
+ALTER FUNCTION public.update_audio_blob_ref_count() OWNER TO postgres;
+
+--
+-- Name: update_cover_blob_ref_count(); Type: FUNCTION; Schema: public; Owner: postgres
+--
+
+CREATE FUNCTION public.update_cover_blob_ref_count() RETURNS trigger
+    LANGUAGE plpgsql
+    AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.cover_sha256 IS NOT NULL THEN
+        UPDATE public.cover_blobs SET ref_count = ref_count - 1 WHERE sha256 = OLD.cover_sha256;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.cover_sha256 IS NOT NULL THEN
+        UPDATE public.cover_blobs SET ref_count = ref_count + 1 WHERE sha256 = NEW.cover_sha256;
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+
+ALTER FUNCTION public.update_cover_blob_ref_count() OWNER TO postgres;
+
 --
 -- Name: update_updated_at_column(); Type: FUNCTION; Schema: public; Owner: postgres
 --
@@ -36,6 +78,48 @@ SET default_tablespace = '';
 
 SET default_table_access_method = heap;
 
+--
+-- Name: audio_blobs; Type: TABLE; Schema: public; Owner: postgres
+--
+
+CREATE TABLE public.audio_blobs (
+    sha256 character varying(64) NOT NULL,
+    file_size bigint NOT NULL,
+    ref_count integer DEFAULT 0 NOT NULL,
+    created_at timestamp(0) without time zone DEFAULT CURRENT_TIMESTAMP NOT NULL
+);
+
+
+ALTER TABLE public.audio_blobs OWNER TO postgres;
+
+--
+-- Name: cover_blobs; Type: TABLE; Schema: public; Owner: postgres
+--
+
+CREATE TABLE public.cover_blobs (
+    sha256 character varying(64) NOT NULL,
+    file_size bigint NOT NULL,
+    ref_count integer DEFAULT 0 NOT NULL,
+    created_at timestamp(0) without time zone DEFAULT CURRENT_TIMESTAMP NOT NULL
+);
+
+
+ALTER TABLE public.cover_blobs OWNER TO postgres;
+
+--
+-- Name: cover_keys; Type: TABLE; Schema: public; Owner: postgres
+--
+
+CREATE TABLE public.cover_keys (
+    key character varying(255) NOT NULL,
+    track_id uuid NOT NULL,
+    user_id integer NOT NULL,
+    kind character varying(20) DEFAULT 'cover'::character varying NOT NULL
+);
+
+
+ALTER TABLE public.cover_keys OWNER TO postgres;
+
 --
 -- Name: doctrine_migration_versions; Type: TABLE; Schema: public; Owner: postgres
 --
@@ -49,6 +133,30 @@ CREATE TABLE public.doctrine_migration_versions (
 
 ALTER TABLE public.doctrine_migration_versions OWNER TO postgres;
 
+--
+-- Name: ingest_jobs; Type: TABLE; Schema: public; Owner: postgres
+--
+
+CREATE TABLE public.ingest_jobs (
+    id uuid NOT NULL,
+    track_id uuid NOT NULL,
+    user_id integer NOT NULL,
+    job_type character varying(30) DEFAULT 'enrich'::character varying NOT NULL,
+    status character varying(20) DEFAULT 'pending'::character varying NOT NULL,
+    attempts integer DEFAULT 0 NOT NULL,
+    max_attempts integer DEFAULT 3 NOT NULL,
+    last_error text,
+    run_after timestamp(0) without time zone DEFAULT CURRENT_TIMESTAMP NOT NULL,
+    locked_until timestamp(0) without time zone,
+    created_at timestamp(0) without time zone DEFAULT CURRENT_TIMESTAMP NOT NULL,
+    updated_at timestamp(0) without time zone DEFAULT CURRENT_TIMESTAMP NOT NULL,
+    completed_at timestamp(0) without time zone,
+    CONSTRAINT ingest_jobs_status_check CHECK (((status)::text = ANY ((ARRAY['pending'::character varying, 'running'::character varying, 'completed'::character varying, 'failed'::character varying])::text[])))
+);
+
+
+ALTER TABLE public.ingest_jobs OWNER TO postgres;
+
 --
 -- Name: metadata; Type: TABLE; Schema: public; Owner: postgres
 --
@@ -322,6 +430,7 @@ CREATE TABLE public.tracks (
     user_id integer NOT NULL,
     original_filename character varying(255) NOT NULL,
     file_path character varying(512) NOT NULL,
+    storage_key character varying(255) NOT NULL,
     file_size bigint NOT NULL,
     file_type character varying(10) NOT NULL,
     duration character varying(255) NOT NULL,
@@ -330,6 +439,9 @@ CREATE TABLE public.tracks (
     cover_path character varying(512),
     cover_thumbnail_path character varying(512),
     updated_at timestamp(0) without time zone DEFAULT CURRENT_TIMESTAMP NOT NULL,
+    processing_status character varying(20) DEFAULT 'ready'::character varying NOT NULL,
+    blob_sha256 character varying(64),
+    cover_sha256 character varying(64),
     CONSTRAINT tracks_file_type_check CHECK (((file_type)::text = ANY ((ARRAY['mp3'::character varying, 'wav'::character varying, 'flac'::character varying, 'ogg'::character varying, 'aac'::character varying, 'm4a'::character varying])::text[])))
 );
 
@@ -371,6 +483,28 @@ COMMENT ON COLUMN public.tracks.last_accessed IS '(DC2Type:datetime_immutable)';
 COMMENT ON COLUMN public.tracks.updated_at IS '(DC2Type:datetime_immutable)';
 
 
+--
+-- Name: upload_sessions; Type: TABLE; Schema: public; Owner: postgres
+--
+
+CREATE TABLE public.upload_sessions (
+    id uuid NOT NULL,
+    user_id integer NOT NULL,
+    original_filename character varying(255) NOT NULL,
+    content_type character varying(100),
+    total_size bigint NOT NULL,
+    chunk_size integer NOT NULL,
+    status character varying(20) DEFAULT 'open'::character varying NOT NULL,
+    track_id uuid,
+    expires_at timestamp(0) without time zone NOT NULL,
+    created_at timestamp(0) without time zone DEFAULT CURRENT_TIMESTAMP NOT NULL,
+    updated_at timestamp(0) without time zone DEFAULT CURRENT_TIMESTAMP NOT NULL,
+    CONSTRAINT upload_sessions_status_check CHECK (((status)::text = ANY ((ARRAY['open'::character varying, 'assembling'::character varying, 'completed'::character varying])::text[])))
+);
+
+
+ALTER TABLE public.upload_sessions OWNER TO postgres;
+
 --
 -- Name: users; Type: TABLE; Schema: public; Owner: postgres
 --
@@ -462,6 +596,30 @@ ALTER TABLE ONLY public.refresh_tokens ALTER COLUMN id SET DEFAULT nextval('publ
 ALTER TABLE ONLY public.users ALTER COLUMN id SET DEFAULT nextval('public.users_id_seq'::regclass);
 
 
+--
+-- Name: audio_blobs audio_blobs_pkey; Type: CONSTRAINT; Schema: public; Owner: postgres
+--
+
+ALTER TABLE ONLY public.audio_blobs
+    ADD CONSTRAINT audio_blobs_pkey PRIMARY KEY (sha256);
+
+
+--
+-- Name: cover_blobs cover_blobs_pkey; Type: CONSTRAINT; Schema: public; Owner: postgres
+--
+
+ALTER TABLE ONLY public.cover_blobs
+    ADD CONSTRAINT cover_blobs_pkey PRIMARY KEY (sha256);
+
+
+--
+-- Name: cover_keys cover_keys_pkey; Type: CONSTRAINT; Schema: public; Owner: postgres
+--
+
+ALTER TABLE ONLY public.cover_keys
+    ADD CONSTRAINT cover_keys_pkey PRIMARY KEY (key, track_id);
+
+
 --
 -- Name: doctrine_migration_versions doctrine_migration_versions_pkey; Type: CONSTRAINT; Schema: public; Owner: postgres
 --
@@ -470,6 +628,14 @@ ALTER TABLE ONLY public.doctrine_migration_versions
     ADD CONSTRAINT doctrine_migration_versions_pkey PRIMARY KEY (version);
 
 
+--
+-- Name: ingest_jobs ingest_jobs_pkey; Type: CONSTRAINT; Schema: public; Owner: postgres
+--
+
+ALTER TABLE ONLY public.ingest_jobs
+    ADD CONSTRAINT ingest_jobs_pkey PRIMARY KEY (id);
+
+
 --
 -- Name: metadata extended_metadata_pkey; Type: CONSTRAINT; Schema: public; Owner: postgres
 --
@@ -526,6 +692,14 @@ ALTER TABLE ONLY public.tracks
     ADD CONSTRAINT tracks_pkey PRIMARY KEY (id);
 
 
+--
+-- Name: tracks tracks_storage_key_key; Type: CONSTRAINT; Schema: public; Owner: postgres
+--
+
+ALTER TABLE ONLY public.tracks
+    ADD CONSTRAINT tracks_storage_key_key UNIQUE (storage_key);
+
+
 --
 -- Name: tracks uniq_246d2a2e82a8e361; Type: CONSTRAINT; Schema: public; Owner: postgres
 --
@@ -550,6 +724,14 @@ ALTER TABLE ONLY public.users
     ADD CONSTRAINT uniq_username UNIQUE (username);
 
 
+--
+-- Name: upload_sessions upload_sessions_pkey; Type: CONSTRAINT; Schema: public; Owner: postgres
+--
+
+ALTER TABLE ONLY public.upload_sessions
+    ADD CONSTRAINT upload_sessions_pkey PRIMARY KEY (id);
+
+
 --
 -- Name: users users_pkey; Type: CONSTRAINT; Schema: public; Owner: postgres
 --
@@ -586,6 +768,27 @@ CREATE INDEX idx_5e06116fa76ed395 ON public.playlists USING btree (user_id);
 CREATE INDEX idx_9bace7e1a76ed395 ON public.refresh_tokens USING btree (user_id);
 
 
+--
+-- Name: idx_cover_keys_track_id; Type: INDEX; Schema: public; Owner: postgres
+--
+
+CREATE INDEX idx_cover_keys_track_id ON public.cover_keys USING btree (track_id);
+
+
+--
+-- Name: idx_ingest_jobs_claim; Type: INDEX; Schema: public; Owner: postgres
+--
+
+CREATE INDEX idx_ingest_jobs_claim ON public.ingest_jobs USING btree (run_after) WHERE ((status)::text = ANY ((ARRAY['pending'::character varying, 'running'::character varying])::text[]));
+
+
+--
+-- Name: idx_ingest_jobs_track_id; Type: INDEX; Schema: public; Owner: postgres
+--
+
+CREATE INDEX idx_ingest_jobs_track_id ON public.ingest_jobs USING btree (track_id);
+
+
 --
 -- Name: idx_metadata_gin; Type: INDEX; Schema: public; Owner: postgres
 --
@@ -607,6 +810,20 @@ CREATE INDEX idx_statistics_track_id ON public.statistics USING btree (track_id)
 CREATE INDEX idx_statistics_user_id ON public.statistics USING btree (user_id);
 
 
+--
+-- Name: idx_tracks_blob_sha256; Type: INDEX; Schema: public; Owner: postgres
+--
+
+CREATE INDEX idx_tracks_blob_sha256 ON public.tracks USING btree (blob_sha256) WHERE (blob_sha256 IS NOT NULL);
+
+
+--
+-- Name: idx_tracks_cover_sha256; Type: INDEX; Schema: public; Owner: postgres
+--
+
+CREATE INDEX idx_tracks_cover_sha256 ON public.tracks USING btree (cover_sha256) WHERE (cover_sha256 IS NOT NULL);
+
+
 --
 -- Name: idx_tracks_cover_path; Type: INDEX; Schema: public; Owner: postgres
 --
@@ -614,6 +831,20 @@ CREATE INDEX idx_statistics_user_id ON public.statistics USING btree (user_id);
 CREATE INDEX idx_tracks_cover_path ON public.tracks USING btree (cover_path) WHERE (cover_path IS NOT NULL);
 
 
+--
+-- Name: idx_upload_sessions_expires_at; Type: INDEX; Schema: public; Owner: postgres
+--
+
+CREATE INDEX idx_upload_sessions_expires_at ON public.upload_sessions USING btree (expires_at);
+
+
+--
+-- Name: idx_upload_sessions_user_id; Type: INDEX; Schema: public; Owner: postgres
+--
+
+CREATE INDEX idx_upload_sessions_user_id ON public.upload_sessions USING btree (user_id);
+
+
 --
 -- Name: uniq_3967a2165f37a13b; Type: INDEX; Schema: public; Owner: postgres
 --
@@ -628,6 +859,13 @@ CREATE UNIQUE INDEX uniq_3967a2165f37a13b ON public.password_reset_tokens USING
 CREATE UNIQUE INDEX uniq_9bace7e15f37a13b ON public.refresh_tokens USING btree (token);
 
 
+--
+-- Name: ingest_jobs update_ingest_jobs_updated_at; Type: TRIGGER; Schema: public; Owner: postgres
+--
+
+CREATE TRIGGER update_ingest_jobs_updated_at BEFORE UPDATE ON public.ingest_jobs FOR EACH ROW EXECUTE FUNCTION public.update_updated_at_column();
+
+
 --
 -- Name: metadata update_metadata_updated_at; Type: TRIGGER; Schema: public; Owner: postgres
 --
@@ -635,6 +873,20 @@ CREATE UNIQUE INDEX uniq_9bace7e15f37a13b ON public.refresh_tokens USING btree (
 CREATE TRIGGER update_metadata_updated_at BEFORE UPDATE ON public.metadata FOR EACH ROW EXECUTE FUNCTION public.update_updated_at_column();
 
 
+--
+-- Name: tracks update_audio_blob_ref_count; Type: TRIGGER; Schema: public; Owner: postgres
+--
+
+CREATE TRIGGER update_audio_blob_ref_count AFTER INSERT OR DELETE OR UPDATE OF blob_sha256 ON public.tracks FOR EACH ROW EXECUTE FUNCTION public.update_audio_blob_ref_count();
+
+
+--
+-- Name: tracks update_cover_blob_ref_count; Type: TRIGGER; Schema: public; Owner: postgres
+--
+
+CREATE TRIGGER update_cover_blob_ref_count AFTER INSERT OR DELETE OR UPDATE OF cover_sha256 ON public.tracks FOR EACH ROW EXECUTE FUNCTION public.update_cover_blob_ref_count();
+
+
 --
 -- Name: tracks update_tracks_updated_at; Type: TRIGGER; Schema: public; Owner: postgres
 --
@@ -642,6 +894,13 @@ CREATE TRIGGER update_metadata_updated_at BEFORE UPDATE ON public.metadata FOR E
 CREATE TRIGGER update_tracks_updated_at BEFORE UPDATE ON public.tracks FOR EACH ROW EXECUTE FUNCTION public.update_updated_at_column();
 
 
+--
+-- Name: upload_sessions update_upload_sessions_updated_at; Type: TRIGGER; Schema: public; Owner: postgres
+--
+
+CREATE TRIGGER update_upload_sessions_updated_at BEFORE UPDATE ON public.upload_sessions FOR EACH ROW EXECUTE FUNCTION public.update_updated_at_column();
+
+
 --
 -- Name: users update_users_updated_at; Type: TRIGGER; Schema: public; Owner: postgres
 --
@@ -649,6 +908,38 @@ CREATE TRIGGER update_tracks_updated_at BEFORE UPDATE ON public.tracks FOR EACH
 CREATE TRIGGER update_users_updated_at BEFORE UPDATE ON public.users FOR EACH ROW EXECUTE FUNCTION public.update_updated_at_column();
 
 
+--
+-- Name: cover_keys cover_keys_track_id_fkey; Type: FK CONSTRAINT; Schema: public; Owner: postgres
+--
+
+ALTER TABLE ONLY public.cover_keys
+    ADD CONSTRAINT cover_keys_track_id_fkey FOREIGN KEY (track_id) REFERENCES public.tracks(id) ON DELETE CASCADE;
+
+
+--
+-- Name: cover_keys cover_keys_user_id_fkey; Type: FK CONSTRAINT; Schema: public; Owner: postgres
+--
+
+ALTER TABLE ONLY public.cover_keys
+    ADD CONSTRAINT cover_keys_user_id_fkey FOREIGN KEY (user_id) REFERENCES public.users(id) ON DELETE CASCADE;
+
+
+--
+-- Name: ingest_jobs ingest_jobs_track_id_fkey; Type: FK CONSTRAINT; Schema: public; Owner: postgres
+--
+
+ALTER TABLE ONLY public.ingest_jobs
+    ADD CONSTRAINT ingest_jobs_track_id_fkey FOREIGN KEY (track_id) REFERENCES public.tracks(id) ON DELETE CASCADE;
+
+
+--
+-- Name: ingest_jobs ingest_jobs_user_id_fkey; Type: FK CONSTRAINT; Schema: public; Owner: postgres
+--
+
+ALTER TABLE ONLY public.ingest_jobs
+    ADD CONSTRAINT ingest_jobs_user_id_fkey FOREIGN KEY (user_id) REFERENCES public.users(id) ON DELETE CASCADE;
+
+
 --
 -- Name: metadata extended_metadata_track_id_fkey; Type: FK CONSTRAINT; Schema: public; Owner: postgres
 --
@@ -713,6 +1004,22 @@ ALTER TABLE ONLY public.statistics
     ADD CONSTRAINT statistics_user_id_fkey FOREIGN KEY (user_id) REFERENCES public.users(id) ON DELETE CASCADE;
 
 
+--
+-- Name: tracks tracks_blob_sha256_fkey; Type: FK CONSTRAINT; Schema: public; Owner: postgres
+--
+
+ALTER TABLE ONLY public.tracks
+    ADD CONSTRAINT tracks_blob_sha256_fkey FOREIGN KEY (blob_sha256) REFERENCES public.audio_blobs(sha256);
+
+
+--
+-- Name: tracks tracks_cover_sha256_fkey; Type: FK CONSTRAINT; Schema: public; Owner: postgres
+--
+
+ALTER TABLE ONLY public.tracks
+    ADD CONSTRAINT tracks_cover_sha256_fkey FOREIGN KEY (cover_sha256) REFERENCES public.cover_blobs(sha256);
+
+
 --
 -- Name: tracks tracks_user_id_fkey; Type: FK CONSTRAINT; Schema: public; Owner: postgres
 --
@@ -721,6 +1028,22 @@ ALTER TABLE ONLY public.tracks
     ADD CONSTRAINT tracks_user_id_fkey FOREIGN KEY (user_id) REFERENCES public.users(id) ON DELETE CASCADE;
 
 
+--
+-- Name: upload_sessions upload_sessions_track_id_fkey; Type: FK CONSTRAINT; Schema: public; Owner: postgres
+--
+
+ALTER TABLE ONLY public.upload_sessions
+    ADD CONSTRAINT upload_sessions_track_id_fkey FOREIGN KEY (track_id) REFERENCES public.tracks(id) ON DELETE SET NULL;
+
+
+--
+-- Name: upload_sessions upload_sessions_user_id_fkey; Type: FK CONSTRAINT; Schema: public; Owner: postgres
+--
+
+ALTER TABLE ONLY public.upload_sessions
+    ADD CONSTRAINT upload_sessions_user_id_fkey FOREIGN KEY (user_id) REFERENCES public.users(id) ON DELETE CASCADE;
+
+
 --
 -- PostgreSQL database dump complete
 --
\ No newline at end of file